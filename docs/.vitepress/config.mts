@@ -42,7 +42,8 @@ export default withMermaid(defineConfig({
         text: "Evidence",
         items: [
           { text: "Methodology", link: "/evidence/methodology" },
-          { text: "Baseline Results", link: "/evidence/baseline_results" }
+          { text: "Baseline Results", link: "/evidence/baseline_results" },
+          { text: "Performance Profiles", link: "/evidence/performance_profiles" }
         ]
       }
     ]
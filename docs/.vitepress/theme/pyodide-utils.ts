@@ -32,24 +32,50 @@ export async function getPyodide() {
   return pyodidePromise;
 }
 
+/**
+ * Starts downloading the prebuilt `qnm` archive (see
+ * src/python/scripts/build_pyodide_bundle.py). Call it before `getPyodide()`
+ * so the download overlaps with the Pyodide runtime load.
+ */
+export async function fetchPythonBundle(): Promise<ArrayBuffer | null> {
+  try {
+    const response = await fetch(`${import.meta.env.BASE_URL}qnm.zip`);
+    return response.ok ? await response.arrayBuffer() : null;
+  } catch {
+    return null;
+  }
+}
+
 /**
  * Syncs local Python source files to Pyodide's virtual file system.
+ *
+ * With a bundle the whole package (sources + bytecode) is extracted in one
+ * step; otherwise the individual files are fetched concurrently.
  */
-export async function syncPythonSource(pyodide: any, files: string[]) {
+export async function syncPythonSource(pyodide: any, files: string[], bundle: ArrayBuffer | null = null) {
   // VitePress: devでは "/"、GitHub Pagesでは config.base に一致する
   const baseUrl = `${import.meta.env.BASE_URL}qnm/`;
-  
+
   // Create directory if not exists
   pyodide.FS.mkdirTree("/home/pyodide/qnm");
 
-  for (const file of files) {
-    const response = await fetch(`${baseUrl}${file}`);
-    if (!response.ok) {
-      console.error(`Failed to fetch ${file}: ${response.statusText}`);
-      continue;
-    }
-    const content = await response.text();
-    pyodide.FS.writeFile(`/home/pyodide/qnm/${file}`, content);
+  if (bundle) {
+    pyodide.unpackArchive(bundle, "zip", { extractDir: "/home/pyodide" });
+  } else {
+    const contents = await Promise.all(
+      files.map(async (file) => {
+        const response = await fetch(`${baseUrl}${file}`);
+        if (!response.ok) {
+          console.error(`Failed to fetch ${file}: ${response.statusText}`);
+          return null;
+        }
+        return response.text();
+      })
+    );
+    files.forEach((file, i) => {
+      const content = contents[i];
+      if (content !== null) pyodide.FS.writeFile(`/home/pyodide/qnm/${file}`, content);
+    });
   }
 
   // Add to sys.path
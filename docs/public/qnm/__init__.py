@@ -1,19 +1,113 @@
-from .bfgs import bfgs
-from .lbfgs import lbfgs
-from .lbfgsb import lbfgsb
-from .line_search import line_search
-from .problems import Problem, quadratic_problem, rosenbrock_problem
-from .utils import OptimizeResult, gradient_check
-
-__all__ = [
-    "bfgs",
-    "lbfgs",
-    "lbfgsb",
-    "line_search",
-    "Problem",
-    "quadratic_problem",
-    "rosenbrock_problem",
-    "OptimizeResult",
-    "gradient_check",
-]
+"""Evidence-first quasi-Newton methods.
 
+Submodules are imported lazily on first attribute access (PEP 562), so
+``import qnm`` is cheap and ``from qnm import lbfgs`` only loads what the
+solver needs. This matters most for the Pyodide build used by the docs.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING, Any
+
+# Exported name -> defining submodule
+_EXPORTS = {
+    "bfgs": ".bfgs",
+    "lbfgs": ".lbfgs",
+    "lbfgsb": ".lbfgsb",
+    "DenseInverseHessian": ".inverse_hessian",
+    "LBFGSInverseHessian": ".inverse_hessian",
+    "lbfgs_out_of_core": ".out_of_core",
+    "lbfgs_distributed": ".distributed",
+    "run_distributed": ".distributed",
+    "line_search": ".line_search",
+    "FiniteSumProblem": ".finite_sum",
+    "finite_sum_problem": ".finite_sum",
+    "minimize": ".minimize",
+    "plan_solver": ".minimize",
+    "SolverPlan": ".minimize",
+    "ElementFunction": ".partially_separable",
+    "PartiallySeparable": ".partially_separable",
+    "psqn": ".partially_separable",
+    "solve_many": ".parallel",
+    "ThroughputReport": ".parallel",
+    "DiagonalInverseHessian": ".preconditioner",
+    "Problem": ".problems",
+    "quadratic_problem": ".problems",
+    "householder_quadratic_problem": ".problems",
+    "rosenbrock_problem": ".problems",
+    "least_squares_problem": ".problems",
+    "logistic_regression_problem": ".problems",
+    "softmax_regression_problem": ".problems",
+    "BFGSSolver": ".solvers",
+    "LBFGSSolver": ".solvers",
+    "sr1": ".sr1",
+    "lsr1": ".sr1",
+    "lbfgs_stochastic": ".stochastic",
+    "TelemetryRegistry": ".telemetry",
+    "enable_telemetry": ".telemetry",
+    "disable_telemetry": ".telemetry",
+    "TraceRecorder": ".trace",
+    "OptimizeResult": ".utils",
+    "gradient_check": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .bfgs import bfgs
+    from .distributed import lbfgs_distributed, run_distributed
+    from .finite_sum import FiniteSumProblem, finite_sum_problem
+    from .inverse_hessian import DenseInverseHessian, LBFGSInverseHessian
+    from .lbfgs import lbfgs
+    from .lbfgsb import lbfgsb
+    from .line_search import line_search
+    from .minimize import SolverPlan, minimize, plan_solver
+    from .out_of_core import lbfgs_out_of_core
+    from .parallel import ThroughputReport, solve_many
+    from .partially_separable import ElementFunction, PartiallySeparable, psqn
+    from .preconditioner import DiagonalInverseHessian
+    from .problems import (
+        Problem,
+        householder_quadratic_problem,
+        least_squares_problem,
+        logistic_regression_problem,
+        quadratic_problem,
+        rosenbrock_problem,
+        softmax_regression_problem,
+    )
+    from .solvers import BFGSSolver, LBFGSSolver
+    from .sr1 import lsr1, sr1
+    from .stochastic import lbfgs_stochastic
+    from .telemetry import TelemetryRegistry, disable_telemetry, enable_telemetry
+    from .trace import TraceRecorder
+    from .utils import OptimizeResult, gradient_check
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+class _LazyPackage(types.ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Importing a submodule binds it on the package (e.g. ``qnm.bfgs``).
+        # Several submodules share their name with the function they export, so
+        # keep those attributes resolving to the exported object instead.
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyPackage
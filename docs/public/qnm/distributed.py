@@ -0,0 +1,382 @@
+"""L-BFGS on a decision vector partitioned across processes (SPMD).
+
+Every worker process owns a contiguous slice of ``x`` and of the gradient and
+runs the same driver, ``lbfgs_distributed``, on its slice. Dot products are
+local partial sums followed by an all-reduce through a ``multiprocessing``
+shared-memory block (``SharedMemoryComm``), so the full vector is never
+gathered during the solve. Since every all-reduce is a barrier round-trip,
+independent dot products share one reduction: each rank keeps the Gram matrix
+``S Y^T`` of the history (as in ``two_loop_recursion_block``), so the two-loop
+recursion needs two reductions and a new pair one more, and the curvature
+test reduces ``y^T s``, ``s^T s`` and ``y^T y`` together. All ranks add the
+partial sums in rank order and so see bit-identical scalars and take the same
+branches. The iterates equal those of the single-process ``lbfgs`` up to
+rounding.
+
+``run_distributed`` starts the workers, splits ``x0`` and gathers the slices
+of the result.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import queue as queue_mod
+import threading
+import traceback
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+
+from .line_search import line_search
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, ensure_1d
+
+LocalFunctions = Tuple[Callable[[np.ndarray], float], Callable[[np.ndarray], np.ndarray]]
+
+# How often run_distributed checks that workers are alive while waiting for results
+_POLL_SECONDS = 0.1
+
+
+class SharedMemoryComm:
+    """Sum/max all-reduce of small vectors among ``n_workers`` processes.
+
+    The parent creates the communicator (one shared block of
+    ``2 x n_workers x width`` float64 values and a barrier) and passes it to
+    the worker processes, each of which calls ``attach(rank)``. A reduction
+    writes the local values into this rank's row, waits on the barrier and
+    reduces the rows in rank order. The two halves of the block alternate
+    between calls, so one barrier per reduction is enough: no rank can write
+    a half again before every rank has read it. Up to ``width`` values are
+    reduced per barrier; longer vectors take several. With ``timeout`` (in
+    seconds) a rank waiting longer than that for the others breaks the
+    barrier, so every rank fails with ``threading.BrokenBarrierError``.
+    """
+
+    def __init__(self, n_workers: int, width: int = 8, context=None, timeout: Optional[float] = None) -> None:
+        ctx = context or mp.get_context()
+        self.n_workers = n_workers
+        self.width = width
+        self.rank: Optional[int] = None
+        self._barrier = ctx.Barrier(n_workers, timeout=timeout)
+        self._shm = shared_memory.SharedMemory(create=True, size=2 * n_workers * width * 8)
+        # Forked workers inherit this object; only the creating process unlinks the block
+        self._owner_pid = os.getpid()
+        self._phase = 0
+        self._buffers = self._view()
+
+    def _view(self) -> np.ndarray:
+        return np.ndarray((2, self.n_workers, self.width), dtype=np.float64, buffer=self._shm.buf)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_shm"] = self._shm.name
+        state["_buffers"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        try:
+            self._shm = shared_memory.SharedMemory(name=state["_shm"], track=False)
+        except TypeError:  # Python < 3.13
+            self._shm = shared_memory.SharedMemory(name=state["_shm"])
+        self._buffers = self._view()
+
+    def attach(self, rank: int) -> "SharedMemoryComm":
+        if not 0 <= rank < self.n_workers:
+            raise ValueError(f"rank {rank} out of range for {self.n_workers} workers")
+        self.rank = rank
+        return self
+
+    def allreduce(self, values, op: str = "sum") -> np.ndarray:
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        k = values.size
+        if k > self.width:
+            return np.concatenate(
+                [self.allreduce(values[i : i + self.width], op) for i in range(0, k, self.width)]
+            )
+        buf = self._buffers[self._phase]
+        self._phase ^= 1
+        buf[self.rank, :k] = values
+        self._barrier.wait()
+        rows = buf[:, :k]
+        if op == "sum":
+            return rows.sum(axis=0)
+        if op == "max":
+            return rows.max(axis=0)
+        raise ValueError(f"unknown reduction {op!r}; expected 'sum' or 'max'")
+
+    def dot(self, a: np.ndarray, b: np.ndarray) -> float:
+        return float(self.allreduce(np.dot(a, b))[0])
+
+    def norm_inf(self, v: np.ndarray) -> float:
+        local = float(np.max(np.abs(v))) if v.size else 0.0
+        return float(self.allreduce(local, op="max")[0])
+
+    def abort(self) -> None:
+        """Break the barrier so that ranks blocked in a reduction fail instead of hanging."""
+        self._barrier.abort()
+
+    def close(self) -> None:
+        self._buffers = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+
+def lbfgs_distributed(
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    x0: np.ndarray,
+    comm: SharedMemoryComm,
+    m: int = 10,
+    max_iter: int = 200,
+    tol: float = 1e-6,
+    line_search_kwargs: Optional[dict] = None,
+) -> OptimizeResult:
+    """L-BFGS driver run by every rank on its slice of ``x``.
+
+    ``fun(x_local)`` returns this rank's contribution to ``f`` (the driver
+    sums them) and ``grad(x_local)`` this rank's slice of the gradient. Terms
+    that couple slices can be computed inside ``fun``/``grad`` with
+    ``comm.allreduce``; every rank calls ``fun`` and ``grad`` at the same
+    points and in the same order.
+
+    Same algorithm as ``qnm.lbfgs`` (Alg. 7.5, Nocedal & Wright) without the
+    optional stopping criteria. A line search ``deadline`` is rejected: ranks
+    could stop at different trials. The result holds this rank's slices of
+    ``x`` and ``grad`` and the global ``fun``.
+    """
+    line_search_kwargs = line_search_kwargs or {}
+    _check_line_search_kwargs(line_search_kwargs)
+    x = ensure_1d(x0)
+    dot = comm.dot
+
+    def f_global(x_local: np.ndarray) -> float:
+        return float(comm.allreduce(float(fun(x_local)))[0])
+
+    f = f_global(x)
+    g = grad(x)
+    n_fun = 1
+    n_grad = 1
+
+    s_history: Deque[np.ndarray] = deque()
+    y_history: Deque[np.ndarray] = deque()
+    # SY[i, j] = s_i^T y_j over the stored pairs, and y^T y of the newest pair
+    SY = np.empty((0, 0))
+    yy = 0.0
+
+    def result(n_iter: int, status: str) -> OptimizeResult:
+        return OptimizeResult(x, f, g, n_iter, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status])
+
+    for k in range(1, max_iter + 1):
+        if comm.norm_inf(g) <= tol:
+            return result(k - 1, "converged")
+
+        p = _two_loop_recursion(comm, g, s_history, y_history, SY, yy)
+        if dot(p, g) >= 0:
+            # Reset memory if direction is not descent.
+            s_history.clear()
+            y_history.clear()
+            SY = np.empty((0, 0))
+            p = -g
+
+        alpha, f_new, g_new, ls_fun, ls_grad = line_search(f_global, grad, x, p, f0=f, g0=g, dot=dot,
+                                                           **line_search_kwargs)
+        n_fun += ls_fun
+        n_grad += ls_grad
+        if alpha == 0.0:
+            return result(k - 1, "line_search_failed")
+
+        s = alpha * p
+        y = g_new - g
+        ys, ss, yy_new = comm.allreduce([np.dot(y, s), np.dot(s, s), np.dot(y, y)])
+        if ys <= 1e-12 * np.sqrt(ss * yy_new):
+            s_history.clear()
+            y_history.clear()
+            SY = np.empty((0, 0))
+        else:
+            SY = _push_pair(comm, s_history, y_history, SY, s, y, ys, m)
+            yy = yy_new
+        x, f, g = x + s, f_new, g_new
+
+    return result(max_iter, "max_iter")
+
+
+def _push_pair(
+    comm: SharedMemoryComm,
+    s_history: Deque[np.ndarray],
+    y_history: Deque[np.ndarray],
+    SY: np.ndarray,
+    s: np.ndarray,
+    y: np.ndarray,
+    ys: float,
+    m: int,
+) -> np.ndarray:
+    """Store ``(s, y)`` (dropping the oldest of ``m`` pairs) and return the extended Gram matrix.
+
+    The new row and column need ``s^T y_j`` and ``s_j^T y`` for the kept
+    pairs, reduced together.
+    """
+    if len(s_history) == m:
+        s_history.popleft()
+        y_history.popleft()
+        SY = SY[1:, 1:]
+    k = len(s_history)
+    new = np.empty((k + 1, k + 1))
+    new[:k, :k] = SY
+    new[k, k] = ys
+    if k:
+        cross = comm.allreduce(np.concatenate([np.array(s_history) @ y, np.array(y_history) @ s]))
+        new[:k, k] = cross[:k]
+        new[k, :k] = cross[k:]
+    s_history.append(s)
+    y_history.append(y)
+    return new
+
+
+def _two_loop_recursion(
+    comm: SharedMemoryComm,
+    g: np.ndarray,
+    s_history: Deque[np.ndarray],
+    y_history: Deque[np.ndarray],
+    SY: np.ndarray,
+    yy: float,
+) -> np.ndarray:
+    """``-H_k g`` for sharded vectors with two reductions (``S g`` and ``Y r``).
+
+    Same coefficients as ``qnm.lbfgs.two_loop_recursion_block``: the
+    corrections between the pairs come from the replicated Gram matrix ``SY``.
+    """
+    k = len(s_history)
+    if not k:
+        return -g
+    S = np.array(s_history)
+    Y = np.array(y_history)
+    rho = 1.0 / np.diag(SY)
+
+    # First loop (newest to oldest): a_i = rho_i s_i^T (g - sum_{j>i} y_j a_j)
+    Sg = comm.allreduce(S @ g)
+    a = np.empty(k)
+    for i in range(k - 1, -1, -1):
+        a[i] = rho[i] * (Sg[i] - SY[i, i + 1:] @ a[i + 1:])
+    # H_k^0 scaling factor (Eq. 7.20, p. 178)
+    r = (SY[-1, -1] / yy) * (g - Y.T @ a)
+
+    # Second loop (oldest to newest): b_i = rho_i y_i^T (r + sum_{j<i} s_j (a_j - b_j))
+    Yr = comm.allreduce(Y @ r)
+    b = np.empty(k)
+    for i in range(k):
+        b[i] = rho[i] * (Yr[i] + SY[:i, i] @ (a[:i] - b[:i]))
+    return -(r + S.T @ (a - b))
+
+
+def _check_line_search_kwargs(line_search_kwargs: dict) -> None:
+    if "deadline" in line_search_kwargs:
+        # Ranks would stop the search at different trials and wait on each other forever
+        raise ValueError("line_search_kwargs 'deadline' is not supported by the distributed driver")
+
+
+def _worker(setup, comm: SharedMemoryComm, rank: int, index: slice, x0_local: np.ndarray, kwargs: dict, queue) -> None:
+    try:
+        comm.attach(rank)
+        fun, grad = setup(comm, index)
+        res = lbfgs_distributed(fun, grad, x0_local, comm, **kwargs)
+        queue.put((rank, res, None))
+    except threading.BrokenBarrierError:
+        # Another rank failed and aborted the barrier; its own report carries the cause
+        queue.put((rank, None, None))
+    except BaseException:  # noqa: BLE001 - reported to the parent
+        comm.abort()
+        queue.put((rank, None, traceback.format_exc()))
+    finally:
+        comm.close()
+
+
+def _gather(procs: list, queue, comm: SharedMemoryComm) -> dict:
+    """``rank -> (result, traceback)`` from every worker, failing fast if one dies silently."""
+    outputs: dict = {}
+    while len(outputs) < len(procs):
+        try:
+            rank, res, err = queue.get(timeout=_POLL_SECONDS)
+        except queue_mod.Empty:
+            dead = [rank for rank, proc in enumerate(procs) if rank not in outputs and proc.exitcode is not None]
+            if not dead:
+                continue
+            try:
+                # A report sent before the worker exited is already in the pipe
+                rank, res, err = queue.get(timeout=_POLL_SECONDS)
+            except queue_mod.Empty:
+                comm.abort()
+                raise RuntimeError(
+                    f"distributed L-BFGS worker {dead[0]} exited with code {procs[dead[0]].exitcode} without reporting"
+                ) from None
+        outputs[rank] = (res, err)
+    return outputs
+
+
+def run_distributed(
+    setup: Callable[[SharedMemoryComm, slice], LocalFunctions],
+    x0: np.ndarray,
+    n_workers: int,
+    context=None,
+    barrier_timeout: Optional[float] = 600.0,
+    **kwargs,
+) -> OptimizeResult:
+    """Solve with ``n_workers`` local processes, each owning a contiguous slice of ``x0``.
+
+    ``setup(comm, index)`` runs in each worker and returns that rank's
+    ``(fun, grad)`` for ``lbfgs_distributed`` (``index`` is its slice of the
+    full vector; it must be picklable, e.g. a module-level function). Other
+    keyword arguments go to ``lbfgs_distributed``. Only the final slices are
+    sent back; ``n_fun``/``n_grad`` count evaluations per rank.
+
+    A ``RuntimeError`` is raised when a worker fails, exits without
+    reporting, or a rank waits more than ``barrier_timeout`` seconds for the
+    others in a reduction (``None`` waits indefinitely).
+    """
+    _check_line_search_kwargs(kwargs.get("line_search_kwargs") or {})
+    ctx = context or mp.get_context()
+    x0 = ensure_1d(x0)
+    bounds = np.cumsum([0] + [len(part) for part in np.array_split(np.arange(x0.size), n_workers)])
+    indices = [slice(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+    # Wide enough to extend the Gram matrix of the history in one reduction
+    width = max(8, 2 * kwargs.get("m", 10))
+    comm = SharedMemoryComm(n_workers, width=width, context=ctx, timeout=barrier_timeout)
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(setup, comm, rank, index, x0[index].copy(), kwargs, queue), daemon=True)
+        for rank, index in enumerate(indices)
+    ]
+    try:
+        for proc in procs:
+            proc.start()
+        # Drain the queue before joining so that workers never block on a full pipe
+        outputs = _gather(procs, queue, comm)
+        for proc in procs:
+            proc.join()
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        comm.close()
+
+    errors = [err for _, err in outputs.values() if err is not None]
+    if errors:
+        raise RuntimeError("distributed L-BFGS worker failed:\n" + errors[0])
+    if any(res is None for res, _ in outputs.values()):
+        raise RuntimeError(f"distributed L-BFGS reduction timed out after {barrier_timeout} s")
+    parts: List[OptimizeResult] = [outputs[rank][0] for rank in range(n_workers)]
+    head = parts[0]
+    return OptimizeResult(
+        np.concatenate([r.x for r in parts]),
+        head.fun,
+        np.concatenate([r.grad for r in parts]),
+        head.n_iter,
+        head.n_fun,
+        head.n_grad,
+        head.success,
+        head.status,
+        head.message,
+    )
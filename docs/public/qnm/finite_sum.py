@@ -0,0 +1,192 @@
+"""Finite-sum objectives ``f(x) = sum_i f_i(x)`` evaluated by a persistent process pool.
+
+``finite_sum_problem`` copies the data arrays once into
+``multiprocessing.shared_memory`` and starts one worker per row shard. Each
+evaluation writes ``x`` into a shared buffer, signals the workers, and each
+worker writes the fused value and gradient of its shard into its own row of a
+shared result block. The parent sums the rows in rank order, so results are
+deterministic. Only ``x`` travels to the workers; the data never moves after
+start-up.
+
+The returned ``FiniteSumProblem`` is a ``Problem``, so every qnm solver uses
+it unchanged. ``fun(x)`` and ``grad(x)`` at the same point share one pass.
+Close it (or use it as a context manager) to stop the pool.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import traceback
+import weakref
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .problems import Problem
+from .utils import ensure_1d
+
+# term(x, *shard_arrays) -> (value, gradient) summed over the shard's rows
+Term = Callable[..., Tuple[float, np.ndarray]]
+
+
+def least_squares_term(x: np.ndarray, A: np.ndarray, b: np.ndarray) -> Tuple[float, np.ndarray]:
+    """``0.5 * ||A x - b||^2`` over a block of rows and its gradient ``A^T (A x - b)``."""
+    r = A @ x - b
+    return 0.5 * float(r @ r), A.T @ r
+
+
+def _attach(name: str, shape: Tuple[int, ...], dtype: str) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _shard_worker(term: Term, specs: list, rows: slice, rank: int, conn) -> None:
+    handles = []
+    try:
+        views = []
+        for spec in specs:
+            shm, view = _attach(*spec)
+            handles.append(shm)
+            views.append(view)
+        x, out, *data = views
+        x.flags.writeable = False
+        shard = [arr[rows] for arr in data]
+        while conn.recv():
+            try:
+                f, g = term(x, *shard)
+                out[rank, 0] = f
+                out[rank, 1:] = g
+                conn.send(None)
+            except Exception:  # noqa: BLE001 - reported to the parent
+                conn.send(traceback.format_exc())
+    finally:
+        for shm in handles:
+            shm.close()
+
+
+class ShardPool:
+    """Worker processes that each evaluate ``term`` on a fixed row shard of shared data."""
+
+    def __init__(self, term: Term, data: Sequence[np.ndarray], n: int, n_workers: Optional[int] = None,
+                 context=None) -> None:
+        ctx = context or mp.get_context()
+        data = [np.asarray(arr) for arr in data]
+        n_rows = data[0].shape[0]
+        if any(arr.shape[0] != n_rows for arr in data):
+            raise ValueError("all data arrays must have the same number of rows")
+        n_workers = min(n_workers or os.cpu_count() or 1, n_rows)
+        self.n_workers = n_workers
+        self.n_passes = 0
+
+        self._shms: List[shared_memory.SharedMemory] = []
+        specs = []
+        for shape, dtype, source in [((n,), np.float64, None), ((n_workers, n + 1), np.float64, None)] + [
+            (arr.shape, arr.dtype, arr) for arr in data
+        ]:
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._shms.append(shm)
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            if source is not None:
+                view[...] = source
+            specs.append((shm.name, shape, np.dtype(dtype).str))
+        self._x = np.ndarray((n,), dtype=np.float64, buffer=self._shms[0].buf)
+        self._out = np.ndarray((n_workers, n + 1), dtype=np.float64, buffer=self._shms[1].buf)
+
+        bounds = np.cumsum([0] + [len(p) for p in np.array_split(np.arange(n_rows), n_workers)])
+        self._conns = []
+        self._procs = []
+        for rank in range(n_workers):
+            parent, child = ctx.Pipe()
+            rows = slice(int(bounds[rank]), int(bounds[rank + 1]))
+            proc = ctx.Process(target=_shard_worker, args=(term, specs, rows, rank, child), daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._finalizer = weakref.finalize(self, _shutdown, self._conns, self._procs, self._shms)
+
+    def evaluate(self, x: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Sum of ``term`` over all shards at ``x``."""
+        self._x[:] = x
+        for conn in self._conns:
+            conn.send(True)
+        errors = [err for err in (conn.recv() for conn in self._conns) if err is not None]
+        if errors:
+            raise RuntimeError("finite-sum worker failed:\n" + errors[0])
+        self.n_passes += 1
+        return float(self._out[:, 0].sum()), self._out[:, 1:].sum(axis=0)
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def _shutdown(conns, procs, shms) -> None:
+    for conn in conns:
+        try:
+            conn.send(False)
+        except OSError:
+            pass
+    for proc in procs:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+    for shm in shms:
+        shm.close()
+        shm.unlink()
+
+
+@dataclass
+class FiniteSumProblem(Problem):
+    """``Problem`` backed by a ``ShardPool``; ``pool.n_passes`` counts data passes."""
+
+    pool: Optional[ShardPool] = field(default=None, repr=False)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+
+    def __enter__(self) -> "FiniteSumProblem":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def finite_sum_problem(
+    term: Term,
+    data: Sequence[np.ndarray],
+    x0: np.ndarray,
+    n_workers: Optional[int] = None,
+    name: str = "finite_sum",
+    context=None,
+) -> FiniteSumProblem:
+    """Problem ``f(x) = sum over row shards of term(x, *shard)``.
+
+    ``data`` arrays share their first (row) dimension and are split into
+    contiguous row shards, one per worker. ``term(x, *shard_arrays)`` returns
+    the value and gradient summed over the rows it is given, and must be
+    picklable (a module-level function such as ``least_squares_term``).
+    """
+    x0 = ensure_1d(x0)
+    pool = ShardPool(term, data, x0.size, n_workers=n_workers, context=context)
+    cache: dict = {}
+
+    def value_and_grad(x: np.ndarray) -> Tuple[float, np.ndarray]:
+        x = ensure_1d(x)
+        last = cache.get("x")
+        if last is None or not np.array_equal(last, x):
+            cache["x"] = x.copy()
+            cache["fg"] = pool.evaluate(x)
+        return cache["fg"]
+
+    def fun(x: np.ndarray) -> float:
+        return value_and_grad(x)[0]
+
+    def grad(x: np.ndarray) -> np.ndarray:
+        return value_and_grad(x)[1].copy()
+
+    return FiniteSumProblem(name=name, fun=fun, grad=grad, x0=x0, pool=pool)
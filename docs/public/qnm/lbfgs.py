@@ -1,23 +1,31 @@
 from __future__ import annotations
 
+import time
 from collections import deque
-from typing import Callable, Deque, Optional, Tuple
+from typing import Any, Callable, Deque, Optional, Tuple
 
 import numpy as np
 
-from .line_search import line_search
-from .utils import OptimizeResult, ensure_1d, grad_norm
+from .inverse_hessian import LBFGSInverseHessian
+from .line_search import INITIAL_STEP_STRATEGIES, NonmonotoneReference, initial_step_length, line_search
+from .preconditioner import as_inverse_hessian_apply
+from .telemetry import get_registry, record_solve
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, StoppingMonitor, ensure_1d, grad_norm
 
 
 def two_loop_recursion(
     grad_k: np.ndarray,
     s_history: Deque[np.ndarray],
     y_history: Deque[np.ndarray],
+    H0: Any = None,
 ) -> np.ndarray:
     """Compute -H_k * grad_k using the L-BFGS two-loop recursion.
 
     Following Algorithm 7.4 in Nocedal & Wright,
     'Numerical Optimization' (2nd Ed, 2006, p. 178).
+
+    ``H0`` replaces the scalar ``gamma * I`` initial matrix when given; see
+    ``qnm.preconditioner.as_inverse_hessian_apply`` for the accepted forms.
     """
     q = grad_k.copy()
     alpha_list: list[float] = []
@@ -30,14 +38,17 @@ def two_loop_recursion(
         alpha_list.append(alpha)
         q = q - alpha * y
 
-    if y_history:
+    apply_H0 = as_inverse_hessian_apply(H0)
+    if apply_H0 is not None:
+        r = apply_H0(q)
+    elif y_history:
         last_s = s_history[-1]
         last_y = y_history[-1]
         # H_k^0 scaling factor (Eq. 7.20, p. 178)
         gamma = float(np.dot(last_s, last_y) / np.dot(last_y, last_y))
+        r = gamma * q
     else:
-        gamma = 1.0
-    r = gamma * q
+        r = q
 
     for (s, y, alpha, rho) in zip(s_history, y_history, reversed(alpha_list), reversed(rho_list)):
         beta = rho * float(np.dot(y, r))
@@ -46,22 +57,204 @@ def two_loop_recursion(
     return -r
 
 
+def two_loop_recursion_block(
+    G: np.ndarray,
+    s_history: Deque[np.ndarray],
+    y_history: Deque[np.ndarray],
+    H0: Any = None,
+) -> np.ndarray:
+    """Compute -H_k @ G for an (n, k) block of right-hand sides.
+
+    Same recursion as ``two_loop_recursion`` applied to every column, but the
+    level-1 passes are fused into level-3 products: with ``S`` and ``Y`` the
+    (m, n) stacked history, the coefficients of both loops only need
+    ``S @ G``, ``Y @ R0`` and the (m, m) Gram matrix ``S @ Y.T``, so the loops
+    run on (m, k) arrays and the vectors are touched by four GEMMs. An
+    operator ``H0`` is applied to the whole block through its ``matmat`` when
+    it has one, column by column otherwise.
+    """
+    G = np.asarray(G, dtype=float)
+    if G.ndim != 2:
+        raise ValueError("G must be a 2D (n, k) array")
+    m = len(s_history)
+    if m:
+        S = np.array(s_history)
+        Y = np.array(y_history)
+        SY = S @ Y.T
+        rho = 1.0 / np.diag(SY)
+
+        # First loop (newest to oldest): a_i = rho_i s_i^T (G - sum_{j>i} y_j a_j)
+        SG = S @ G
+        a = np.empty_like(SG)
+        for i in range(m - 1, -1, -1):
+            a[i] = rho[i] * (SG[i] - SY[i, i + 1:] @ a[i + 1:])
+        Q = G - Y.T @ a
+    else:
+        Q = G.copy()
+
+    if H0 is not None:
+        H0_arr = None if (hasattr(H0, "matvec") or callable(H0)) else np.asarray(H0, dtype=float)
+        if hasattr(H0, "matmat"):
+            R = np.asarray(H0.matmat(Q), dtype=float)
+        elif H0_arr is None:
+            apply_H0 = as_inverse_hessian_apply(H0)
+            R = np.column_stack([apply_H0(q) for q in Q.T]) if Q.shape[1] else Q
+        elif H0_arr.ndim <= 1:
+            R = H0_arr.reshape(-1, 1) * Q
+        else:
+            R = H0_arr @ Q
+    elif m:
+        # H_k^0 scaling factor (Eq. 7.20, p. 178)
+        gamma = float(SY[-1, -1] / np.dot(Y[-1], Y[-1]))
+        R = gamma * Q
+    else:
+        R = Q
+
+    if m:
+        # Second loop (oldest to newest): b_i = rho_i y_i^T (R0 + sum_{j<i} s_j (a_j - b_j))
+        YR = Y @ R
+        b = np.empty_like(YR)
+        for i in range(m):
+            b[i] = rho[i] * (YR[i] + SY[:i, i] @ (a[:i] - b[:i]))
+        R = R + S.T @ (a - b)
+
+    return -R
+
+
+class AdaptiveHistory:
+    """Active L-BFGS history size ``m``, adapted between ``m_min`` and ``m_max``.
+
+    - Slow progress grows ``m`` by one: the decrease of f in an iteration is
+      more than ``grow_ratio`` times that of the previous iteration (linear
+      convergence with a poor rate, where more curvature pairs help most).
+    - With ``cost_ratio`` set, ``m`` shrinks by one (and does not grow) while
+      the two-loop recursion takes longer than ``cost_ratio`` times the
+      function/gradient evaluations of the same iteration.
+    - A new pair whose step is nearly collinear with the newest stored step
+      (``|cos| >= 1 - collinear_tol``) replaces it instead of being appended,
+      since it adds almost no new curvature information; ``push`` returns
+      whether that happened.
+
+    ``lbfgs`` calls ``reset`` at the start of every solve, so an instance can
+    be reused.
+    """
+
+    def __init__(
+        self,
+        m_min: int = 3,
+        m_max: int = 20,
+        grow_ratio: float = 0.5,
+        cost_ratio: Optional[float] = None,
+        collinear_tol: float = 1e-3,
+    ) -> None:
+        if not 1 <= m_min <= m_max:
+            raise ValueError("require 1 <= m_min <= m_max")
+        self.m_min = m_min
+        self.m_max = m_max
+        self.grow_ratio = grow_ratio
+        self.cost_ratio = cost_ratio
+        self.collinear_tol = collinear_tol
+        self.m = m_min
+        self._df_prev: Optional[float] = None
+
+    def reset(self) -> None:
+        self.m = self.m_min
+        self._df_prev = None
+
+    def push(self, s_history: Deque[np.ndarray], y_history: Deque[np.ndarray], s: np.ndarray, y: np.ndarray) -> bool:
+        replaced = False
+        if s_history:
+            s_last = s_history[-1]
+            cos = abs(float(np.dot(s, s_last))) / (np.linalg.norm(s) * np.linalg.norm(s_last))
+            if cos >= 1.0 - self.collinear_tol:
+                s_history.pop()
+                y_history.pop()
+                replaced = True
+        s_history.append(s)
+        y_history.append(y)
+        self.trim(s_history, y_history)
+        return replaced
+
+    def trim(self, s_history: Deque[np.ndarray], y_history: Deque[np.ndarray]) -> None:
+        while len(s_history) > self.m:
+            s_history.popleft()
+            y_history.popleft()
+
+    def update(self, df: float, t_direction: float, t_eval: float) -> None:
+        """Adapt ``m`` from the decrease ``df`` of f and the iteration's timings."""
+        too_costly = self.cost_ratio is not None and t_direction > self.cost_ratio * t_eval
+        if too_costly:
+            self.m = max(self.m - 1, self.m_min)
+        elif self._df_prev is not None and df > self.grow_ratio * self._df_prev:
+            self.m = min(self.m + 1, self.m_max)
+        self._df_prev = df
+
+
 def lbfgs(
     fun: Callable[[np.ndarray], float],
     grad: Callable[[np.ndarray], np.ndarray],
     x0: np.ndarray,
-    m: int = 10,
+    m: int | str | AdaptiveHistory = 10,
     max_iter: int = 200,
     tol: float = 1e-6,
     line_search_kwargs: Optional[dict] = None,
-    callback: Optional[Callable[[OptimizeResult], None]] = None,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+    H0: Any = None,
+    max_fun: Optional[int] = None,
+    max_grad: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    ftol: Optional[float] = None,
+    xtol: Optional[float] = None,
+    stall_window: Optional[int] = None,
+    initial_step: str = "unit",
+    nonmonotone: Optional[str | NonmonotoneReference] = None,
+    m_min: int = 3,
+    m_max: int = 20,
 ) -> OptimizeResult:
     """Limited-memory BFGS with strong-Wolfe line search.
 
     This implementation follows the L-BFGS method described in Chapter 7
     of Nocedal & Wright, 'Numerical Optimization' (2nd Ed, 2006).
+
+    ``H0`` is an optional initial inverse Hessian (preconditioner) used inside
+    the two-loop recursion instead of ``gamma * I``. Objects with an
+    ``update(s, y)`` method (e.g. ``DiagonalInverseHessian``) are updated with
+    every accepted curvature pair.
+
+    Besides ``tol`` (gradient inf-norm) and ``max_iter``, the run stops on the
+    optional criteria of ``StoppingMonitor``: evaluation budgets ``max_fun`` /
+    ``max_grad``, a wall-clock ``time_limit`` in seconds, relative reduction
+    ``ftol``, step size ``xtol`` and a ``stall_window`` without decrease.
+    ``status`` names the criterion that fired (see ``STATUS_MESSAGES``); a
+    ``callback`` that returns ``True`` stops the run with status ``"callback"``.
+
+    ``initial_step`` selects the line search's first trial step: ``"unit"``,
+    ``"inverse_gnorm"``, ``"interpolate"`` or ``"carry"`` (see
+    ``initial_step_length``). ``line_search_kwargs={"method": "hager_zhang"}``
+    switches to the approximate-Wolfe line search for high-accuracy solves.
+
+    ``nonmonotone="gll"`` or ``"zhang_hager"`` (or a fresh
+    ``NonmonotoneReference``) measures sufficient decrease from a reference
+    value over recent iterates, so f may increase temporarily; ``ftol`` then
+    measures the reduction of that reference.
+
+    ``m="adaptive"`` adapts the history size between ``m_min`` and ``m_max``
+    (see ``AdaptiveHistory``; pass an instance for other thresholds). The size
+    in use at termination is reported as ``history_size``.
     """
     line_search_kwargs = line_search_kwargs or {}
+    if initial_step not in INITIAL_STEP_STRATEGIES:
+        raise ValueError(f"unknown initial step strategy {initial_step!r}; expected one of {INITIAL_STEP_STRATEGIES}")
+    monitor = StoppingMonitor(max_fun, max_grad, time_limit, ftol, xtol, stall_window)
+    registry = get_registry()
+    t_start = time.perf_counter()
+    reference = NonmonotoneReference(nonmonotone) if isinstance(nonmonotone, str) else nonmonotone
+    adaptive = AdaptiveHistory(m_min, m_max) if m == "adaptive" else m
+    if isinstance(adaptive, AdaptiveHistory):
+        adaptive.reset()
+        m = adaptive.m_max
+    else:
+        adaptive = None
     x = ensure_1d(x0)
     n_fun = 0
     n_grad = 0
@@ -70,50 +263,105 @@ def lbfgs(
     g = grad(x)
     n_fun += 1
     n_grad += 1
+    if reference is not None:
+        reference.update(f)
 
     s_history: Deque[np.ndarray] = deque(maxlen=m)
     y_history: Deque[np.ndarray] = deque(maxlen=m)
 
+    def result(n_iter: int, status: str) -> OptimizeResult:
+        res = OptimizeResult(
+            x, f, g, n_iter, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status],
+            inverse_hessian=LBFGSInverseHessian(s_history, y_history, H0=H0, n=x.size),
+            history_size=m if adaptive is None else adaptive.m,
+        )
+        record_solve(registry, "lbfgs", res, t_start)
+        return res
+
+    df_prev: Optional[float] = None
+    alpha_prev: Optional[float] = None
+
     for k in range(1, max_iter + 1):
         if grad_norm(g) <= tol:
-            return OptimizeResult(x, f, g, k - 1, n_fun, n_grad, True, "converged", "Gradient norm below tolerance")
+            return result(k - 1, "converged")
+        status = monitor.budget_status(n_fun, n_grad)
+        if status is not None:
+            return result(k - 1, status)
 
-        p = two_loop_recursion(g, s_history, y_history)
+        t0 = time.perf_counter()
+        p = two_loop_recursion(g, s_history, y_history, H0=H0)
+        t_direction = time.perf_counter() - t0
+        steepest = H0 is None
         if np.dot(p, g) >= 0:
             # Reset memory if direction is not descent.
             s_history.clear()
             y_history.clear()
             p = -g
+            steepest = True
+            df_prev = alpha_prev = None
+            if registry is not None:
+                registry.increment("resets_total", solver="lbfgs", reason="not_descent")
 
-        alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **line_search_kwargs)
+        ls_kwargs = {**line_search_kwargs, **monitor.line_search_budget(n_fun, n_grad)}
+        if initial_step != "unit":
+            ls_kwargs["alpha0"] = initial_step_length(initial_step, g, p, df_prev, alpha_prev, steepest)
+        if reference is not None:
+            ls_kwargs["f_ref"] = reference.value
+        alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **ls_kwargs)
+        if registry is not None:
+            registry.observe("line_search_evals", ls_fun, solver="lbfgs")
+        t_eval = time.perf_counter() - t0 - t_direction
         n_fun += ls_fun
         n_grad += ls_grad
 
         s = alpha * p
         if alpha == 0.0:
-            return OptimizeResult(x, f, g, k - 1, n_fun, n_grad, False, "line_search_failed", "Line search failed to find descent")
+            return result(k - 1, monitor.budget_status(n_fun, n_grad) or "line_search_failed")
 
         x_new = x + s
         y = g_new - g
         ys = float(np.dot(y, s))
-        if ys <= 1e-12:
+        replaced = False
+        if ys <= 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+            if registry is not None:
+                registry.increment("resets_total", solver="lbfgs", reason="curvature")
             s_history.clear()
             y_history.clear()
         else:
-            s_history.append(s)
-            y_history.append(y)
+            if adaptive is not None:
+                adaptive.update(f - f_new, t_direction, t_eval)
+                replaced = adaptive.push(s_history, y_history, s, y)
+            else:
+                s_history.append(s)
+                y_history.append(y)
+            if hasattr(H0, "update"):
+                H0.update(s, y)
 
+        f_prev = f
         x, f, g = x_new, f_new, g_new
+        df_prev, alpha_prev = f_prev - f, float(alpha)
+        if reference is not None:
+            # Progress tests measure the decrease of the reference value
+            f_prev = reference.value
+            reference.update(f)
 
         if callback is not None:
             res = OptimizeResult(x, f, g, k, n_fun, n_grad, True, "iter", "In-progress")
-            # Attach s_history and y_history for visualization
+            # Attach s_history and y_history for visualization (the stored pairs are never modified in place)
             res.extra_info = {
                 "alpha": float(alpha),
-                "s_history": [s_i.tolist() for s_i in s_history],
-                "y_history": [y_i.tolist() for y_i in y_history]
+                "m": m if adaptive is None else adaptive.m,
+                "s_history": list(s_history),
+                "y_history": list(y_history),
+                # The new pair took the place of the previous newest one
+                "pair_replaced": replaced,
             }
-            callback(res)
+            if callback(res) is True:
+                return result(k, "callback")
+
+        status = monitor.progress_status(f_prev, f, s, x)
+        if status is not None:
+            return result(k, status)
 
-    return OptimizeResult(x, f, g, max_iter, n_fun, n_grad, False, "max_iter", "Reached maximum iterations")
+    return result(max_iter, "max_iter")
 
@@ -1,12 +1,32 @@
 from __future__ import annotations
 
-from typing import Callable, Tuple
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
 
 import numpy as np
 
 from .utils import ensure_1d
 
 
+class _SearchBudget:
+    """Evaluation/time budget of one line search and the best point seen."""
+
+    def __init__(self, max_evals: Optional[int], deadline: Optional[float], f0: float, g0: np.ndarray) -> None:
+        self.max_evals = max_evals
+        self.deadline = deadline
+        self.best: Tuple[float, float, np.ndarray] = (0.0, f0, g0)
+
+    def exhausted(self, n_evals: int) -> bool:
+        if self.max_evals is not None and n_evals >= self.max_evals:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def observe(self, alpha: float, f: float, g: np.ndarray) -> None:
+        if f < self.best[1]:
+            self.best = (alpha, f, g)
+
+
 def _strong_wolfe(
     fun: Callable[[np.ndarray], float],
     grad: Callable[[np.ndarray], np.ndarray],
@@ -19,26 +39,40 @@ def _strong_wolfe(
     c2: float,
     max_iter: int,
     alpha_max: float,
+    trial_point: Optional[Callable[[float], np.ndarray]] = None,
+    dot: Callable[[np.ndarray, np.ndarray], float] = np.dot,
+    max_evals: Optional[int] = None,
+    deadline: Optional[float] = None,
+    f_ref: Optional[float] = None,
 ) -> Tuple[float, float, np.ndarray, int, int]:
     """Line search satisfying strong Wolfe conditions (Nocedal-Wright, Alg. 3.5).
 
     The strong Wolfe conditions (Eq. 3.7, p. 34) are:
     1. f(xk + alpha*pk) <= f(xk) + c1 * alpha * grad_f(xk).T @ pk (Sufficient decrease)
     2. |grad_f(xk + alpha*pk).T @ pk| <= c2 * |grad_f(xk).T @ pk| (Curvature condition)
+
+    When ``max_evals`` evaluations have been spent or ``deadline``
+    (``time.perf_counter()`` value) has passed, the search stops and returns the
+    lowest trial point seen so far (``alpha = 0`` if none decreased f).
+
+    With ``f_ref`` (>= f0) the sufficient decrease condition is measured from
+    ``f_ref`` instead of ``f(xk)`` and the curvature condition takes its weak
+    form (Eq. 3.6b): the nonmonotone Wolfe conditions of Zhang & Hager (2004).
     """
     n_fun = 0
     n_grad = 0
     phi0 = f0
-    derphi0 = float(np.dot(g0, pk))
+    phi_ref = phi0 if f_ref is None else max(f_ref, phi0)
+    derphi0 = float(dot(g0, pk))
     if derphi0 >= 0:
         # Not a descent direction; fallback to tiny step.
         return 0.0, f0, g0, n_fun, n_grad
 
     def eval_phi(alpha: float) -> Tuple[float, np.ndarray, float]:
-        x_new = xk + alpha * pk
+        x_new = xk + alpha * pk if trial_point is None else trial_point(alpha)
         f_new = float(fun(x_new))
         g_new = grad(x_new)
-        return f_new, g_new, float(np.dot(g_new, pk))
+        return f_new, g_new, float(dot(g_new, pk))
 
     alpha_prev = 0.0
     f_prev = phi0
@@ -47,25 +81,31 @@ def _strong_wolfe(
     f_curr = phi0
     g_curr = g0
     derphi = derphi0
+    budget = _SearchBudget(max_evals, deadline, f0, g0)
 
     for i in range(max_iter):
+        if budget.exhausted(n_fun):
+            return (*budget.best, n_fun, n_grad)
         f_curr, g_curr, derphi = eval_phi(alpha)
         n_fun += 1
         n_grad += 1
+        budget.observe(alpha, f_curr, g_curr)
 
         # Sufficient decrease condition (Eq. 3.7a, p. 33)
-        if (f_curr > phi0 + c1 * alpha * derphi0) or (i > 0 and f_curr >= f_prev):
+        if (f_curr > phi_ref + c1 * alpha * derphi0) or (i > 0 and f_curr >= f_prev):
             return _zoom(
-                fun, grad, xk, pk, phi0, derphi0, alpha_prev, alpha, f_prev, derphi_prev, c1, c2, max_iter, alpha_max, n_fun, n_grad
+                fun, grad, xk, pk, phi_ref, derphi0, alpha_prev, alpha, f_prev, derphi_prev, c1, c2, max_iter, alpha_max, n_fun, n_grad,
+                trial_point, dot, budget,
             )
 
         # Curvature condition (Eq. 3.7b, p. 34)
-        if abs(derphi) <= -c2 * derphi0:
+        if abs(derphi) <= -c2 * derphi0 or (f_ref is not None and derphi >= c2 * derphi0):
             return alpha, f_curr, g_curr, n_fun, n_grad
 
         if derphi >= 0:
             return _zoom(
-                fun, grad, xk, pk, phi0, derphi0, alpha, alpha_prev, f_curr, derphi, c1, c2, max_iter, alpha_max, n_fun, n_grad
+                fun, grad, xk, pk, phi_ref, derphi0, alpha, alpha_prev, f_curr, derphi, c1, c2, max_iter, alpha_max, n_fun, n_grad,
+                trial_point, dot, budget,
             )
 
         alpha_prev = alpha
@@ -93,6 +133,9 @@ def _zoom(
     alpha_max: float,
     n_fun: int,
     n_grad: int,
+    trial_point: Optional[Callable[[float], np.ndarray]] = None,
+    dot: Callable[[np.ndarray, np.ndarray], float] = np.dot,
+    budget: Optional[_SearchBudget] = None,
 ) -> Tuple[float, float, np.ndarray, int, int]:
     """Zoom phase of strong-Wolfe line search (Algorithm 3.6, p. 61)."""
     alpha = alo
@@ -101,16 +144,20 @@ def _zoom(
     derphi = derphi_lo
 
     def eval_phi(a: float) -> Tuple[float, np.ndarray, float]:
-        x_new = xk + a * pk
+        x_new = xk + a * pk if trial_point is None else trial_point(a)
         f_new = float(fun(x_new))
         g_new = grad(x_new)
-        return f_new, g_new, float(np.dot(g_new, pk))
+        return f_new, g_new, float(dot(g_new, pk))
 
     for _ in range(max_iter):
+        if budget is not None and budget.exhausted(n_fun):
+            return (*budget.best, n_fun, n_grad)
         alpha = 0.5 * (alo + ahi)
         f_curr, g_curr, derphi = eval_phi(alpha)
         n_fun += 1
         n_grad += 1
+        if budget is not None:
+            budget.observe(alpha, f_curr, g_curr)
 
         if (f_curr > phi0 + c1 * alpha * derphi0) or (f_curr >= f_lo):
             ahi = alpha
@@ -129,6 +176,152 @@ def _zoom(
     return alpha, f_curr, g_curr, n_fun, n_grad
 
 
+class _Stop(Exception):
+    """Ends a Hager-Zhang search: ``alpha`` is accepted, or ``None`` when out of budget."""
+
+    def __init__(self, alpha: Optional[float]) -> None:
+        super().__init__(alpha)
+        self.alpha = alpha
+
+
+def _hager_zhang(
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    xk: np.ndarray,
+    pk: np.ndarray,
+    f0: float,
+    g0: np.ndarray,
+    alpha0: float,
+    c1: float,
+    c2: float,
+    max_iter: int,
+    alpha_max: float,
+    trial_point: Optional[Callable[[float], np.ndarray]] = None,
+    dot: Callable[[np.ndarray, np.ndarray], float] = np.dot,
+    max_evals: Optional[int] = None,
+    deadline: Optional[float] = None,
+    epsilon: float = 1e-6,
+    theta: float = 0.5,
+    gamma: float = 0.66,
+    rho: float = 5.0,
+    f_ref: Optional[float] = None,
+) -> Tuple[float, float, np.ndarray, int, int]:
+    """Approximate-Wolfe line search of Hager & Zhang (CG_DESCENT, ACM TOMS 32(1), 2006).
+
+    A step is accepted when it satisfies the Wolfe conditions (Eq. 3.6, p. 34,
+    with ``c1 = delta``, ``c2 = sigma``) or the approximate Wolfe conditions
+
+        (2*c1 - 1) * phi'(0) >= phi'(alpha) >= c2 * phi'(0),
+        phi(alpha) <= phi(0) + epsilon * |phi(0)|.
+
+    These only compare derivatives, which remain accurate near a minimizer
+    where differences of f are rounding noise. The bracket ``[a, b]`` with
+    ``phi'(a) < 0 <= phi'(b)`` and ``phi(a) <= phi(0) + epsilon * |phi(0)|`` is
+    shrunk by double secant steps (``secant2``), with a bisection whenever an
+    iteration fails to shrink it by the factor ``gamma``. ``max_iter`` caps
+    the number of evaluations. With ``f_ref`` (>= f0) both conditions are
+    measured from ``f_ref`` instead of ``phi(0)`` (nonmonotone line search).
+    """
+    derphi0 = float(dot(g0, pk))
+    if derphi0 >= 0:
+        return 0.0, f0, g0, 0, 0
+
+    f_ref = f0 if f_ref is None else max(f_ref, f0)
+    f_bound = f_ref + epsilon * abs(f0)
+    budget = _SearchBudget(max_evals, deadline, f0, g0)
+    values = {0.0: (f0, g0, derphi0)}
+    n_evals = 0
+
+    def phi(alpha: float) -> Tuple[float, float]:
+        nonlocal n_evals
+        if alpha in values:
+            f, _, d = values[alpha]
+            return f, d
+        if n_evals >= max_iter or budget.exhausted(n_evals):
+            raise _Stop(None)
+        x_new = xk + alpha * pk if trial_point is None else trial_point(alpha)
+        f = float(fun(x_new))
+        g = grad(x_new)
+        d = float(dot(g, pk))
+        n_evals += 1
+        values[alpha] = (f, g, d)
+        budget.observe(alpha, f, g)
+        curvature = d >= c2 * derphi0
+        wolfe = f - f_ref <= c1 * alpha * derphi0
+        approx_wolfe = (2.0 * c1 - 1.0) * derphi0 >= d and f <= f_bound
+        if curvature and (wolfe or approx_wolfe):
+            raise _Stop(alpha)
+        return f, d
+
+    def bisect(a: float, b: float) -> Tuple[float, float]:
+        # Update step U3: phi'(b) < 0 but phi(b) is too large
+        while True:
+            c = (1.0 - theta) * a + theta * b
+            if not a < c < b:
+                raise _Stop(None)
+            fc, dc = phi(c)
+            if dc >= 0:
+                return a, c
+            if fc <= f_bound:
+                a = c
+            else:
+                b = c
+
+    def update(a: float, b: float, c: float) -> Tuple[float, float]:
+        if not a < c < b:
+            return a, b
+        fc, dc = phi(c)
+        if dc >= 0:
+            return a, c
+        if fc <= f_bound:
+            return c, b
+        return bisect(a, c)
+
+    def secant(a: float, b: float) -> float:
+        da, db = values[a][2], values[b][2]
+        return (a * db - b * da) / (db - da) if db != da else 0.5 * (a + b)
+
+    def secant2(a: float, b: float) -> Tuple[float, float]:
+        c = secant(a, b)
+        A, B = update(a, b, c)
+        if c == B:
+            return update(A, B, secant(b, B))
+        if c == A:
+            return update(A, B, secant(a, A))
+        return A, B
+
+    def bracket(c: float) -> Tuple[float, float]:
+        a = 0.0
+        while True:
+            fc, dc = phi(c)
+            if dc >= 0:
+                return a, c
+            if fc > f_bound:
+                return bisect(a, c)
+            if c >= alpha_max:
+                raise _Stop(None)
+            a, c = c, min(rho * c, alpha_max)
+
+    try:
+        a, b = bracket(min(alpha0, alpha_max))
+        while True:
+            width = b - a
+            a, b = secant2(a, b)
+            if b - a > gamma * width:
+                a, b = update(a, b, 0.5 * (a + b))
+            if b - a <= 1e-14 * b:
+                raise _Stop(None)
+    except _Stop as stop:
+        if stop.alpha is None:
+            return (*budget.best, n_evals, n_evals)
+        f, g, _ = values[stop.alpha]
+        return stop.alpha, f, g, n_evals, n_evals
+
+
+# Methods accepted by ``line_search(method=...)``
+LINE_SEARCH_METHODS = ("strong_wolfe", "hager_zhang")
+
+
 def line_search(
     fun: Callable[[np.ndarray], float],
     grad: Callable[[np.ndarray], np.ndarray],
@@ -141,14 +334,39 @@ def line_search(
     c2: float = 0.9,
     max_iter: int = 25,
     alpha_max: float = 50.0,
+    trial_point: Optional[Callable[[float], np.ndarray]] = None,
+    dot: Callable[[np.ndarray, np.ndarray], float] = np.dot,
+    max_evals: Optional[int] = None,
+    deadline: Optional[float] = None,
+    method: str = "strong_wolfe",
+    f_ref: Optional[float] = None,
 ) -> Tuple[float, float, np.ndarray, int, int]:
     """Run a strong-Wolfe line search.
 
     Returns (alpha, f_new, g_new, n_fun, n_grad) where the counts only include
     evaluations performed inside this routine.
+
+    ``trial_point(alpha)`` and ``dot`` replace ``xk + alpha * pk`` and
+    ``np.dot`` for vectors that are not plain in-memory arrays (e.g. the
+    chunked memmap vectors of ``qnm.out_of_core``); ``xk``/``pk`` are then
+    used as given, without conversion.
+
+    ``max_evals`` (trial evaluations) and ``deadline`` (``time.perf_counter()``
+    value) bound the search; when either is hit it returns the best trial point
+    so far, which then need not satisfy the Wolfe conditions.
+
+    ``method="hager_zhang"`` runs the approximate-Wolfe search of
+    ``_hager_zhang`` instead, which stays accurate near convergence; the
+    solvers select it with ``line_search_kwargs={"method": "hager_zhang"}``.
+
+    ``f_ref`` replaces ``f(xk)`` in the sufficient decrease condition, allowing
+    nonmonotone steps (see ``NonmonotoneReference``).
     """
-    xk = ensure_1d(xk)
-    pk = ensure_1d(pk)
+    if method not in LINE_SEARCH_METHODS:
+        raise ValueError(f"unknown line search method {method!r}; expected one of {LINE_SEARCH_METHODS}")
+    if trial_point is None:
+        xk = ensure_1d(xk)
+        pk = ensure_1d(pk)
     if f0 is None:
         f0 = float(fun(xk))
         n_fun = 1
@@ -160,8 +378,86 @@ def line_search(
     else:
         n_grad = 0
 
-    alpha, f_new, g_new, extra_fun, extra_grad = _strong_wolfe(
-        fun, grad, xk, pk, f0, g0, alpha0, c1, c2, max_iter, alpha_max
+    search = _hager_zhang if method == "hager_zhang" else _strong_wolfe
+    alpha, f_new, g_new, extra_fun, extra_grad = search(
+        fun, grad, xk, pk, f0, g0, alpha0, c1, c2, max_iter, alpha_max, trial_point, dot, max_evals, deadline,
+        f_ref=f_ref,
     )
     return alpha, f_new, g_new, n_fun + extra_fun, n_grad + extra_grad
 
+
+# Strategies accepted by ``initial_step_length`` (and ``initial_step`` of the solvers)
+INITIAL_STEP_STRATEGIES = ("unit", "inverse_gnorm", "interpolate", "carry")
+
+
+def initial_step_length(
+    strategy: str,
+    g: np.ndarray,
+    p: np.ndarray,
+    df_prev: Optional[float] = None,
+    alpha_prev: Optional[float] = None,
+    steepest: bool = True,
+) -> float:
+    """Initial trial step ``alpha0`` for the line search along ``p``.
+
+    ``df_prev = f_{k-1} - f_k`` and ``alpha_prev`` come from the previous
+    iteration (``None`` on the first one). Except for ``"unit"`` (always 1),
+    the first iteration uses ``min(1, 1/||g||)`` when ``steepest`` says ``p``
+    is the unscaled ``-g``, so that step has unit length; a direction already
+    scaled by an initial inverse Hessian ``H0`` starts from 1. Afterwards:
+
+    - ``"inverse_gnorm"``: 1, the natural quasi-Newton step.
+    - ``"interpolate"``: ``min(1, 1.01 * 2 * df_prev / -g.T p)``, the minimizer
+      of the quadratic interpolating the previous decrease (N&W Eq. 3.60, p. 59).
+    - ``"carry"``: the previously accepted step, allowed to double back
+      towards the unit step: ``min(1, 2 * alpha_prev)``. Carrying
+      ``alpha_prev`` unchanged would never recover ``alpha = 1`` once a short
+      step was accepted, losing the superlinear rate.
+    """
+    if strategy not in INITIAL_STEP_STRATEGIES:
+        raise ValueError(f"unknown initial step strategy {strategy!r}; expected one of {INITIAL_STEP_STRATEGIES}")
+    if strategy == "unit":
+        return 1.0
+    if df_prev is None or alpha_prev is None:
+        return min(1.0, 1.0 / max(float(np.linalg.norm(g)), 1e-300)) if steepest else 1.0
+    if strategy == "interpolate":
+        derphi0 = float(np.dot(g, p))
+        alpha0 = 1.01 * 2.0 * df_prev / -derphi0 if derphi0 < 0 else 1.0
+        return min(1.0, alpha0) if np.isfinite(alpha0) and alpha0 > 0 else 1.0
+    if strategy == "carry":
+        return min(1.0, 2.0 * alpha_prev)
+    return 1.0
+
+
+class NonmonotoneReference:
+    """Reference value ``f_ref`` for nonmonotone line searches.
+
+    - ``"gll"``: maximum of the last ``memory`` objective values (Grippo,
+      Lampariello & Lucidi, SIAM J. Numer. Anal. 23, 1986).
+    - ``"zhang_hager"``: weighted average ``C_{k+1} = (eta Q_k C_k + f_{k+1}) / Q_{k+1}``
+      with ``Q_{k+1} = eta Q_k + 1`` (Zhang & Hager, SIAM J. Optim. 14, 2004);
+      ``eta = 0`` is the monotone search, ``eta = 1`` the running mean.
+
+    Call ``update(f)`` with every accepted objective value, starting with f(x0).
+    """
+
+    def __init__(self, rule: str = "gll", memory: int = 10, eta: float = 0.85) -> None:
+        if rule not in ("gll", "zhang_hager"):
+            raise ValueError(f"unknown nonmonotone rule {rule!r}; expected 'gll' or 'zhang_hager'")
+        self.rule = rule
+        self.eta = eta
+        self._values: Deque[float] = deque(maxlen=memory)
+        self._C = np.nan
+        self._Q = 0.0
+
+    @property
+    def value(self) -> float:
+        return max(self._values) if self.rule == "gll" else self._C
+
+    def update(self, f: float) -> None:
+        if self.rule == "gll":
+            self._values.append(f)
+        else:
+            Q = self.eta * self._Q + 1.0
+            self._C = f if self._Q == 0.0 else (self.eta * self._Q * self._C + f) / Q
+            self._Q = Q
@@ -0,0 +1,289 @@
+"""Many independent solves on a thread or process pool.
+
+``solve_many`` runs ``minimize`` on each ``Problem`` and yields
+``(index, result)`` pairs as the solves finish. With ``W`` concurrent workers,
+each worker's BLAS calls (the dense ``H`` update in ``bfgs``, large dot
+products) may also start one BLAS thread per core. That gives ``W x cores``
+runnable threads, and throughput collapses. ``blas_threads`` caps the BLAS
+pool so that ``workers x blas_threads`` stays at the core count.
+
+The cap is applied with ``threadpoolctl`` when it is installed. BLAS reads
+its thread count once, when it is loaded, so without ``threadpoolctl`` the
+cap can only be set through environment variables for processes that load
+BLAS afresh with the parent's current environment: a process pool with the
+``spawn`` start method. ``forkserver`` workers inherit the environment of
+the server, frozen when it first started, so they get no cap (and the
+Python 3.14+ Linux default is ``forkserver``). ``ThroughputReport.blas_control``
+records which mechanism was in effect.
+
+Neither setting outlives the work it is for, however slowly the results are
+consumed: the environment variables are only set while the process pool
+starts its workers, and the process-wide ``threadpoolctl`` limit of a thread
+pool is lifted as soon as its last solve finishes (or is cancelled).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import multiprocessing as mp
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .minimize import minimize
+from .problems import Problem
+from .utils import OptimizeResult
+
+# Thread-count variables read by OpenBLAS, MKL, BLIS, Accelerate and OpenMP at load time
+BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def _threadpoolctl():
+    try:
+        import threadpoolctl
+    except ImportError:
+        return None
+    return threadpoolctl
+
+
+@contextlib.contextmanager
+def blas_env(n_threads: int) -> Iterator[None]:
+    """Set the BLAS thread-count environment variables; restore them on exit.
+
+    Affects only processes that load BLAS inside the block, not this one.
+    """
+    saved = {name: os.environ.get(name) for name in BLAS_ENV_VARS}
+    os.environ.update({name: str(n_threads) for name in BLAS_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextlib.contextmanager
+def blas_threads(n_threads: int) -> Iterator[bool]:
+    """Limit the BLAS pools already loaded in this process to ``n_threads``.
+
+    Yields ``True`` when the limit is in effect (``threadpoolctl`` is
+    installed) and ``False`` otherwise. The limit is process-wide, so enter it
+    once around all concurrent solves rather than in each thread.
+    """
+    threadpoolctl = _threadpoolctl()
+    if threadpoolctl is None:
+        yield False
+        return
+    with threadpoolctl.threadpool_limits(limits=n_threads, user_api="blas"):
+        yield True
+
+
+@dataclass(frozen=True)
+class ThroughputReport:
+    """Timing of a ``solve_many`` run (or of the part consumed so far).
+
+    ``utilization`` is the summed solve time over ``wall_seconds x
+    max_workers``; below 1, workers sat idle. Contention shows up instead as
+    a growing ``mean_solve_seconds``. Compare ``solves_per_second`` across
+    settings of ``max_workers`` and ``blas_threads`` to tune both for a
+    machine.
+    """
+
+    n_solves: int
+    wall_seconds: float
+    solves_per_second: float
+    mean_solve_seconds: float
+    utilization: float
+    max_workers: int
+    blas_threads: int
+    blas_control: Optional[str]
+
+
+# Problems of the current process pool, inherited by forked workers or sent once per worker
+_worker_problems: Sequence[Problem] = ()
+_worker_limits = None
+
+
+def _init_worker(problems: Sequence[Problem], n_threads: int) -> None:
+    global _worker_problems, _worker_limits
+    _worker_problems = problems
+    threadpoolctl = _threadpoolctl()
+    if threadpoolctl is not None:
+        _worker_limits = threadpoolctl.threadpool_limits(limits=n_threads, user_api="blas")
+
+
+def _solve(problem: Problem, method: str, kwargs: dict) -> Tuple[OptimizeResult, float]:
+    t_start = time.perf_counter()
+    result = minimize(problem.fun, problem.grad, problem.x0, method=method, **kwargs)
+    return result, time.perf_counter() - t_start
+
+
+def _solve_in_worker(index: int, method: str, kwargs: dict) -> Tuple[OptimizeResult, float]:
+    return _solve(_worker_problems[index], method, kwargs)
+
+
+def _close_when_done(futures: Sequence[Future], stack: contextlib.ExitStack) -> None:
+    """Close ``stack`` once every future has finished or been cancelled."""
+    if not futures:
+        stack.close()
+        return
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            stack.close()
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+class SolveMany:
+    """Iterator over ``(index, result)`` in completion order; see ``solve_many``."""
+
+    def __init__(self, problems: Sequence[Problem], method: str, executor: str, max_workers: Optional[int],
+                 blas_threads: Optional[int], context, kwargs: dict) -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        cores = os.cpu_count() or 1
+        self.problems = list(problems)
+        self.method = method
+        self.executor = executor
+        self.max_workers = max(1, min(max_workers or cores, len(self.problems) or 1))
+        self.blas_threads = blas_threads or max(1, cores // self.max_workers)
+        self._context = context or mp.get_context()
+        self._kwargs = kwargs
+        self._results: List[Optional[OptimizeResult]] = [None] * len(self.problems)
+        self._solve_seconds = 0.0
+        self._n_done = 0
+        self._t_start: Optional[float] = None
+        self._t_end: Optional[float] = None
+        self.blas_control = self._blas_control()
+        self._iterator = self._run()
+
+    def _blas_control(self) -> Optional[str]:
+        if _threadpoolctl() is not None:
+            return "threadpoolctl"
+        if self.executor == "process" and self._context.get_start_method() == "spawn":
+            return "environment"
+        return None
+
+    def __iter__(self) -> "SolveMany":
+        return self
+
+    def __next__(self) -> Tuple[int, OptimizeResult]:
+        return next(self._iterator)
+
+    def _run(self) -> Iterator[Tuple[int, OptimizeResult]]:
+        if self.blas_control is None and self.max_workers > 1:
+            warnings.warn(
+                "BLAS thread count cannot be limited (install threadpoolctl or use the 'spawn' start method); "
+                "concurrent solves may oversubscribe",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+        self._t_start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            pool: Executor
+            if self.executor == "thread":
+                pool = stack.enter_context(ThreadPoolExecutor(self.max_workers))
+                # Process-wide, so held while solves run rather than while this generator is suspended
+                limits = contextlib.ExitStack()
+                limits.enter_context(blas_threads(self.blas_threads))
+                futures = {pool.submit(_solve, p, self.method, self._kwargs): i for i, p in enumerate(self.problems)}
+                _close_when_done(list(futures), limits)
+            else:
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    self.max_workers, mp_context=self._context, initializer=_init_worker,
+                    initargs=(self.problems, self.blas_threads),
+                ))
+                # Submitting starts every worker, so spawned ones load BLAS with the capped
+                # environment; it is restored before the first result is yielded. Not for
+                # forkserver: a server started here would keep the cap for later pools.
+                env = blas_env(self.blas_threads) if self.blas_control == "environment" else contextlib.nullcontext()
+                with env:
+                    futures = {pool.submit(_solve_in_worker, i, self.method, self._kwargs): i
+                               for i in range(len(self.problems))}
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = futures[future]
+                        result, seconds = future.result()
+                        self._results[index] = result
+                        self._solve_seconds += seconds
+                        self._n_done += 1
+                        yield index, result
+            finally:
+                for future in pending:
+                    future.cancel()
+                self._t_end = time.perf_counter()
+
+    def results(self) -> List[OptimizeResult]:
+        """Run the remaining solves and return all results in input order."""
+        for _ in self:
+            pass
+        return list(self._results)
+
+    @property
+    def report(self) -> ThroughputReport:
+        if self._t_start is None:
+            wall = 0.0
+        else:
+            wall = (self._t_end or time.perf_counter()) - self._t_start
+        return ThroughputReport(
+            n_solves=self._n_done,
+            wall_seconds=wall,
+            solves_per_second=self._n_done / wall if wall > 0 else 0.0,
+            mean_solve_seconds=self._solve_seconds / self._n_done if self._n_done else 0.0,
+            utilization=self._solve_seconds / (wall * self.max_workers) if wall > 0 else 0.0,
+            max_workers=self.max_workers,
+            blas_threads=self.blas_threads,
+            blas_control=self.blas_control,
+        )
+
+
+def solve_many(
+    problems: Sequence[Problem],
+    method: str = "auto",
+    executor: str = "thread",
+    max_workers: Optional[int] = None,
+    blas_threads: Optional[int] = None,
+    context=None,
+    **kwargs,
+) -> SolveMany:
+    """Solve independent problems concurrently, yielding results as they complete.
+
+    Each ``Problem`` is solved by ``minimize(problem.fun, problem.grad,
+    problem.x0, method=method, **kwargs)``. Iterating the returned
+    ``SolveMany`` yields ``(index, result)`` in completion order, with
+    ``index`` the position in ``problems``. ``.results()`` collects them in
+    input order and ``.report`` is a ``ThroughputReport``. Nothing runs until
+    iteration starts.
+
+    ``executor="thread"`` suits objectives that release the GIL (NumPy on
+    large arrays). ``executor="process"`` suits pure-Python objectives. Under
+    the default ``fork`` start method the problems are inherited by the
+    workers. With ``spawn``/``forkserver`` they must be picklable
+    (module-level functions).
+
+    ``max_workers`` defaults to the core count and ``blas_threads`` to
+    ``cores // max_workers``, so the two together do not exceed the cores.
+    """
+    return SolveMany(problems, method, executor, max_workers, blas_threads, context, kwargs)
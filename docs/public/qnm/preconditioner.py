@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+def as_inverse_hessian_apply(H0: Any) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """Normalize a user-supplied initial inverse Hessian into ``v -> H0 @ v``.
+
+    Accepted forms:
+
+    - ``None``: no preconditioner (the caller keeps its default scaling).
+    - scalar or 1D array: diagonal of ``H_0``.
+    - 2D array: dense symmetric positive definite ``H_0``.
+    - object with ``matvec`` (e.g. ``scipy.sparse.linalg.LinearOperator``).
+    - callable ``apply_H0(v)``.
+    """
+    if H0 is None:
+        return None
+    if hasattr(H0, "matvec"):
+        return lambda v: np.asarray(H0.matvec(v), dtype=float).reshape(-1)
+    if callable(H0):
+        return lambda v: np.asarray(H0(v), dtype=float).reshape(-1)
+    H0 = np.asarray(H0, dtype=float)
+    if H0.ndim <= 1:
+        if np.any(H0 <= 0):
+            raise ValueError("Diagonal preconditioner must be strictly positive")
+        return lambda v: H0 * v
+    if H0.ndim == 2:
+        return lambda v: H0 @ v
+    raise ValueError(f"Unsupported preconditioner with shape {H0.shape}")
+
+
+def initial_inverse_hessian(H0: Any, n: int) -> np.ndarray:
+    """Materialize ``H0`` as a dense ``n x n`` matrix (seed for dense BFGS)."""
+    if H0 is None:
+        return np.eye(n)
+    if not (hasattr(H0, "matvec") or callable(H0)):
+        H0 = np.asarray(H0, dtype=float)
+        if H0.ndim <= 1:
+            return np.diag(np.broadcast_to(H0, (n,)).astype(float))
+        return H0.astype(float, copy=True)
+    apply_H0 = as_inverse_hessian_apply(H0)
+    H = np.column_stack([apply_H0(e) for e in np.eye(n)])
+    # Symmetrize to remove round-off from column-wise application.
+    return 0.5 * (H + H.T)
+
+
+class DiagonalInverseHessian:
+    """Diagonal estimate of the inverse Hessian updated from ``(s, y)`` pairs.
+
+    Keeps a diagonal approximation ``D`` of the Hessian and updates it with the
+    diagonal of the direct BFGS update (Gilbert & Lemarechal, 1989):
+
+        D <- D + y*y / (y.T s) - (D*s)**2 / (s.T D s)
+
+    The first pair initializes ``D`` with the scalar ``y.T y / y.T s`` (the
+    inverse of Eq. 7.20 in Nocedal & Wright). Entries, the initial scalar
+    included, are clipped to ``[d_min, d_max]`` to keep ``H_0 = D^{-1}``
+    positive definite.
+
+    Pass an instance as ``H0`` to ``lbfgs`` or ``bfgs``; the solvers call
+    ``update`` for every accepted curvature pair.
+    """
+
+    def __init__(self, n: Optional[int] = None, d_min: float = 1e-8, d_max: float = 1e8) -> None:
+        self.d_min = d_min
+        self.d_max = d_max
+        self.D: Optional[np.ndarray] = None if n is None else np.ones(n)
+        self._initialized = False
+
+    def update(self, s: np.ndarray, y: np.ndarray) -> None:
+        ys = float(np.dot(y, s))
+        # Same acceptance test as the solvers' curvature pairs
+        if ys <= 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+            return
+        if not self._initialized:
+            self.D = np.full(s.shape, np.clip(float(np.dot(y, y)) / ys, self.d_min, self.d_max))
+            self._initialized = True
+            return
+        Ds = self.D * s
+        sDs = float(np.dot(s, Ds))
+        self.D = self.D + y * y / ys - Ds * Ds / sDs
+        np.clip(self.D, self.d_min, self.d_max, out=self.D)
+
+    def diagonal(self) -> np.ndarray:
+        """Diagonal of the current inverse Hessian estimate ``D^{-1}``.
+
+        Returns the scalar ``1.0`` (identity) before the first update when the
+        dimension is not known yet.
+        """
+        if self.D is None:
+            return np.array(1.0)
+        return 1.0 / self.D
+
+    def matvec(self, v: np.ndarray) -> np.ndarray:
+        if self.D is None:
+            return np.array(v, dtype=float)
+        return v / self.D
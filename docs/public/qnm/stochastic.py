@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Deque, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from .lbfgs import two_loop_recursion
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, ensure_1d, grad_norm
+
+# batch(x, rows) -> (mean value, mean gradient) over the row range ``rows``
+BatchObjective = Callable[[np.ndarray, slice], Tuple[float, np.ndarray]]
+
+
+def _epoch_batches(n_rows: int, batch_size: int, overlap: int, rng: np.random.Generator) -> Iterator[slice]:
+    """Contiguous batches advancing by ``batch_size - overlap`` rows from a random offset."""
+    stride = batch_size - overlap
+    offset = int(rng.integers(0, stride)) if n_rows - batch_size >= stride else 0
+    for start in range(offset, n_rows - batch_size + 1, stride):
+        yield slice(start, start + batch_size)
+
+
+def lbfgs_stochastic(
+    batch: BatchObjective,
+    x0: np.ndarray,
+    n_rows: int,
+    batch_size: int = 1024,
+    overlap: Optional[int] = None,
+    m: int = 10,
+    max_epochs: int = 10,
+    max_iter: Optional[int] = None,
+    tol: float = 1e-6,
+    step_size: Union[None, float, Callable[[int], float]] = None,
+    c1: float = 1e-4,
+    max_backtracks: int = 30,
+    seed: Optional[int] = 0,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+) -> OptimizeResult:
+    """Multi-batch L-BFGS (Berahas, Nocedal & Takáč, NeurIPS 2016).
+
+    Iteration ``k`` uses the gradient of the batch ``S_k`` and the same
+    two-loop recursion as ``lbfgs``. Consecutive batches share ``overlap``
+    rows ``O_k = S_k ∩ S_{k+1}``, and the curvature pair is measured on that
+    overlap only, ``y_k = g_{O_k}(x_{k+1}) - g_{O_k}(x_k)``. The pair then
+    reflects the change in ``x`` rather than the change of batch. Pairs with
+    ``s^T y <= 1e-12 ||s|| ||y||`` are skipped (the memory is kept).
+
+    ``batch(x, rows)`` returns the mean value and gradient over a contiguous
+    row range, e.g. ``Problem.batch`` of the memory-mapped problems in
+    ``qnm.problems``. Each epoch streams over the rows in order from a random
+    offset, so memory-mapped data is read sequentially. The gradient on
+    ``O_k`` at ``x_{k+1}`` is reused for ``S_{k+1}``, so an iteration reads
+    ``batch_size`` rows plus the Armijo trials.
+
+    The step is ``step_size`` (a constant or a function of the iteration
+    number) or, by default, an Armijo backtracking search on the batch
+    objective starting from 1. The run converges when the mean batch
+    gradient inf-norm over an epoch is at most ``tol``; otherwise it stops
+    after ``max_epochs`` epochs or ``max_iter`` iterations.
+
+    ``fun``/``grad`` of the result are the estimates at ``x`` on the last
+    overlap rows. ``n_fun``/``n_grad`` count ``batch`` calls, and
+    ``extra_info`` holds ``epochs`` and ``data_passes`` (rows read / ``n_rows``).
+    """
+    batch_size = min(batch_size, n_rows)
+    overlap = max(batch_size // 4, 1) if overlap is None else overlap
+    if not 1 <= overlap <= batch_size // 2:
+        raise ValueError(f"overlap must be between 1 and batch_size // 2 = {batch_size // 2}, got {overlap}")
+    rng = np.random.default_rng(seed)
+    x = ensure_1d(x0)
+    n_calls = 0
+    rows_read = 0
+
+    def evaluate(point: np.ndarray, rows: slice) -> Tuple[float, np.ndarray]:
+        nonlocal n_calls, rows_read
+        n_calls += 1
+        rows_read += rows.stop - rows.start
+        return batch(point, rows)
+
+    def combine(*parts: Tuple[slice, float, np.ndarray]) -> Tuple[float, np.ndarray]:
+        total = sum(rows.stop - rows.start for rows, _, _ in parts)
+        f = sum((rows.stop - rows.start) * f_i for rows, f_i, _ in parts) / total
+        g = sum((rows.stop - rows.start) * g_i for rows, _, g_i in parts) / total
+        return f, g
+
+    s_history: Deque[np.ndarray] = deque(maxlen=m)
+    y_history: Deque[np.ndarray] = deque(maxlen=m)
+    # (rows, f, g) of the last overlap, evaluated at the current x
+    carry: Optional[Tuple[slice, float, np.ndarray]] = None
+    f_est = g_est = None
+    k = 0
+    epoch = 0
+
+    def result(status: str) -> OptimizeResult:
+        res = OptimizeResult(
+            x, f_est, g_est, k, n_calls, n_calls, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status],
+            history_size=m,
+        )
+        res.extra_info = {"epochs": epoch, "data_passes": rows_read / n_rows}
+        return res
+
+    for epoch in range(1, max_epochs + 1):
+        gnorm_sum = 0.0
+        n_batches = 0
+        for S in _epoch_batches(n_rows, batch_size, overlap, rng):
+            if max_iter is not None and k >= max_iter:
+                return result("max_iter")
+            tail = slice(S.stop - overlap, S.stop)
+            if carry is not None and carry[0].start == S.start:
+                # S_k starts with O_{k-1}, already evaluated at x
+                middle = slice(S.start + overlap, tail.start)
+                parts = [carry]
+            else:
+                middle = slice(S.start, tail.start)
+                parts = []
+            if middle.stop > middle.start:
+                parts.append((middle, *evaluate(x, middle)))
+            f_tail, g_tail = evaluate(x, tail)
+            parts.append((tail, f_tail, g_tail))
+            f_S, g_S = combine(*parts)
+            f_est, g_est = f_tail, g_tail
+            gnorm_sum += grad_norm(g_S)
+            n_batches += 1
+            k += 1
+
+            p = two_loop_recursion(g_S, s_history, y_history)
+            gp = float(np.dot(p, g_S))
+            if gp >= 0:
+                s_history.clear()
+                y_history.clear()
+                p = -g_S
+                gp = -float(np.dot(g_S, g_S))
+
+            if step_size is None:
+                # Armijo backtracking on the batch objective
+                alpha = 1.0
+                for _ in range(max_backtracks):
+                    f_trial, _ = evaluate(x + alpha * p, S)
+                    if f_trial <= f_S + c1 * alpha * gp:
+                        break
+                    alpha *= 0.5
+                else:
+                    alpha = 0.0
+            else:
+                alpha = step_size(k) if callable(step_size) else float(step_size)
+
+            if alpha > 0.0:
+                s = alpha * p
+                x = x + s
+                f_new, g_new = evaluate(x, tail)
+                y = g_new - g_tail
+                if float(np.dot(y, s)) > 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+                    s_history.append(s)
+                    y_history.append(y)
+                carry = (tail, f_new, g_new)
+                f_est, g_est = f_new, g_new
+            else:
+                carry = (tail, f_tail, g_tail)
+
+            if callback is not None:
+                res = OptimizeResult(x, f_est, g_est, k, n_calls, n_calls, True, "iter", "In-progress")
+                res.extra_info = {
+                    "alpha": float(alpha),
+                    "epoch": epoch,
+                    "batch_fun": float(f_S),
+                    "m": m,
+                    "s_history": list(s_history),
+                    "y_history": list(y_history),
+                }
+                if callback(res) is True:
+                    return result("callback")
+
+        if n_batches and gnorm_sum / n_batches <= tol:
+            return result("converged")
+
+    return result("max_epochs")
@@ -0,0 +1,225 @@
+"""Opt-in, process-wide solver telemetry.
+
+``enable_telemetry()`` installs a ``TelemetryRegistry`` that ``bfgs``,
+``lbfgs`` and ``lbfgsb`` report into (solves by status, iterations,
+evaluations, evaluations per line search, curvature/memory resets, wall
+time). ``resets_total{reason="curvature"}`` counts pairs rejected by the
+relative test ``s^T y <= 1e-12 ||s|| ||y||``; ``reason="not_descent"``
+counts L-BFGS directions that were not descent directions. While telemetry is disabled (the default) the solvers skip all
+bookkeeping.
+
+Updates go to a per-thread shard without taking a lock, so concurrent solves
+do not contend; ``snapshot()`` merges the shards. A shard is only ever
+modified by its own thread: when the thread exits, the shard is folded into
+the registry's retired totals and dropped, and ``reset()`` starts a new
+generation that each thread applies to its shard on its next update.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .utils import OptimizeResult
+
+# Upper bucket bounds (``le``) of every histogram; a final +Inf bucket is implicit
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000,
+)
+# Bucket bounds for wall time in seconds
+SECONDS_BUCKETS: Tuple[float, ...] = (1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0, 100.0)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _merge(counters: Dict[_Key, float], histograms: Dict[_Key, List[float]], shard: "_Shard") -> None:
+    # dict() and list() copies are atomic with respect to the owning thread
+    for key, value in dict(shard.counters).items():
+        counters[key] = counters.get(key, 0) + value
+    for key, hist in dict(shard.histograms).items():
+        hist = list(hist)
+        merged = histograms.setdefault(key, [0] * len(hist))
+        for i, v in enumerate(hist):
+            merged[i] += v
+
+
+class _Shard:
+    """Metrics written by one thread."""
+
+    def __init__(self, generation: int = 0) -> None:
+        self.generation = generation
+        self.counters: Dict[_Key, float] = {}
+        # key -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[_Key, List[float]] = {}
+
+
+class _ThreadToken:
+    """Lives in a thread's ``threading.local``; collected when the thread exits."""
+
+
+class TelemetryRegistry:
+    """Thread-safe counters and fixed-bucket histograms with labels."""
+
+    def __init__(self, buckets: Optional[Dict[str, Sequence[float]]] = None) -> None:
+        self._buckets: Dict[str, Tuple[float, ...]] = {"solve_seconds": SECONDS_BUCKETS}
+        self._buckets.update({name: tuple(b) for name, b in (buckets or {}).items()})
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Totals of the shards of exited threads
+        self._retired = _Shard()
+        self._generation = 0
+        # Reentrant: a thread-exit finalizer may run while this thread holds the lock
+        self._lock = threading.RLock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(self._generation)
+            self._local.token = token = _ThreadToken()
+            weakref.finalize(token, TelemetryRegistry._retire, weakref.ref(self), shard)
+            with self._lock:
+                self._shards.append(shard)
+        elif shard.generation != self._generation:
+            # Apply a reset() made by another thread
+            shard.counters = {}
+            shard.histograms = {}
+            shard.generation = self._generation
+        return shard
+
+    @staticmethod
+    def _retire(ref: "weakref.ref[TelemetryRegistry]", shard: _Shard) -> None:
+        self = ref()
+        if self is None:
+            return
+        with self._lock:
+            self._shards.remove(shard)
+            if shard.generation == self._generation:
+                _merge(self._retired.counters, self._retired.histograms, shard)
+
+    def bucket_bounds(self, name: str) -> Tuple[float, ...]:
+        return self._buckets.get(name, DEFAULT_BUCKETS)
+
+    def increment(self, name: str, value: float = 1, **labels: object) -> None:
+        counters = self._shard().counters
+        key = _key(name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        histograms = self._shard().histograms
+        key = _key(name, labels)
+        bounds = self.bucket_bounds(name)
+        hist = histograms.get(key)
+        if hist is None:
+            hist = histograms[key] = [0] * (len(bounds) + 2)
+        i = 0
+        while i < len(bounds) and value > bounds[i]:
+            i += 1
+        hist[i] += 1
+        hist[-1] += value
+
+    def reset(self) -> None:
+        """Drop all metrics; updates racing with the reset may land on either side."""
+        with self._lock:
+            self._generation += 1
+            self._retired = _Shard(self._generation)
+
+    def snapshot(self) -> dict:
+        """Merged metrics as plain data (see ``to_json`` for the layout)."""
+        counters: Dict[_Key, float] = {}
+        histograms: Dict[_Key, List[float]] = {}
+        with self._lock:
+            generation = self._generation
+            _merge(counters, histograms, self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            # Shards not yet updated since a reset() hold pre-reset metrics
+            if shard.generation == generation:
+                _merge(counters, histograms, shard)
+
+        out_hist = []
+        for (name, labels), hist in sorted(histograms.items()):
+            bounds = self.bucket_bounds(name)
+            cumulative, buckets = 0, []
+            for le, count in zip(list(bounds) + [math.inf], hist[:-1]):
+                cumulative += count
+                buckets.append([le, cumulative])
+            out_hist.append(
+                {"name": name, "labels": dict(labels), "buckets": buckets, "count": cumulative, "sum": hist[-1]}
+            )
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(counters.items())
+            ],
+            "histograms": out_hist,
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """``snapshot()`` as JSON; histogram buckets are cumulative ``[le, count]`` pairs."""
+        snap = self.snapshot()
+        for hist in snap["histograms"]:
+            hist["buckets"] = [["+Inf" if math.isinf(le) else le, c] for le, c in hist["buckets"]]
+        return json.dumps(snap, **kwargs)
+
+    def to_text(self, prefix: str = "qnm_") -> str:
+        """``snapshot()`` in the Prometheus text exposition format."""
+
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        def fmt_labels(labels: Dict[str, str], **extra: str) -> str:
+            items = {**labels, **extra}
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in items.items()) + "}"
+
+        snap = self.snapshot()
+        lines: List[str] = []
+        for c in snap["counters"]:
+            lines.append(f"{prefix}{c['name']}{fmt_labels(c['labels'])} {c['value']:g}")
+        for h in snap["histograms"]:
+            name = prefix + h["name"]
+            for le, count in h["buckets"]:
+                le_str = "+Inf" if math.isinf(le) else f"{le:g}"
+                lines.append(f"{name}_bucket{fmt_labels(h['labels'], le=le_str)} {count}")
+            lines.append(f"{name}_sum{fmt_labels(h['labels'])} {h['sum']:g}")
+            lines.append(f"{name}_count{fmt_labels(h['labels'])} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[TelemetryRegistry] = None
+
+
+def enable_telemetry(registry: Optional[TelemetryRegistry] = None) -> TelemetryRegistry:
+    """Start reporting solver metrics into ``registry`` (a new one by default)."""
+    global _registry
+    _registry = registry if registry is not None else TelemetryRegistry()
+    return _registry
+
+
+def disable_telemetry() -> None:
+    global _registry
+    _registry = None
+
+
+def get_registry() -> Optional[TelemetryRegistry]:
+    """The active registry, or ``None`` while telemetry is disabled."""
+    return _registry
+
+
+def record_solve(registry: Optional[TelemetryRegistry], solver: str, result: OptimizeResult, t_start: float) -> None:
+    """Report one finished solve (no-op when ``registry`` is ``None``)."""
+    if registry is None:
+        return
+    registry.increment("solves_total", solver=solver, status=result.status)
+    registry.observe("iterations", result.n_iter, solver=solver)
+    registry.observe("function_evals", result.n_fun, solver=solver)
+    registry.observe("gradient_evals", result.n_grad, solver=solver)
+    registry.observe("solve_seconds", time.perf_counter() - t_start, solver=solver)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import Callable, Optional
+import time
+from typing import Any, Callable, Optional
 
 import numpy as np
 
-from .line_search import line_search
-from .utils import OptimizeResult, ensure_1d, grad_norm
+from .inverse_hessian import DenseInverseHessian
+from .line_search import INITIAL_STEP_STRATEGIES, NonmonotoneReference, initial_step_length, line_search
+from .preconditioner import initial_inverse_hessian
+from .telemetry import get_registry, record_solve
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, StoppingMonitor, ensure_1d, grad_norm
 
 
 def bfgs(
@@ -15,14 +19,50 @@ def bfgs(
     max_iter: int = 200,
     tol: float = 1e-6,
     line_search_kwargs: Optional[dict] = None,
-    callback: Optional[Callable[[OptimizeResult], None]] = None,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+    H0: Any = None,
+    max_fun: Optional[int] = None,
+    max_grad: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    ftol: Optional[float] = None,
+    xtol: Optional[float] = None,
+    stall_window: Optional[int] = None,
+    initial_step: str = "unit",
+    nonmonotone: Optional[str | NonmonotoneReference] = None,
 ) -> OptimizeResult:
     """Basic BFGS optimizer with strong-Wolfe line search.
 
     This implementation follows Algorithm 6.1 in Nocedal & Wright,
     'Numerical Optimization' (2nd Ed, 2006, p. 140).
+
+    ``H0`` seeds the inverse Hessian approximation (default: identity) and is
+    also used when the approximation is reset. Objects with an
+    ``update(s, y)`` method are updated with every accepted curvature pair.
+
+    Besides ``tol`` (gradient inf-norm) and ``max_iter``, the run stops on the
+    optional criteria of ``StoppingMonitor``: evaluation budgets ``max_fun`` /
+    ``max_grad``, a wall-clock ``time_limit`` in seconds, relative reduction
+    ``ftol``, step size ``xtol`` and a ``stall_window`` without decrease.
+    ``status`` names the criterion that fired (see ``STATUS_MESSAGES``); a
+    ``callback`` that returns ``True`` stops the run with status ``"callback"``.
+
+    ``initial_step`` selects the line search's first trial step: ``"unit"``,
+    ``"inverse_gnorm"``, ``"interpolate"`` or ``"carry"`` (see
+    ``initial_step_length``). ``line_search_kwargs={"method": "hager_zhang"}``
+    switches to the approximate-Wolfe line search for high-accuracy solves.
+
+    ``nonmonotone="gll"`` or ``"zhang_hager"`` (or a fresh
+    ``NonmonotoneReference``) measures sufficient decrease from a reference
+    value over recent iterates, so f may increase temporarily; ``ftol`` then
+    measures the reduction of that reference.
     """
     line_search_kwargs = line_search_kwargs or {}
+    if initial_step not in INITIAL_STEP_STRATEGIES:
+        raise ValueError(f"unknown initial step strategy {initial_step!r}; expected one of {INITIAL_STEP_STRATEGIES}")
+    monitor = StoppingMonitor(max_fun, max_grad, time_limit, ftol, xtol, stall_window)
+    registry = get_registry()
+    t_start = time.perf_counter()
+    reference = NonmonotoneReference(nonmonotone) if isinstance(nonmonotone, str) else nonmonotone
     x = ensure_1d(x0)
     n = x.size
     n_fun = 0
@@ -32,37 +72,70 @@ def bfgs(
     g = grad(x)
     n_fun += 1
     n_grad += 1
-    # Initialize inverse Hessian approximation as identity (Eq. 6.18)
-    H = np.eye(n)
+    if reference is not None:
+        reference.update(f)
+    # Initialize inverse Hessian approximation (identity by default, Eq. 6.18)
+    H = initial_inverse_hessian(H0, n)
+
+    def result(n_iter: int, status: str) -> OptimizeResult:
+        res = OptimizeResult(
+            x, f, g, n_iter, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status],
+            inverse_hessian=DenseInverseHessian(H),
+        )
+        record_solve(registry, "bfgs", res, t_start)
+        return res
+
+    df_prev: Optional[float] = None
+    alpha_prev: Optional[float] = None
 
     for k in range(1, max_iter + 1):
         if grad_norm(g) <= tol:
-            return OptimizeResult(x, f, g, k - 1, n_fun, n_grad, True, "converged", "Gradient norm below tolerance")
+            return result(k - 1, "converged")
+        status = monitor.budget_status(n_fun, n_grad)
+        if status is not None:
+            return result(k - 1, status)
 
         # Search direction (Eq. 6.18)
         p = -H @ g
         # Strong Wolfe line search (Alg. 3.5, p. 60)
-        alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **line_search_kwargs)
+        ls_kwargs = {**line_search_kwargs, **monitor.line_search_budget(n_fun, n_grad)}
+        if initial_step != "unit":
+            ls_kwargs["alpha0"] = initial_step_length(initial_step, g, p, df_prev, alpha_prev, steepest=H0 is None)
+        if reference is not None:
+            ls_kwargs["f_ref"] = reference.value
+        alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **ls_kwargs)
+        if registry is not None:
+            registry.observe("line_search_evals", ls_fun, solver="bfgs")
         n_fun += ls_fun
         n_grad += ls_grad
         s = alpha * p
         if alpha == 0.0:
-            return OptimizeResult(x, f, g, k - 1, n_fun, n_grad, False, "line_search_failed", "Line search failed to find descent")
+            return result(k - 1, monitor.budget_status(n_fun, n_grad) or "line_search_failed")
 
         x_new = x + s
         y = g_new - g
         ys = float(np.dot(y, s))
         step_norm = float(np.linalg.norm(s))
-        if ys <= 1e-12:
-            # Reset to identity if curvature is lost (maintain positive definiteness)
-            H = np.eye(n)
+        if ys <= 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+            if registry is not None:
+                registry.increment("resets_total", solver="bfgs", reason="curvature")
+            # Reset to the seed if curvature is lost (maintain positive definiteness)
+            H = initial_inverse_hessian(H0, n)
         else:
+            if hasattr(H0, "update"):
+                H0.update(s, y)
             # BFGS inverse Hessian update (Eq. 6.17, p. 140)
             rho = 1.0 / ys
             I = np.eye(n)
             H = (I - rho * np.outer(s, y)) @ H @ (I - rho * np.outer(y, s)) + rho * np.outer(s, s)
 
+        f_prev = f
         x, f, g = x_new, f_new, g_new
+        df_prev, alpha_prev = f_prev - f, float(alpha)
+        if reference is not None:
+            # Progress tests measure the decrease of the reference value
+            f_prev = reference.value
+            reference.update(f)
 
         if callback is not None:
             # Create a simple result object for callback
@@ -74,7 +147,12 @@ def bfgs(
                 "ys": float(ys),
                 "step_norm": float(step_norm),
             }
-            callback(res)
+            if callback(res) is True:
+                return result(k, "callback")
+
+        status = monitor.progress_status(f_prev, f, s, x)
+        if status is not None:
+            return result(k, status)
 
-    return OptimizeResult(x, f, g, max_iter, n_fun, n_grad, False, "max_iter", "Reached maximum iterations")
+    return result(max_iter, "max_iter")
 
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+class DenseInverseHessian:
+    """Inverse Hessian approximation backed by the dense BFGS matrix ``H``."""
+
+    def __init__(self, H: np.ndarray) -> None:
+        self.H = H
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.H.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.H.dtype
+
+    def matvec(self, v: np.ndarray) -> np.ndarray:
+        return self.H @ v
+
+    def matmat(self, V: np.ndarray) -> np.ndarray:
+        return self.H @ V
+
+    def diag(self) -> np.ndarray:
+        return np.diag(self.H).copy()
+
+    def to_dense(self) -> np.ndarray:
+        return self.H.copy()
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        return self.H @ other
+
+
+class LBFGSInverseHessian:
+    """Implicit L-BFGS inverse Hessian ``H_k`` built from the ``(s, y)`` history.
+
+    The stored pairs are referenced, not copied. ``matvec`` applies the two-loop
+    recursion (Alg. 7.4, Nocedal & Wright) with the same ``H_k^0`` as the solve:
+    ``H0`` when given, otherwise ``gamma * I`` from the last pair (Eq. 7.20).
+    """
+
+    def __init__(
+        self,
+        s_history: Iterable[np.ndarray],
+        y_history: Iterable[np.ndarray],
+        H0: Any = None,
+        n: Optional[int] = None,
+    ) -> None:
+        self.s_history = list(s_history)
+        self.y_history = list(y_history)
+        self.H0 = H0
+        if n is None:
+            if not self.s_history:
+                raise ValueError("n is required when the history is empty")
+            n = self.s_history[0].size
+        self.n = n
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.n, self.n)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(float)
+
+    def matvec(self, v: np.ndarray) -> np.ndarray:
+        # Imported here because qnm.lbfgs attaches this operator to its results.
+        from .lbfgs import two_loop_recursion
+
+        return -two_loop_recursion(np.asarray(v, dtype=float), self.s_history, self.y_history, H0=self.H0)
+
+    def matmat(self, V: np.ndarray) -> np.ndarray:
+        from .lbfgs import two_loop_recursion_block
+
+        return -two_loop_recursion_block(np.asarray(V, dtype=float), self.s_history, self.y_history, H0=self.H0)
+
+    def _h0_diagonal(self) -> Optional[np.ndarray]:
+        """Diagonal of ``H_k^0`` if it is diagonal, otherwise ``None``."""
+        if self.H0 is None:
+            if not self.y_history:
+                return np.ones(self.n)
+            s, y = self.s_history[-1], self.y_history[-1]
+            return np.full(self.n, float(np.dot(s, y) / np.dot(y, y)))
+        if hasattr(self.H0, "diagonal") and not isinstance(self.H0, np.ndarray):
+            return np.broadcast_to(np.asarray(self.H0.diagonal(), dtype=float), (self.n,)).copy()
+        if not (hasattr(self.H0, "matvec") or callable(self.H0)):
+            H0 = np.asarray(self.H0, dtype=float)
+            if H0.ndim <= 1:
+                return np.broadcast_to(H0, (self.n,)).astype(float)
+        return None
+
+    def diag(self, n_probes: int = 64, seed: Optional[int] = 0) -> np.ndarray:
+        """Diagonal of ``H_k``.
+
+        Exact in O(m^2 n) via the compact representation (Byrd, Nocedal &
+        Schnabel, 1994) when ``H_k^0`` is diagonal:
+
+            H_k = H0 + W M W^T,  W = [S, H0 Y],
+            M = [[R^{-T} (D + Y^T H0 Y) R^{-1}, -R^{-T}], [-R^{-1}, 0]]
+
+        with ``R = triu(S^T Y)`` and ``D = diag(S^T Y)``. For general ``H0`` a
+        Hutchinson estimate with ``n_probes`` Rademacher vectors is returned.
+        """
+        d0 = self._h0_diagonal()
+        if d0 is None:
+            rng = np.random.default_rng(seed)
+            Z = rng.choice([-1.0, 1.0], size=(self.n, n_probes))
+            return np.mean(Z * self.matmat(Z), axis=1)
+        if not self.s_history:
+            return d0
+        S = np.column_stack(self.s_history)
+        Y = np.column_stack(self.y_history)
+        SY = S.T @ Y
+        R_inv = np.linalg.inv(np.triu(SY))
+        H0Y = d0[:, None] * Y
+        upper_left = R_inv.T @ (np.diag(np.diag(SY)) + Y.T @ H0Y) @ R_inv
+        m = S.shape[1]
+        M = np.block([[upper_left, -R_inv.T], [-R_inv, np.zeros((m, m))]])
+        W = np.hstack([S, H0Y])
+        return d0 + np.einsum("ij,jk,ik->i", W, M, W)
+
+    def to_dense(self, max_dim: int = 5000) -> np.ndarray:
+        """Materialize ``H_k`` (n matvecs); refused for ``n > max_dim``."""
+        if self.n > max_dim:
+            raise ValueError(f"to_dense would allocate a {self.n}x{self.n} matrix; raise max_dim to allow it")
+        H = self.matmat(np.eye(self.n))
+        return 0.5 * (H + H.T)
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        other = np.asarray(other, dtype=float)
+        return self.matvec(other) if other.ndim == 1 else self.matmat(other)
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable, Optional, Sequence, Tuple
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Sequence, Tuple
 
 import numpy as np
 
-from .utils import OptimizeResult, ensure_1d
+from .telemetry import get_registry, record_solve
+from .utils import STATUS_MESSAGES, OptimizeResult, StoppingMonitor, ensure_1d
+
+
+class _Halt(Exception):
+    """Raised inside SciPy's loop to stop the solve with ``status``."""
+
+    def __init__(self, status: str) -> None:
+        super().__init__(status)
+        self.status = status
 
 
 def lbfgsb(
@@ -14,7 +25,10 @@ def lbfgsb(
     bounds: Optional[Sequence[Tuple[Optional[float], Optional[float]]]] = None,
     max_iter: int = 15000,
     tol: float = 1e-6,
-    callback: Optional[Callable[[OptimizeResult], None]] = None,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+    max_fun: Optional[int] = None,
+    max_grad: Optional[int] = None,
+    time_limit: Optional[float] = None,
     **kwargs,
 ) -> OptimizeResult:
     """L-BFGS-B via SciPy's reference implementation.
@@ -23,40 +37,122 @@ def lbfgsb(
     handling to SciPy. SciPy is an optional dependency; an informative error is
     raised if it is missing.
 
+    ``callback`` is called after every iteration with an in-progress
+    ``OptimizeResult`` whose ``extra_info`` has the ``lbfgs`` fields: ``m``,
+    ``s_history`` / ``y_history`` (rebuilt from consecutive iterates and
+    gradients with the same curvature test as ``lbfgs``) and ``alpha``, which
+    SciPy does not expose and is reported as NaN. Returning ``True`` stops the
+    run with status ``"callback"``.
+
+    ``max_fun`` / ``max_grad`` / ``time_limit`` are checked before every
+    evaluation and after every iteration (see ``StoppingMonitor``); a stopped
+    run returns the last accepted iterate.
+
     Notes on counters:
 
-    - `n_fun`: number of objective evaluations. When using SciPy's `fmin_l_bfgs_b`
-      with a callable that returns both `(f, g)`, SciPy reports `funcalls` which
-      corresponds to how many times that callable was invoked.
+    - `n_fun`: number of objective evaluations. `f_and_g` remembers its most
+      recent points, so a point SciPy (or the callback) asks for again is
+      never re-evaluated.
     - `n_grad`: since the same callable returns the gradient each time, we set
-      `n_grad == n_fun == funcalls`.
+      `n_grad == n_fun`.
     """
     try:
         from scipy.optimize import fmin_l_bfgs_b
     except ImportError as exc:  # pragma: no cover - exercised only without SciPy
         raise ImportError("SciPy is required for lbfgsb; install qnm[dev] or scipy") from exc
 
+    registry = get_registry()
+    t_start = time.perf_counter()
+    monitor = StoppingMonitor(max_fun, max_grad, time_limit)
     x0 = ensure_1d(x0)
+    m = int(kwargs.get("m", 10))
+
+    # Most recent evaluations as (x, f, g); the accepted iterate is normally the last one
+    recent: Deque[Tuple[np.ndarray, float, np.ndarray]] = deque(maxlen=4)
+    s_history: Deque[np.ndarray] = deque(maxlen=m)
+    y_history: Deque[np.ndarray] = deque(maxlen=m)
+    n_fun = 0
+    n_iter = 0
+    accepted: Optional[Tuple[np.ndarray, float, np.ndarray]] = None
+
+    def lookup(x: np.ndarray) -> Optional[Tuple[np.ndarray, float, np.ndarray]]:
+        for entry in reversed(recent):
+            if np.array_equal(entry[0], x):
+                return entry
+        return None
 
     def f_and_g(x: np.ndarray) -> Tuple[float, np.ndarray]:
-        return float(fun(x)), grad(x)
-
-    x_opt, f_opt, info = fmin_l_bfgs_b(f_and_g, x0, bounds=bounds, pgtol=tol, maxiter=max_iter, **kwargs)
-    grad_opt = info.get("grad", np.zeros_like(x_opt))
-    success = info.get("warnflag", 1) == 0
-    message = info.get("task", "unknown")
-
-    result = OptimizeResult(
-        x=ensure_1d(x_opt),
-        fun=float(f_opt),
-        grad=ensure_1d(grad_opt),
-        n_iter=int(info.get("nit", 0)),
-        n_fun=int(info.get("funcalls", 0)),
-        n_grad=int(info.get("funcalls", 0)),
-        success=success,
-        status="converged" if success else "warning",
-        message=message,
-    )
-    if callback is not None:
-        callback(result)
+        nonlocal n_fun, accepted
+        entry = lookup(x)
+        if entry is None:
+            if accepted is not None:
+                status = monitor.budget_status(n_fun, n_fun)
+                if status is not None:
+                    raise _Halt(status)
+            entry = (np.array(x, dtype=float), float(fun(x)), ensure_1d(grad(x)))
+            n_fun += 1
+            recent.append(entry)
+            if accepted is None:
+                accepted = entry
+        return entry[1], entry[2].copy()
+
+    def on_iteration(xk: np.ndarray) -> None:
+        nonlocal n_iter, accepted
+        n_iter += 1
+        entry = lookup(np.asarray(xk, dtype=float))
+        if entry is None:  # pragma: no cover - SciPy reports an evaluated point
+            entry = recent[-1]
+        prev, accepted = accepted, entry
+        if callback is not None:
+            s = entry[0] - prev[0]
+            y = entry[2] - prev[2]
+            if float(np.dot(y, s)) > 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+                s_history.append(s)
+                y_history.append(y)
+            res = OptimizeResult(entry[0].copy(), entry[1], entry[2].copy(), n_iter, n_fun, n_fun, True, "iter",
+                                 "In-progress")
+            res.extra_info = {
+                "alpha": float("nan"),
+                "m": m,
+                "s_history": list(s_history),
+                "y_history": list(y_history),
+            }
+            if callback(res) is True:
+                raise _Halt("callback")
+        status = monitor.budget_status(n_fun, n_fun)
+        if status is not None:
+            raise _Halt(status)
+
+    try:
+        x_opt, f_opt, info = fmin_l_bfgs_b(
+            f_and_g, x0, bounds=bounds, pgtol=tol, maxiter=max_iter, callback=on_iteration, **kwargs
+        )
+    except _Halt as halt:
+        x_opt, f_opt, grad_opt = accepted
+        result = OptimizeResult(
+            x=x_opt.copy(),
+            fun=f_opt,
+            grad=grad_opt.copy(),
+            n_iter=n_iter,
+            n_fun=n_fun,
+            n_grad=n_fun,
+            success=False,
+            status=halt.status,
+            message=STATUS_MESSAGES[halt.status],
+        )
+    else:
+        grad_opt = info.get("grad", np.zeros_like(x_opt))
+        success = info.get("warnflag", 1) == 0
+        result = OptimizeResult(
+            x=ensure_1d(x_opt),
+            fun=float(f_opt),
+            grad=ensure_1d(grad_opt),
+            n_iter=int(info.get("nit", n_iter)),
+            n_fun=n_fun,
+            n_grad=n_fun,
+            success=success,
+            status="converged" if success else "warning",
+            message=info.get("task", "unknown"),
+        )
+    record_solve(registry, "lbfgsb", result, t_start)
     return result
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bfgs import bfgs
+from .lbfgs import lbfgs
+from .lbfgsb import lbfgsb
+from .utils import OptimizeResult, ensure_1d
+
+# Peak number of live n x n arrays during the dense BFGS update (H, I and the
+# product-form temporaries of Eq. 6.17), measured with tracemalloc.
+_BFGS_DENSE_ARRAYS = 5
+# Length-n vectors live besides the 2m history pairs in lbfgs (x, g, p, q, r,
+# trial point/gradient in the line search, s, y, ...).
+_LBFGS_EXTRA_VECTORS = 10
+# Problems up to this size default to dense BFGS when no budget is given
+# (see docs/theory/lbfgs.md, "Applicable Scale").
+_BFGS_MAX_DIM = 1000
+
+
+@dataclass(frozen=True)
+class SolverPlan:
+    """Solver decision made by ``minimize`` and its predicted cost.
+
+    ``predicted_bytes`` is the peak solver workspace (excluding the user's
+    objective). ``predicted_seconds`` is the solver overhead for ``max_iter``
+    iterations at ``flops_per_second`` (excluding ``fun``/``grad`` time).
+    """
+
+    method: str
+    m: Optional[int]
+    predicted_bytes: int
+    predicted_seconds: float
+    reason: str
+
+
+def predicted_footprint(method: str, n: int, m: int = 10, itemsize: int = 8) -> int:
+    """Predicted peak workspace in bytes for ``bfgs``/``lbfgs``/``lbfgsb``."""
+    if method == "bfgs":
+        return (_BFGS_DENSE_ARRAYS * n * n + _LBFGS_EXTRA_VECTORS * n) * itemsize
+    if method in ("lbfgs", "lbfgsb"):
+        return (2 * m + _LBFGS_EXTRA_VECTORS) * n * itemsize
+    raise ValueError(f"Unknown method: {method}")
+
+
+def predicted_flops_per_iter(method: str, n: int, m: int = 10) -> float:
+    """Predicted solver flops per iteration (excluding ``fun``/``grad``)."""
+    if method == "bfgs":
+        # Two dense n x n matrix products in the product-form update (Eq. 6.17)
+        return 4.0 * n**3 + 10.0 * n**2
+    if method in ("lbfgs", "lbfgsb"):
+        # Two-loop recursion: 4m level-1 passes of 2n flops (Alg. 7.4)
+        return 8.0 * m * n + 10.0 * n
+    raise ValueError(f"Unknown method: {method}")
+
+
+def plan_solver(
+    n: int,
+    memory_budget: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    max_iter: int = 200,
+    m: Optional[int] = None,
+    m_min: int = 3,
+    m_max: int = 20,
+    flops_per_second: float = 1e9,
+    itemsize: int = 8,
+    bounded: bool = False,
+) -> SolverPlan:
+    """Choose BFGS or L-BFGS (and its memory size m) for an n-dimensional problem.
+
+    Dense BFGS is preferred when it fits both budgets and ``n`` is small
+    enough; otherwise L-BFGS with the largest ``m`` in ``[m_min, m_max]`` that
+    fits. ``memory_budget`` is in bytes and ``time_budget`` in seconds of solver
+    overhead over ``max_iter`` iterations. ``bounded=True`` plans L-BFGS-B the
+    same way, without the dense option. A ``ValueError`` is raised when even
+    ``m_min`` does not fit.
+    """
+
+    def seconds(method: str, m_: int = 10) -> float:
+        return predicted_flops_per_iter(method, n, m_) * max_iter / flops_per_second
+
+    def fits(method: str, m_: int = 10) -> bool:
+        if memory_budget is not None and predicted_footprint(method, n, m_, itemsize) > memory_budget:
+            return False
+        if time_budget is not None and seconds(method, m_) > time_budget:
+            return False
+        return True
+
+    limited = "lbfgsb" if bounded else "lbfgs"
+    if not bounded and m is None and n <= _BFGS_MAX_DIM and fits("bfgs"):
+        return SolverPlan(
+            method="bfgs",
+            m=None,
+            predicted_bytes=predicted_footprint("bfgs", n, itemsize=itemsize),
+            predicted_seconds=seconds("bfgs"),
+            reason=f"n={n} <= {_BFGS_MAX_DIM} and dense H fits the budgets",
+        )
+
+    candidates = [m] if m is not None else range(m_max, m_min - 1, -1)
+    for m_ in candidates:
+        if fits(limited, m_):
+            if m is not None:
+                reason = f"m={m} requested"
+            elif bounded:
+                reason = "bounds given; largest m fitting the budgets"
+            elif n > _BFGS_MAX_DIM:
+                reason = f"n={n} > {_BFGS_MAX_DIM}; largest m fitting the budgets"
+            else:
+                reason = "dense H exceeds the budgets; largest m fitting the budgets"
+            return SolverPlan(
+                method=limited,
+                m=m_,
+                predicted_bytes=predicted_footprint(limited, n, m_, itemsize),
+                predicted_seconds=seconds(limited, m_),
+                reason=reason,
+            )
+
+    m_low = candidates[-1]
+    raise ValueError(
+        f"No solver fits the budgets for n={n}: {'L-BFGS-B' if bounded else 'L-BFGS'} with m={m_low} needs "
+        f"{predicted_footprint(limited, n, m_low, itemsize)} bytes and "
+        f"{seconds(limited, m_low):.3g} s"
+    )
+
+
+def minimize(
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    x0: np.ndarray,
+    method: str = "auto",
+    bounds: Optional[Sequence[Tuple[Optional[float], Optional[float]]]] = None,
+    memory_budget: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    m: Optional[int] = None,
+    max_iter: int = 200,
+    tol: float = 1e-6,
+    flops_per_second: float = 1e9,
+    itemsize: int = 8,
+    **kwargs,
+) -> OptimizeResult:
+    """Front door that selects a quasi-Newton solver and reports the decision.
+
+    ``method="auto"`` uses ``plan_solver`` to pick ``bfgs`` or ``lbfgs`` (and
+    ``m``) from the problem size and the budgets; with ``bounds`` it plans
+    ``lbfgsb``. An explicit ``method`` skips the selection but the predicted
+    footprint is still reported; only ``lbfgsb`` accepts ``bounds`` and
+    ``bfgs`` takes no ``m``. Footprints are predicted for ``itemsize``-byte
+    elements. Remaining keyword arguments are forwarded to the selected
+    solver. The plan is attached as ``result.plan``.
+    """
+    x0 = ensure_1d(x0)
+    n = x0.size
+
+    if bounds is not None and method in ("bfgs", "lbfgs"):
+        raise ValueError(f"method {method!r} does not support bounds; use 'lbfgsb' or 'auto'")
+    if m is not None and method == "bfgs":
+        raise ValueError("method 'bfgs' keeps a dense inverse Hessian and takes no m; use 'lbfgs' or 'auto'")
+
+    if method == "auto":
+        plan = plan_solver(
+            n, memory_budget=memory_budget, time_budget=time_budget, max_iter=max_iter, m=m,
+            flops_per_second=flops_per_second, bounded=bounds is not None, itemsize=itemsize,
+        )
+    elif method in ("bfgs", "lbfgs", "lbfgsb"):
+        m_ = None if method == "bfgs" else (10 if m is None else m)
+        plan = SolverPlan(
+            method=method,
+            m=m_,
+            predicted_bytes=predicted_footprint(method, n, m_ or 10, itemsize),
+            predicted_seconds=predicted_flops_per_iter(method, n, m_ or 10) * max_iter / flops_per_second,
+            reason="requested explicitly",
+        )
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    if plan.method == "bfgs":
+        result = bfgs(fun, grad, x0, max_iter=max_iter, tol=tol, **kwargs)
+    elif plan.method == "lbfgs":
+        result = lbfgs(fun, grad, x0, m=plan.m, max_iter=max_iter, tol=tol, **kwargs)
+    else:
+        result = lbfgsb(fun, grad, x0, bounds=bounds, max_iter=max_iter, tol=tol, m=plan.m, **kwargs)
+    result.plan = plan
+    return result
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import tempfile
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .line_search import line_search
+from .utils import OptimizeResult
+
+# 2**17 float64 elements = 1 MiB per operand, about the size of an L2 cache.
+DEFAULT_CHUNK_SIZE = 1 << 17
+
+
+class MemmapWorkspace:
+    """Length-n vectors backed by ``np.memmap`` files in a scratch directory.
+
+    All vector operations stream over ``chunk_size`` elements at a time and
+    never allocate a full-length temporary. After each chunk the pages of
+    memmap vectors are released with ``madvise(MADV_DONTNEED)`` so the
+    resident set stays at a few chunks; the data itself stays in the files
+    (and the OS page cache).
+    """
+
+    def __init__(
+        self,
+        n: int,
+        dtype: np.dtype | type = np.float64,
+        scratch_dir: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.n = n
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self.directory = tempfile.mkdtemp(prefix="qnm-", dir=scratch_dir)
+        self._owned: dict[int, np.memmap] = {}
+
+    def vector(self, name: str) -> np.memmap:
+        """Allocate a zero-initialized memmap vector ``<scratch>/<name>.dat``."""
+        path = os.path.join(self.directory, f"{name}.dat")
+        v = np.memmap(path, dtype=self.dtype, mode="w+", shape=(self.n,))
+        self._owned[id(v)] = v
+        return v
+
+    def chunks(self) -> Iterator[slice]:
+        for start in range(0, self.n, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, self.n))
+
+    def release(self, sl: slice, *arrays: Optional[np.ndarray]) -> None:
+        """Drop the resident pages of ``sl`` for whole-file memmap vectors.
+
+        Other arrays (in-memory arrays, memmap views, ``None``) are ignored.
+        Shared file mappings keep their data, so this never loses writes.
+        """
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        for a in arrays:
+            if isinstance(a, np.memmap) and isinstance(a.base, mmap.mmap) and a.offset == 0:
+                start = (sl.start * a.itemsize) // mmap.PAGESIZE * mmap.PAGESIZE
+                a.base.madvise(mmap.MADV_DONTNEED, start, sl.stop * a.itemsize - start)
+
+    def copy(self, src: np.ndarray, dst: np.ndarray) -> None:
+        for sl in self.chunks():
+            dst[sl] = src[sl]
+            self.release(sl, src, dst)
+
+    def dot(self, a: np.ndarray, b: np.ndarray) -> float:
+        total = 0.0
+        for sl in self.chunks():
+            total += float(np.dot(a[sl].astype(np.float64, copy=False), b[sl].astype(np.float64, copy=False)))
+            self.release(sl, a, b)
+        return total
+
+    def norm_inf(self, a: np.ndarray) -> float:
+        result = 0.0
+        for sl in self.chunks():
+            result = max(result, float(np.max(np.abs(a[sl]))))
+            self.release(sl, a)
+        return result
+
+    def scale(self, alpha: float, x: np.ndarray, out: np.ndarray) -> None:
+        """out = alpha * x"""
+        for sl in self.chunks():
+            np.multiply(x[sl], alpha, out=out[sl], casting="unsafe")
+            self.release(sl, x, out)
+
+    def lincomb(self, out: np.ndarray, x: np.ndarray, alpha: float, y: np.ndarray, beta: float = 1.0) -> None:
+        """out = beta * x + alpha * y (e.g. the trial point x + alpha * p)."""
+        for sl in self.chunks():
+            out[sl] = beta * x[sl] + alpha * y[sl]
+            self.release(sl, out, x, y)
+
+    def axpy_dot(self, alpha: float, x: np.ndarray, y: np.ndarray, z: Optional[np.ndarray]) -> float:
+        """y += alpha * x, fused with the next ``dot(z, y)`` in the same pass."""
+        total = 0.0
+        for sl in self.chunks():
+            y_sl = y[sl]
+            y_sl += alpha * x[sl]
+            if z is not None:
+                total += float(np.dot(z[sl].astype(np.float64, copy=False), y_sl.astype(np.float64, copy=False)))
+            self.release(sl, x, y, z)
+        return total
+
+    def close(self, keep: Tuple[np.ndarray, ...] = ()) -> None:
+        """Flush and unmap all vectors except ``keep``; remove their files."""
+        keep_ids = {id(a) for a in keep}
+        for key in [key for key in self._owned if key not in keep_ids]:
+            path = self._owned.pop(key).filename
+            # The mapping is released with the last reference; an unlinked file stays valid until then
+            os.remove(path)
+        for v in self._owned.values():
+            v.flush()
+        if not keep_ids:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def two_loop_recursion_chunked(
+    ws: MemmapWorkspace,
+    grad_k: np.ndarray,
+    s_history: List[np.ndarray],
+    y_history: List[np.ndarray],
+    rho_history: List[float],
+    out: np.ndarray,
+) -> None:
+    """Write -H_k * grad_k into ``out`` (Alg. 7.4, Nocedal & Wright) chunk-wise.
+
+    Each axpy is fused with the dot product needed by the next pair, so the
+    recursion costs 2m + 6 streaming passes instead of 4m + 4.
+    """
+    m = len(s_history)
+    ws.copy(grad_k, out)
+    if m == 0:
+        ws.scale(-1.0, out, out)
+        return
+
+    alphas = [0.0] * m
+    sq = ws.dot(s_history[-1], out)
+    for i in range(m - 1, -1, -1):
+        alphas[i] = rho_history[i] * sq
+        sq = ws.axpy_dot(-alphas[i], y_history[i], out, s_history[i - 1] if i > 0 else None)
+
+    # H_k^0 scaling factor (Eq. 7.20, p. 178)
+    gamma = 1.0 / (rho_history[-1] * ws.dot(y_history[-1], y_history[-1]))
+    ws.scale(gamma, out, out)
+
+    yr = ws.dot(y_history[0], out)
+    for i in range(m):
+        beta = rho_history[i] * yr
+        yr = ws.axpy_dot(alphas[i] - beta, s_history[i], out, y_history[i + 1] if i + 1 < m else None)
+    ws.scale(-1.0, out, out)
+
+
+def lbfgs_out_of_core(
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    x0: np.ndarray,
+    m: int = 10,
+    max_iter: int = 200,
+    tol: float = 1e-6,
+    scratch_dir: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype: Optional[np.dtype | type] = None,
+    line_search_kwargs: Optional[dict] = None,
+    callback: Optional[Callable[[OptimizeResult], None]] = None,
+) -> OptimizeResult:
+    """L-BFGS whose iterate, gradient and history ring live in memmap files.
+
+    Same algorithm as ``qnm.lbfgs`` (Chapter 7 of Nocedal & Wright), but every
+    vector is an ``np.memmap`` in a fresh directory under ``scratch_dir`` and
+    all dots/axpys, the two-loop recursion and the line search's trial points
+    are streamed in ``chunk_size`` blocks. ``fun``/``grad`` receive memmap
+    vectors; the array returned by ``grad`` is copied chunk-wise into the
+    workspace, so returning a memmap (or a view of one) keeps the whole solve
+    out of core. ``dtype`` defaults to ``x0.dtype`` (float32 halves the I/O).
+
+    The returned ``x`` and ``grad`` are memmaps whose files are kept in the
+    scratch directory; every other workspace file is removed. If ``fun`` or
+    ``grad`` raises, the whole scratch directory is removed.
+    """
+    line_search_kwargs = line_search_kwargs or {}
+    if not hasattr(x0, "dtype"):
+        x0 = np.asarray(x0, dtype=float)
+    n = x0.shape[0]
+    if dtype is None:
+        dtype = x0.dtype if np.issubdtype(x0.dtype, np.floating) else np.float64
+    ws = MemmapWorkspace(n, dtype=dtype, scratch_dir=scratch_dir, chunk_size=chunk_size)
+
+    x = ws.vector("x")
+    g = ws.vector("g")
+    x_trial = ws.vector("x_trial")
+    g_trial = ws.vector("g_trial")
+    p = ws.vector("p")
+    s_slots = [ws.vector(f"s{i}") for i in range(m)]
+    y_slots = [ws.vector(f"y{i}") for i in range(m)]
+    rho_slots = [0.0] * m
+    history: Deque[int] = deque()
+
+    # Step lengths of the point in x_trial and of the gradient in g_trial
+    trial = {"x": None, "g": None}
+
+    def grad_into(x_eval: np.ndarray, out: np.ndarray) -> np.ndarray:
+        ws.copy(grad(x_eval), out)
+        return out
+
+    def trial_point(a: float) -> np.ndarray:
+        ws.lincomb(x_trial, x, a, p)
+        trial["x"] = a
+        return x_trial
+
+    def trial_grad(x_eval: np.ndarray) -> np.ndarray:
+        trial["g"] = trial["x"]
+        return grad_into(x_eval, g_trial)
+
+    def finish(k: int, success: bool, status: str, message: str) -> OptimizeResult:
+        ws.close(keep=(x, g))
+        return OptimizeResult(x, f, g, k, n_fun, n_grad, success, status, message)
+
+    try:
+        ws.copy(x0, x)
+        f = float(fun(x))
+        grad_into(x, g)
+        n_fun = 1
+        n_grad = 1
+
+        for k in range(1, max_iter + 1):
+            if ws.norm_inf(g) <= tol:
+                return finish(k - 1, True, "converged", "Gradient norm below tolerance")
+
+            two_loop_recursion_chunked(
+                ws, g, [s_slots[i] for i in history], [y_slots[i] for i in history], [rho_slots[i] for i in history],
+                p,
+            )
+            if ws.dot(p, g) >= 0:
+                # Reset memory if direction is not descent.
+                history.clear()
+                ws.scale(-1.0, g, p)
+
+            alpha, f_new, _, ls_fun, ls_grad = line_search(
+                fun,
+                trial_grad,
+                x,
+                p,
+                f0=f,
+                g0=g,
+                trial_point=trial_point,
+                dot=ws.dot,
+                **line_search_kwargs,
+            )
+            n_fun += ls_fun
+            n_grad += ls_grad
+            if alpha == 0.0:
+                return finish(k - 1, False, "line_search_failed", "Line search failed to find descent")
+
+            # A budget-limited search returns its best trial rather than its last
+            # one; x_trial/g_trial must hold x + alpha * p and its gradient.
+            if trial["x"] != alpha or trial["g"] != alpha:
+                trial_grad(trial_point(alpha))
+                n_grad += 1
+            slot = history.popleft() if len(history) == m else next(i for i in range(m) if i not in history)
+            s, y = s_slots[slot], y_slots[slot]
+            ws.scale(alpha, p, s)
+            ws.lincomb(y, g_trial, -1.0, g)
+            ys = ws.dot(y, s)
+            if ys <= 1e-12 * np.sqrt(ws.dot(s, s) * ws.dot(y, y)):
+                history.clear()
+            else:
+                rho_slots[slot] = 1.0 / ys
+                history.append(slot)
+
+            x, x_trial = x_trial, x
+            g, g_trial = g_trial, g
+            f = f_new
+            trial["x"] = trial["g"] = None
+
+            if callback is not None:
+                res = OptimizeResult(x, f, g, k, n_fun, n_grad, True, "iter", "In-progress")
+                res.extra_info = {"alpha": float(alpha)}
+                callback(res)
+
+        return finish(max_iter, False, "max_iter", "Reached maximum iterations")
+    except BaseException:
+        # Remove the scratch files when fun/grad (or the caller's callback) raises
+        ws.close()
+        raise
@@ -0,0 +1,284 @@
+"""Partially separable quasi-Newton method (Griewank & Toint, 1982).
+
+Many objectives are sums of element functions that each depend on a few
+variables, ``f(x) = sum_e f_e(x[I_e])`` (Nocedal & Wright, Sec. 7.4). Each
+element keeps its own small dense Hessian approximation ``B_e`` (``|I_e| x
+|I_e|``), updated with the element pair ``(s[I_e], grad f_e(x_new) - grad
+f_e(x))``. The assembled approximation ``B = sum_e U_e^T B_e U_e`` has the
+sparsity of the true Hessian, and the Newton system ``B p = -g`` is solved
+matrix-free by truncated CG. Storage is ``sum_e |I_e|^2`` values, linear in
+``n`` for bounded element sizes, and each element update is exact where a
+dense update would mix unrelated variables.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .line_search import line_search
+from .telemetry import get_registry, record_solve
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, StoppingMonitor, ensure_1d, grad_norm
+
+# Element steps below this fraction of the element's variables are treated as roundoff
+_STEP_RTOL = np.sqrt(np.finfo(float).eps)
+
+
+@dataclass(frozen=True)
+class ElementFunction:
+    """Elements that share one function, ``f_e(x) = fun(x[indices[e]])``.
+
+    ``indices`` is an ``(E, k)`` integer array (or ``(k,)`` for a single
+    element). ``fun`` maps the ``(E, k)`` array of element variables to the
+    ``(E,)`` element values, and ``grad`` maps it to their ``(E, k)``
+    gradients. Declaring many elements in one group keeps the evaluation
+    vectorized.
+    """
+
+    indices: np.ndarray
+    fun: Callable[[np.ndarray], np.ndarray]
+    grad: Callable[[np.ndarray], np.ndarray]
+
+    def __post_init__(self) -> None:
+        indices = np.atleast_2d(np.asarray(self.indices, dtype=np.intp))
+        if indices.ndim != 2:
+            raise ValueError(f"element indices must be (E, k), got shape {indices.shape}")
+        object.__setattr__(self, "indices", indices)
+
+
+class PartiallySeparable:
+    """``f(x) = sum`` of the element values of all ``elements`` over ``n`` variables.
+
+    ``fun``/``grad`` make the structure usable with the other solvers too.
+    """
+
+    def __init__(self, elements: Sequence[ElementFunction], n: int) -> None:
+        self.elements = list(elements)
+        self.n = n
+        for element in self.elements:
+            if element.indices.size and (element.indices.min() < 0 or element.indices.max() >= n):
+                raise ValueError(f"element indices out of range for n={n}")
+
+    def evaluate(self, x: np.ndarray) -> Tuple[float, np.ndarray, List[np.ndarray]]:
+        """Value, assembled gradient and the per-group element gradients at ``x``."""
+        f = 0.0
+        g = np.zeros(self.n)
+        element_grads = []
+        for element in self.elements:
+            xe = x[element.indices]
+            f += float(np.sum(element.fun(xe)))
+            ge = np.asarray(element.grad(xe), dtype=float).reshape(xe.shape)
+            g += np.bincount(element.indices.ravel(), weights=ge.ravel(), minlength=self.n)
+            element_grads.append(ge)
+        return f, g, element_grads
+
+    def fun(self, x: np.ndarray) -> float:
+        return self.evaluate(ensure_1d(x))[0]
+
+    def grad(self, x: np.ndarray) -> np.ndarray:
+        return self.evaluate(ensure_1d(x))[1]
+
+
+class ElementHessians:
+    """Dense ``B_e`` for every element of one ``ElementFunction``, stored as ``(E, k, k)``.
+
+    Each ``B_e`` starts as ``I`` and is scaled by ``y_e^T y_e / s_e^T y_e``
+    before its first update (Eq. 6.20). ``"bfgs"`` updates (Eq. 6.19) are
+    skipped for elements without positive curvature, so every ``B_e`` stays
+    positive definite; ``"sr1"`` updates (Eq. 6.24) are skipped when their
+    denominator is small (Eq. 6.26).
+    """
+
+    def __init__(self, indices: np.ndarray, update: str, r: float = 1e-8) -> None:
+        n_elements, k = indices.shape
+        self.indices = indices
+        self.update_kind = update
+        self.r = r
+        self.B = np.broadcast_to(np.eye(k), (n_elements, k, k)).copy()
+        self._scaled = np.zeros(n_elements, dtype=bool)
+
+    def matvec(self, v: np.ndarray, out: np.ndarray) -> None:
+        """Add ``sum_e U_e^T B_e v[I_e]`` to ``out``."""
+        w = np.einsum("eij,ej->ei", self.B, v[self.indices])
+        out += np.bincount(self.indices.ravel(), weights=w.ravel(), minlength=out.size)
+
+    def update(self, s: np.ndarray, y: np.ndarray, x: np.ndarray) -> int:
+        """Update with the element pairs ``s``, ``y`` (both ``(E, k)``); returns the number skipped.
+
+        ``x`` holds the element variables at the new point. Elements whose
+        step is at roundoff level relative to ``x`` are left unchanged, since
+        their ``y`` is noise.
+        """
+        ys = np.einsum("ei,ei->e", y, s)
+        s_norm = np.linalg.norm(s, axis=1)
+        y_norm = np.linalg.norm(y, axis=1)
+        moved = s_norm > _STEP_RTOL * np.maximum(np.linalg.norm(x, axis=1), 1.0)
+        curved = moved & (ys > 1e-12 * s_norm * y_norm)
+        scale = ~self._scaled & curved
+        if scale.any():
+            self.B[scale] *= (np.einsum("ei,ei->e", y[scale], y[scale]) / ys[scale])[:, None, None]
+            self._scaled |= scale
+
+        Bs = np.einsum("eij,ej->ei", self.B, s)
+        if self.update_kind == "bfgs":
+            sBs = np.einsum("ei,ei->e", s, Bs)
+            ok = curved & (sBs > 0)
+            self.B[ok] += (
+                y[ok, :, None] * y[ok, None, :] / ys[ok, None, None]
+                - Bs[ok, :, None] * Bs[ok, None, :] / sBs[ok, None, None]
+            )
+        else:
+            v = y - Bs
+            vs = np.einsum("ei,ei->e", v, s)
+            ok = moved & (np.abs(vs) >= self.r * s_norm * np.linalg.norm(v, axis=1)) & (vs != 0)
+            self.B[ok] += v[ok, :, None] * v[ok, None, :] / vs[ok, None, None]
+        # Elements whose variables did not move carry no information and are not counted
+        return int(np.count_nonzero(~ok & moved))
+
+
+def _truncated_cg(matvec: Callable[[np.ndarray], np.ndarray], g: np.ndarray, rtol: float,
+                  max_iter: int) -> Tuple[np.ndarray, int]:
+    """Approximate solution of ``B p = -g`` (Alg. 7.1, Newton-CG, Nocedal & Wright).
+
+    Stops at ``||r|| <= rtol ||g||`` or at a direction of non-positive
+    curvature; the result is always a descent direction (``-g`` if the first
+    direction already has non-positive curvature).
+    """
+    p = np.zeros_like(g)
+    r = g.copy()
+    d = -r
+    rr = float(np.dot(r, r))
+    threshold = rtol * np.sqrt(rr)
+    for j in range(max_iter):
+        Bd = matvec(d)
+        dBd = float(np.dot(d, Bd))
+        if dBd <= 0:
+            return (-g if j == 0 else p), j
+        a = rr / dBd
+        p += a * d
+        r += a * Bd
+        rr_new = float(np.dot(r, r))
+        if np.sqrt(rr_new) <= threshold:
+            return p, j + 1
+        d = -r + (rr_new / rr) * d
+        rr = rr_new
+    return p, max_iter
+
+
+def psqn(
+    structure: PartiallySeparable,
+    x0: np.ndarray,
+    update: str = "bfgs",
+    max_iter: int = 200,
+    tol: float = 1e-6,
+    cg_max_iter: Optional[int] = None,
+    line_search_kwargs: Optional[dict] = None,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+    max_fun: Optional[int] = None,
+    max_grad: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    ftol: Optional[float] = None,
+    xtol: Optional[float] = None,
+    stall_window: Optional[int] = None,
+) -> OptimizeResult:
+    """Partially separable quasi-Newton method with a strong-Wolfe line search.
+
+    Every element of ``structure`` keeps a dense ``B_e`` updated by
+    ``update`` (``"bfgs"`` or ``"sr1"``, see ``ElementHessians``). The
+    direction solves ``sum_e U_e^T B_e U_e p = -g`` by truncated CG with the
+    forcing term ``min(0.5, sqrt(||g||)) ||g||`` (Eq. 7.3), at most
+    ``cg_max_iter`` (default ``n``) iterations. An indefinite SR1 model ends
+    CG at the first negative-curvature direction, so the step is always a
+    descent direction. The line search is the one used by ``bfgs``.
+
+    Stopping criteria and ``callback`` behave as in ``bfgs``. ``extra_info``
+    carries ``alpha``, ``cg_iters`` and ``updates_skipped`` (element updates
+    skipped in this iteration).
+    """
+    if update not in ("bfgs", "sr1"):
+        raise ValueError(f"update must be 'bfgs' or 'sr1', got {update!r}")
+    line_search_kwargs = line_search_kwargs or {}
+    monitor = StoppingMonitor(max_fun, max_grad, time_limit, ftol, xtol, stall_window)
+    registry = get_registry()
+    t_start = time.perf_counter()
+    x = ensure_1d(x0)
+    n = x.size
+    if n != structure.n:
+        raise ValueError(f"x0 has {n} entries but the structure has n={structure.n}")
+    cg_max_iter = cg_max_iter or n
+    hessians = [ElementHessians(element.indices, update) for element in structure.elements]
+
+    # fun and grad at the same point share one evaluation; the element gradients are kept for the update
+    cache: dict = {}
+
+    def evaluate(z: np.ndarray) -> Tuple[float, np.ndarray, List[np.ndarray]]:
+        if "x" not in cache or not np.array_equal(cache["x"], z):
+            cache["x"] = z.copy()
+            cache["value"] = structure.evaluate(z)
+        return cache["value"]
+
+    def fun(z: np.ndarray) -> float:
+        return evaluate(z)[0]
+
+    def grad(z: np.ndarray) -> np.ndarray:
+        return evaluate(z)[1].copy()
+
+    def matvec(v: np.ndarray) -> np.ndarray:
+        out = np.zeros(n)
+        for h in hessians:
+            h.matvec(v, out)
+        return out
+
+    f, g, element_grads = evaluate(x)
+    n_fun = 1
+    n_grad = 1
+
+    def result(n_iter: int, status: str) -> OptimizeResult:
+        res = OptimizeResult(x, f, g, n_iter, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status])
+        record_solve(registry, "psqn", res, t_start)
+        return res
+
+    for k in range(1, max_iter + 1):
+        if grad_norm(g) <= tol:
+            return result(k - 1, "converged")
+        status = monitor.budget_status(n_fun, n_grad)
+        if status is not None:
+            return result(k - 1, status)
+
+        rtol = min(0.5, float(np.sqrt(np.linalg.norm(g))))
+        p, cg_iters = _truncated_cg(matvec, g, rtol, cg_max_iter)
+        ls_kwargs = {**line_search_kwargs, **monitor.line_search_budget(n_fun, n_grad)}
+        alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **ls_kwargs)
+        n_fun += ls_fun
+        n_grad += ls_grad
+        if alpha == 0.0:
+            return result(k - 1, monitor.budget_status(n_fun, n_grad) or "line_search_failed")
+
+        s = alpha * p
+        x_new = x + s
+        if "x" not in cache or not np.array_equal(cache["x"], x_new):
+            n_grad += 1
+        _, _, element_grads_new = evaluate(x_new)
+        skipped = 0
+        for h, ge, ge_new in zip(hessians, element_grads, element_grads_new):
+            skipped += h.update(s[h.indices], ge_new - ge, x_new[h.indices])
+        if skipped and registry is not None:
+            registry.increment("updates_skipped", skipped, solver="psqn")
+
+        f_prev = f
+        x, f, g, element_grads = x_new, f_new, g_new, element_grads_new
+
+        if callback is not None:
+            res = OptimizeResult(x, f, g, k, n_fun, n_grad, True, "iter", "In-progress")
+            res.extra_info = {"alpha": float(alpha), "cg_iters": cg_iters, "updates_skipped": skipped}
+            if callback(res) is True:
+                return result(k, "callback")
+
+        status = monitor.progress_status(f_prev, f, s, x)
+        if status is not None:
+            return result(k, status)
+
+    return result(max_iter, "max_iter")
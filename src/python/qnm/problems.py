@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, Iterator, Optional, Tuple, Union
 
 import numpy as np
 
@@ -15,6 +16,9 @@ class Problem:
     grad: Callable[[np.ndarray], np.ndarray]
     x0: np.ndarray
     solution: np.ndarray | None = None
+    # Data-driven problems: mean value and gradient over a row range, and the row count
+    batch: Optional[Callable[[np.ndarray, slice], Tuple[float, np.ndarray]]] = None
+    n_rows: Optional[int] = None
 
 
 def quadratic_problem(dim: int = 2, condition_number: float = 10.0, seed: int | None = 0) -> Problem:
@@ -38,6 +42,46 @@ def quadratic_problem(dim: int = 2, condition_number: float = 10.0, seed: int |
     return Problem(name="quadratic", fun=fun, grad=grad, x0=x0, solution=x_star)
 
 
+def householder_quadratic_problem(
+    dim: int = 2, condition_number: float = 10.0, n_reflectors: int = 4, seed: int | None = 0
+) -> Problem:
+    """Matrix-free quadratic with the same spectrum as ``quadratic_problem``.
+
+    ``A = Q diag(lambda) Q^T`` with ``Q = H_1 ... H_k`` a product of ``k``
+    Householder reflectors ``H_i = I - 2 v_i v_i^T``, so setup, ``fun`` and
+    ``grad`` cost O(k n) time and memory, and ``x* = Q diag(1/lambda) Q^T b``
+    is available in closed form.
+    """
+    rng = np.random.default_rng(seed)
+    V = rng.normal(size=(n_reflectors, dim))
+    V /= np.linalg.norm(V, axis=1, keepdims=True)
+    eigenvalues = np.linspace(1.0, condition_number, dim)
+    b = rng.normal(size=dim)
+
+    def apply_Q(x: np.ndarray) -> np.ndarray:
+        for v in V[::-1]:
+            x = x - 2.0 * float(v @ x) * v
+        return x
+
+    def apply_QT(x: np.ndarray) -> np.ndarray:
+        for v in V:
+            x = x - 2.0 * float(v @ x) * v
+        return x
+
+    def fun(x: np.ndarray) -> float:
+        x = ensure_1d(x)
+        z = apply_QT(x)
+        return 0.5 * float(z @ (eigenvalues * z)) - float(b @ x)
+
+    def grad(x: np.ndarray) -> np.ndarray:
+        x = ensure_1d(x)
+        return apply_Q(eigenvalues * apply_QT(x)) - b
+
+    x_star = apply_Q(apply_QT(b) / eigenvalues)
+    x0 = rng.normal(size=dim)
+    return Problem(name="householder_quadratic", fun=fun, grad=grad, x0=x0, solution=x_star)
+
+
 def rosenbrock_problem(dim: int = 2, a: float = 1.0, b: float = 100.0) -> Problem:
     if dim < 2:
         raise ValueError("Rosenbrock problem requires dim >= 2")
@@ -61,3 +105,148 @@ def rosenbrock_problem(dim: int = 2, a: float = 1.0, b: float = 100.0) -> Proble
     x_star = np.full(dim, a)
     return Problem(name="rosenbrock", fun=fun, grad=grad, x0=x0, solution=x_star)
 
+
+# Data-driven problems: design matrices given as arrays or ``.npy`` paths (memory-mapped)
+ArrayLike = Union[np.ndarray, str, "os.PathLike[str]"]
+# Rows per block in the streaming passes
+DEFAULT_BLOCK_SIZE = 1 << 14
+
+
+def _load(data: ArrayLike) -> np.ndarray:
+    if isinstance(data, (str, os.PathLike)):
+        data = np.load(data, mmap_mode="r")
+    if len(data) == 0:
+        raise ValueError("dataset has no rows")
+    return data
+
+
+def _blocks(rows: slice, block_size: int) -> Iterator[slice]:
+    for start in range(rows.start, rows.stop, block_size):
+        yield slice(start, min(start + block_size, rows.stop))
+
+
+def _fused(batch: Callable[[np.ndarray, slice], Tuple[float, np.ndarray]], n_rows: int):
+    """``fun``/``grad`` over all rows, sharing one pass over the data per point."""
+    cache: dict = {}
+    everything = slice(0, n_rows)
+
+    def evaluate(x: np.ndarray) -> Tuple[float, np.ndarray]:
+        x = ensure_1d(x)
+        last = cache.get("x")
+        if last is None or not np.array_equal(last, x):
+            cache["x"] = x.copy()
+            cache["fg"] = batch(x, everything)
+        return cache["fg"]
+
+    def fun(x: np.ndarray) -> float:
+        return evaluate(x)[0]
+
+    def grad(x: np.ndarray) -> np.ndarray:
+        return evaluate(x)[1].copy()
+
+    return fun, grad
+
+
+def least_squares_problem(
+    A: ArrayLike, b: ArrayLike, reg: float = 0.0, block_size: int = DEFAULT_BLOCK_SIZE
+) -> Problem:
+    """``f(x) = ||A x - b||^2 / (2 N) + reg ||x||^2 / 2`` streamed over row blocks.
+
+    ``A`` (N x d) and ``b`` (N,) are arrays or ``.npy`` paths opened with
+    ``mmap_mode="r"``. Each pass reads ``block_size`` rows at a time, so
+    temporaries are ``O(block_size)``, never ``O(N)``. Each block is cast to
+    float64 as it is read, so float32 data is stored compactly but residuals,
+    products and sums are all computed in float64.
+
+    ``batch(x, rows)`` evaluates the same objective with the mean taken over
+    the row range ``rows`` only (for ``lbfgs_stochastic``).
+    """
+    A, b = _load(A), _load(b)
+    n_rows, dim = A.shape
+
+    def batch(x: np.ndarray, rows: slice) -> Tuple[float, np.ndarray]:
+        f = 0.0
+        g = np.zeros(dim)
+        for block in _blocks(rows, block_size):
+            Ab = np.asarray(A[block], dtype=np.float64)
+            r = Ab @ x - np.asarray(b[block], dtype=np.float64)
+            f += 0.5 * float(np.dot(r, r))
+            g += Ab.T @ r
+        count = rows.stop - rows.start
+        return f / count + 0.5 * reg * float(x @ x), g / count + reg * x
+
+    fun, grad = _fused(batch, n_rows)
+    return Problem(name="least_squares", fun=fun, grad=grad, x0=np.zeros(dim), batch=batch, n_rows=n_rows)
+
+
+def logistic_regression_problem(
+    X: ArrayLike, y: ArrayLike, reg: float = 1e-4, block_size: int = DEFAULT_BLOCK_SIZE
+) -> Problem:
+    """Mean logistic loss with labels ``y`` in {0, 1} plus ``reg ||w||^2 / 2``.
+
+    ``f(w) = mean(log(1 + exp(z)) - y z) + reg ||w||^2 / 2`` with ``z = X w``,
+    streamed over row blocks like ``least_squares_problem``.
+    """
+    X, y = _load(X), _load(y)
+    n_rows, dim = X.shape
+
+    def batch(w: np.ndarray, rows: slice) -> Tuple[float, np.ndarray]:
+        wc = w.astype(X.dtype, copy=False)
+        f = 0.0
+        g = np.zeros(dim)
+        for block in _blocks(rows, block_size):
+            Xb = X[block]
+            yb = y[block]
+            z = Xb @ wc
+            f += float(np.sum(np.logaddexp(0, z) - yb * z))
+            # sigma(z) - y, computed without overflow for large |z|
+            r = np.exp(-np.logaddexp(0, -z)) - yb
+            g += Xb.T @ r.astype(X.dtype, copy=False)
+        count = rows.stop - rows.start
+        return f / count + 0.5 * reg * float(w @ w), g / count + reg * w
+
+    fun, grad = _fused(batch, n_rows)
+    return Problem(name="logistic_regression", fun=fun, grad=grad, x0=np.zeros(dim), batch=batch, n_rows=n_rows)
+
+
+def softmax_regression_problem(
+    X: ArrayLike,
+    y: ArrayLike,
+    n_classes: Optional[int] = None,
+    reg: float = 1e-4,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Problem:
+    """Mean multinomial cross-entropy with integer labels plus ``reg ||W||^2 / 2``.
+
+    The decision vector is ``W`` (d x K) flattened in C order; logits are
+    ``X W``. ``n_classes`` defaults to ``max(y) + 1`` (one pass over ``y``).
+    Streamed over row blocks like ``least_squares_problem``.
+    """
+    X, y = _load(X), _load(y)
+    n_rows, dim = X.shape
+    if n_classes is None:
+        n_classes = int(max(int(np.max(y[block])) for block in _blocks(slice(0, n_rows), block_size))) + 1
+
+    def batch(x: np.ndarray, rows: slice) -> Tuple[float, np.ndarray]:
+        W = x.reshape(dim, n_classes)
+        Wc = W.astype(X.dtype, copy=False)
+        f = 0.0
+        G = np.zeros((dim, n_classes))
+        for block in _blocks(rows, block_size):
+            Xb = X[block]
+            yb = np.asarray(y[block], dtype=np.intp)
+            Z = Xb @ Wc
+            Z = Z - Z.max(axis=1, keepdims=True)
+            log_norm = np.log(np.sum(np.exp(Z), axis=1))
+            idx = np.arange(len(yb))
+            f += float(np.sum(log_norm - Z[idx, yb]))
+            P = np.exp(Z - log_norm[:, None])
+            P[idx, yb] -= 1.0
+            G += Xb.T @ P
+        count = rows.stop - rows.start
+        return f / count + 0.5 * reg * float(x @ x), (G / count).ravel() + reg * x
+
+    fun, grad = _fused(batch, n_rows)
+    return Problem(
+        name="softmax_regression", fun=fun, grad=grad, x0=np.zeros(dim * n_classes), batch=batch, n_rows=n_rows
+    )
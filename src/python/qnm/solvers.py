@@ -0,0 +1,249 @@
+"""Reusable solver objects for repeated solves of one problem size.
+
+``LBFGSSolver`` and ``BFGSSolver`` allocate their workspace (curvature pair
+ring buffer or dense ``H``) once in the constructor, and ``solve`` updates it
+in place. They cover the core method only: gradient tolerance, ``max_iter``
+and the strong-Wolfe line search. Use ``lbfgs``/``bfgs`` for the other
+options (budgets, initial steps, nonmonotone search, adaptive memory).
+
+``solve(..., warm_start=True)`` starts from the curvature information left by
+the previous solve. This pays off when consecutive problems are close, e.g.
+a control loop re-solving with a slowly moving target.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from .inverse_hessian import DenseInverseHessian, LBFGSInverseHessian
+from .line_search import line_search
+from .telemetry import get_registry, record_solve
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, grad_norm
+
+
+def _as_x0(x0: np.ndarray, n: int) -> np.ndarray:
+    x = np.asarray(x0, dtype=float)
+    if x.shape != (n,):
+        x = x.reshape(-1)
+        if x.size != n:
+            raise ValueError(f"x0 has {x.size} elements; this solver was built for n={n}")
+    return x
+
+
+class LBFGSSolver:
+    """L-BFGS (Alg. 7.4/7.5, Nocedal & Wright) with a preallocated ``(m, n)`` pair buffer.
+
+    The newest ``m`` pairs live in the rows of ``S``/``Y`` as a ring buffer,
+    with ``rho_i = 1 / y_i^T s_i`` cached alongside. The two-loop recursion
+    writes into a preallocated direction vector.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        m: int = 10,
+        max_iter: int = 200,
+        tol: float = 1e-6,
+        line_search_kwargs: Optional[dict] = None,
+    ) -> None:
+        if n < 1 or m < 1:
+            raise ValueError(f"require n >= 1 and m >= 1, got n={n}, m={m}")
+        self.n = n
+        self.m = m
+        self.max_iter = max_iter
+        self.tol = tol
+        self.line_search_kwargs = dict(line_search_kwargs or {})
+        self.S = np.zeros((m, n))
+        self.Y = np.zeros((m, n))
+        self._rho = np.zeros(m)
+        self._alpha = np.zeros(m)
+        self._p = np.zeros(n)
+        self._start = 0  # ring index of the oldest pair
+        self._count = 0
+
+    def reset(self) -> None:
+        """Forget the stored curvature pairs."""
+        self._start = self._count = 0
+
+    def _slots(self):
+        """Ring indices from oldest to newest."""
+        return [(self._start + i) % self.m for i in range(self._count)]
+
+    def _direction(self, g: np.ndarray) -> np.ndarray:
+        q = self._p
+        np.copyto(q, g)
+        slots = self._slots()
+        S, Y, rho, alpha = self.S, self.Y, self._rho, self._alpha
+        for i in reversed(slots):
+            alpha[i] = rho[i] * np.dot(S[i], q)
+            q -= alpha[i] * Y[i]
+        if slots:
+            last = slots[-1]
+            # H_k^0 scaling factor (Eq. 7.20, p. 178)
+            q *= 1.0 / (rho[last] * np.dot(Y[last], Y[last]))
+        for i in slots:
+            beta = rho[i] * np.dot(Y[i], q)
+            q += (alpha[i] - beta) * S[i]
+        np.negative(q, out=q)
+        return q
+
+    def solve(
+        self,
+        fun: Callable[[np.ndarray], float],
+        grad: Callable[[np.ndarray], np.ndarray],
+        x0: np.ndarray,
+        warm_start: bool = False,
+    ) -> OptimizeResult:
+        """Minimize ``fun`` from ``x0``; ``warm_start`` keeps the previous solve's pairs."""
+        registry = get_registry()
+        t_start = time.perf_counter()
+        if not warm_start:
+            self.reset()
+        x = _as_x0(x0, self.n)
+        f = float(fun(x))
+        g = grad(x)
+        n_fun = n_grad = 1
+        status = "max_iter"
+        k = 0
+        for k in range(1, self.max_iter + 1):
+            if grad_norm(g) <= self.tol:
+                status = "converged"
+                k -= 1
+                break
+            p = self._direction(g)
+            if np.dot(p, g) >= 0:
+                # Reset memory if direction is not descent.
+                self.reset()
+                np.negative(g, out=p)
+            alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **self.line_search_kwargs)
+            n_fun += ls_fun
+            n_grad += ls_grad
+            if alpha == 0.0:
+                status = "line_search_failed"
+                k -= 1
+                break
+
+            slot = (self._start + self._count) % self.m
+            s, y = self.S[slot], self.Y[slot]
+            np.multiply(p, alpha, out=s)
+            np.subtract(g_new, g, out=y)
+            x = x + s
+            ys = float(np.dot(y, s))
+            if ys <= 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+                self.reset()
+            else:
+                self._rho[slot] = 1.0 / ys
+                if self._count < self.m:
+                    self._count += 1
+                else:
+                    self._start = (self._start + 1) % self.m
+            f, g = f_new, g_new
+
+        slots = self._slots()
+        res = OptimizeResult(
+            x, f, g, k, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status],
+            inverse_hessian=LBFGSInverseHessian([self.S[i].copy() for i in slots], [self.Y[i].copy() for i in slots],
+                                                n=self.n),
+            history_size=self.m,
+        )
+        record_solve(registry, "lbfgs", res, t_start)
+        return res
+
+
+class BFGSSolver:
+    """BFGS (Alg. 6.1, Nocedal & Wright) with a preallocated ``(n, n)`` inverse Hessian.
+
+    The update (Eq. 6.17) is applied in place in its rank-two form
+    ``H += c s s^T - rho (s (Hy)^T + (Hy) s^T)`` with
+    ``c = rho (1 + rho y^T H y)``, so an iteration costs ``O(n^2)`` and
+    allocates no ``n x n`` temporaries.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        max_iter: int = 200,
+        tol: float = 1e-6,
+        line_search_kwargs: Optional[dict] = None,
+    ) -> None:
+        if n < 1:
+            raise ValueError(f"require n >= 1, got n={n}")
+        self.n = n
+        self.max_iter = max_iter
+        self.tol = tol
+        self.line_search_kwargs = dict(line_search_kwargs or {})
+        self.H = np.eye(n)
+        self._T = np.empty((n, n))
+        self._Hy = np.empty(n)
+        self._p = np.empty(n)
+
+    def reset(self) -> None:
+        """Reset ``H`` to the identity."""
+        self.H.fill(0.0)
+        self.H.flat[:: self.n + 1] = 1.0
+
+    def _update(self, s: np.ndarray, y: np.ndarray, rho: float) -> None:
+        H, T, Hy = self.H, self._T, self._Hy
+        np.dot(H, y, out=Hy)
+        c = rho * (1.0 + rho * float(np.dot(y, Hy)))
+        np.outer(s, s, out=T)
+        T *= c
+        H += T
+        np.outer(s, Hy, out=T)
+        T *= rho
+        H -= T
+        H -= T.T
+
+    def solve(
+        self,
+        fun: Callable[[np.ndarray], float],
+        grad: Callable[[np.ndarray], np.ndarray],
+        x0: np.ndarray,
+        warm_start: bool = False,
+    ) -> OptimizeResult:
+        """Minimize ``fun`` from ``x0``; ``warm_start`` keeps the previous solve's ``H``."""
+        registry = get_registry()
+        t_start = time.perf_counter()
+        if not warm_start:
+            self.reset()
+        x = _as_x0(x0, self.n)
+        f = float(fun(x))
+        g = grad(x)
+        n_fun = n_grad = 1
+        status = "max_iter"
+        k = 0
+        for k in range(1, self.max_iter + 1):
+            if grad_norm(g) <= self.tol:
+                status = "converged"
+                k -= 1
+                break
+            # Search direction (Eq. 6.18)
+            p = np.dot(self.H, g, out=self._p)
+            np.negative(p, out=p)
+            alpha, f_new, g_new, ls_fun, ls_grad = line_search(fun, grad, x, p, f0=f, g0=g, **self.line_search_kwargs)
+            n_fun += ls_fun
+            n_grad += ls_grad
+            if alpha == 0.0:
+                status = "line_search_failed"
+                k -= 1
+                break
+
+            s = alpha * p
+            y = g_new - g
+            x = x + s
+            ys = float(np.dot(y, s))
+            if ys <= 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+                self.reset()
+            else:
+                self._update(s, y, 1.0 / ys)
+            f, g = f_new, g_new
+
+        res = OptimizeResult(
+            x, f, g, k, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status],
+            inverse_hessian=DenseInverseHessian(self.H.copy()),
+        )
+        record_solve(registry, "bfgs", res, t_start)
+        return res
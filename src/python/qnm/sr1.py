@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .telemetry import get_registry, record_solve
+from .utils import STATUS_MESSAGES, SUCCESS_STATUSES, OptimizeResult, StoppingMonitor, ensure_1d, grad_norm
+
+
+class DenseSR1:
+    """Dense SR1 Hessian approximation ``B`` (Eq. 6.24, Nocedal & Wright).
+
+    ``B`` starts as ``gamma * I`` with ``gamma = y^T y / s^T y`` from the first
+    pair if its curvature is positive (1 otherwise). The scaling is applied
+    before the first update only, so it never rescales earlier updates. Unlike BFGS the update does
+    not need ``s^T y > 0``, so ``B`` may become indefinite; it is skipped only
+    when its denominator is small (Eq. 6.26).
+    """
+
+    def __init__(self, n: int, r: float = 1e-8) -> None:
+        self.B = np.eye(n)
+        self.r = r
+        self._scaled = False
+
+    def matvec(self, v: np.ndarray) -> np.ndarray:
+        return self.B @ v
+
+    def update(self, s: np.ndarray, y: np.ndarray) -> bool:
+        """Apply the SR1 update; returns False when it is skipped."""
+        if not self._scaled:
+            ys = float(np.dot(y, s))
+            if ys > 0:
+                self.B *= float(np.dot(y, y)) / ys
+            self._scaled = True
+        v = y - self.B @ s
+        vs = float(np.dot(v, s))
+        if abs(vs) < self.r * np.linalg.norm(s) * np.linalg.norm(v):
+            return False
+        self.B += np.outer(v, v) / vs
+        return True
+
+
+class LimitedSR1:
+    """Limited-memory SR1 in compact form (Byrd, Nocedal & Schnabel, 1994).
+
+    With the newest ``m`` pairs in ``S``/``Y`` and ``B_0 = gamma * I``::
+
+        B = gamma * I + Psi @ inv(M) @ Psi.T,  Psi = Y - gamma * S,
+        M = D + L + L.T - gamma * S.T @ S
+
+    where ``D`` is the diagonal and ``L`` the strict lower triangle of
+    ``S.T @ Y``. ``gamma = y^T y / s^T y`` comes from the first pair with
+    positive curvature (1 until then); the compact form is rebuilt from the
+    stored pairs, so they keep their secant equations. A pair is stored only
+    if the SR1 denominator test (Eq. 6.26) passes against the current ``B``.
+    """
+
+    def __init__(self, n: int, m: int = 10, r: float = 1e-8) -> None:
+        self.n = n
+        self.m = m
+        self.r = r
+        self.gamma = 1.0
+        self._scaled = False
+        self.s_history: List[np.ndarray] = []
+        self.y_history: List[np.ndarray] = []
+        self._Psi = np.zeros((n, 0))
+        self._M: Optional[np.ndarray] = None
+        self._M_inv: Optional[np.ndarray] = None
+
+    def matvec(self, v: np.ndarray) -> np.ndarray:
+        out = self.gamma * v
+        if self._M is not None:
+            out = out + self._Psi @ (self._M_inv @ (self._Psi.T @ v))
+        return out
+
+    def _rebuild(self) -> None:
+        if not self.s_history:
+            self._Psi = np.zeros((self.n, 0))
+            self._M = self._M_inv = None
+            return
+        S = np.column_stack(self.s_history)
+        Y = np.column_stack(self.y_history)
+        SY = S.T @ Y
+        L = np.tril(SY, -1)
+        self._M = np.diag(np.diag(SY)) + L + L.T - self.gamma * (S.T @ S)
+        self._Psi = Y - self.gamma * S
+        # M is at most m x m, so its inverse is cheap and reused by every matvec
+        self._M_inv = np.linalg.pinv(self._M)
+
+    def update(self, s: np.ndarray, y: np.ndarray) -> bool:
+        """Store ``(s, y)`` (dropping the oldest pair); returns False when skipped."""
+        if not self._scaled:
+            ys = float(np.dot(y, s))
+            if ys > 0:
+                self.gamma = float(np.dot(y, y)) / ys
+                self._scaled = True
+                self._rebuild()
+        v = y - self.matvec(s)
+        vs = float(np.dot(v, s))
+        if abs(vs) < self.r * np.linalg.norm(s) * np.linalg.norm(v):
+            return False
+        self.s_history.append(s)
+        self.y_history.append(y)
+        if len(self.s_history) > self.m:
+            del self.s_history[0]
+            del self.y_history[0]
+        self._rebuild()
+        if np.linalg.cond(self._M) > 1.0 / np.finfo(float).eps:
+            # Dropping the oldest pair can leave M singular; restart from this pair
+            self.s_history = [s]
+            self.y_history = [y]
+            self._rebuild()
+        return True
+
+
+def _boundary_tau(z: np.ndarray, d: np.ndarray, delta: float) -> float:
+    """Positive ``tau`` with ``||z + tau * d|| = delta``."""
+    dd = float(np.dot(d, d))
+    zd = float(np.dot(z, d))
+    zz = float(np.dot(z, z))
+    return (-zd + np.sqrt(zd * zd + dd * (delta * delta - zz))) / dd
+
+
+def steihaug_cg(
+    matvec: Callable[[np.ndarray], np.ndarray],
+    g: np.ndarray,
+    delta: float,
+    max_iter: Optional[int] = None,
+) -> Tuple[np.ndarray, int]:
+    """Approximately minimize ``g^T p + p^T B p / 2`` subject to ``||p|| <= delta``.
+
+    CG-Steihaug (Algorithm 7.2, Nocedal & Wright) with the forcing term
+    ``min(0.5, sqrt(||g||)) * ||g||``. Stops on the boundary at negative
+    curvature or when an iterate leaves the region. Returns ``(p, iterations)``.
+    """
+    g_norm = float(np.linalg.norm(g))
+    eps = min(0.5, np.sqrt(g_norm)) * g_norm
+    z = np.zeros_like(g)
+    r = g.copy()
+    d = -r
+    rr = float(np.dot(r, r))
+    max_iter = g.size if max_iter is None else max_iter
+    for j in range(1, max_iter + 1):
+        Bd = matvec(d)
+        dBd = float(np.dot(d, Bd))
+        if dBd <= 0:
+            return z + _boundary_tau(z, d, delta) * d, j
+        alpha = rr / dBd
+        z_new = z + alpha * d
+        if np.linalg.norm(z_new) >= delta:
+            return z + _boundary_tau(z, d, delta) * d, j
+        r = r + alpha * Bd
+        rr_new = float(np.dot(r, r))
+        if np.sqrt(rr_new) < eps:
+            return z_new, j
+        d = -r + (rr_new / rr) * d
+        z, rr = z_new, rr_new
+    return z, max_iter
+
+
+def _sr1_trust_region(
+    name: str,
+    model,
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    x: np.ndarray,
+    max_iter: int,
+    tol: float,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]],
+    delta0: float,
+    delta_max: float,
+    eta: float,
+    monitor: StoppingMonitor,
+    history_size: Optional[int],
+) -> OptimizeResult:
+    """Algorithm 6.2 (SR1 trust-region method, Nocedal & Wright, p. 146)."""
+    registry = get_registry()
+    t_start = time.perf_counter()
+    n_fun = 0
+    n_grad = 0
+
+    f = float(fun(x))
+    g = grad(x)
+    n_fun += 1
+    n_grad += 1
+    delta = delta0
+
+    def result(n_iter: int, status: str) -> OptimizeResult:
+        res = OptimizeResult(
+            x, f, g, n_iter, n_fun, n_grad, status in SUCCESS_STATUSES, status, STATUS_MESSAGES[status],
+            history_size=history_size,
+        )
+        record_solve(registry, name, res, t_start)
+        return res
+
+    for k in range(1, max_iter + 1):
+        if grad_norm(g) <= tol:
+            return result(k - 1, "converged")
+        status = monitor.budget_status(n_fun, n_grad)
+        if status is not None:
+            return result(k - 1, status)
+        if delta <= np.finfo(float).eps * max(np.linalg.norm(x), 1.0):
+            return result(k - 1, "trust_region_collapsed")
+
+        s, cg_iters = steihaug_cg(model.matvec, g, delta)
+        pred = -(float(np.dot(g, s)) + 0.5 * float(np.dot(s, model.matvec(s))))
+        x_trial = x + s
+        f_trial = float(fun(x_trial))
+        g_trial = grad(x_trial)
+        n_fun += 1
+        n_grad += 1
+        ared = f - f_trial
+        rho = ared / pred if pred > 0 else -np.inf
+        step_norm = float(np.linalg.norm(s))
+
+        accepted = rho > eta
+        # The pair is informative whether or not the step is taken
+        if not model.update(s, g_trial - g) and registry is not None:
+            registry.increment("updates_skipped", solver=name)
+
+        if rho > 0.75:
+            if step_norm > 0.8 * delta:
+                delta = min(2.0 * delta, delta_max)
+        elif rho < 0.1:
+            delta = 0.5 * delta
+
+        f_prev = f
+        if accepted:
+            x, f, g = x_trial, f_trial, g_trial
+
+        if callback is not None:
+            res = OptimizeResult(x, f, g, k, n_fun, n_grad, True, "iter", "In-progress")
+            res.extra_info = {
+                "delta": float(delta),
+                "rho": float(rho),
+                "accepted": bool(accepted),
+                "step_norm": step_norm,
+                "cg_iters": cg_iters,
+            }
+            if callback(res) is True:
+                return result(k, "callback")
+
+        if accepted:
+            status = monitor.progress_status(f_prev, f, s, x)
+            if status is not None:
+                return result(k, status)
+
+    return result(max_iter, "max_iter")
+
+
+def sr1(
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    x0: np.ndarray,
+    max_iter: int = 200,
+    tol: float = 1e-6,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+    delta0: float = 1.0,
+    delta_max: float = 1e3,
+    eta: float = 1e-4,
+    max_fun: Optional[int] = None,
+    max_grad: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    ftol: Optional[float] = None,
+    xtol: Optional[float] = None,
+    stall_window: Optional[int] = None,
+) -> OptimizeResult:
+    """SR1 quasi-Newton method with a CG-Steihaug trust region.
+
+    This implementation follows Algorithm 6.2 in Nocedal & Wright,
+    'Numerical Optimization' (2nd Ed, 2006, p. 146). The SR1 matrix may be
+    indefinite, so on saddle-heavy objectives it keeps curvature information
+    that BFGS has to discard when ``s^T y <= 0``; the trust region (radius
+    ``delta0``, capped at ``delta_max``) replaces the line search. A step is
+    taken when ``ared / pred > eta``; every iteration costs one function and
+    one gradient evaluation, including rejected steps.
+
+    Stopping criteria and ``callback`` behave as in ``bfgs``; the run also
+    stops with ``"trust_region_collapsed"`` when the radius underflows.
+    ``extra_info`` carries ``delta``, ``rho``, ``accepted``, ``step_norm`` and
+    ``cg_iters``.
+    """
+    x = ensure_1d(x0)
+    monitor = StoppingMonitor(max_fun, max_grad, time_limit, ftol, xtol, stall_window)
+    return _sr1_trust_region(
+        "sr1", DenseSR1(x.size), fun, grad, x, max_iter, tol, callback, delta0, delta_max, eta, monitor, None
+    )
+
+
+def lsr1(
+    fun: Callable[[np.ndarray], float],
+    grad: Callable[[np.ndarray], np.ndarray],
+    x0: np.ndarray,
+    m: int = 10,
+    max_iter: int = 200,
+    tol: float = 1e-6,
+    callback: Optional[Callable[[OptimizeResult], Optional[bool]]] = None,
+    delta0: float = 1.0,
+    delta_max: float = 1e3,
+    eta: float = 1e-4,
+    max_fun: Optional[int] = None,
+    max_grad: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    ftol: Optional[float] = None,
+    xtol: Optional[float] = None,
+    stall_window: Optional[int] = None,
+) -> OptimizeResult:
+    """Limited-memory SR1 trust-region method.
+
+    Same algorithm and options as ``sr1``, with ``B`` held in the compact
+    form of ``LimitedSR1`` over the newest ``m`` pairs, so a Hessian-vector
+    product costs ``O(n m)``.
+    """
+    x = ensure_1d(x0)
+    monitor = StoppingMonitor(max_fun, max_grad, time_limit, ftol, xtol, stall_window)
+    return _sr1_trust_region(
+        "lsr1", LimitedSR1(x.size, m), fun, grad, x, max_iter, tol, callback, delta0, delta_max, eta, monitor, m
+    )
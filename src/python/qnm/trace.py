@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .utils import OptimizeResult
+
+_SCALAR_COLUMNS = ("n_iter", "fun", "grad_norm", "alpha", "ys", "step_norm", "n_pairs")
+
+
+class TraceRecorder:
+    """Columnar per-iteration trace, usable directly as a solver ``callback``.
+
+    Scalars (``n_iter``, ``fun``, ``grad_norm``, ``alpha``, ``ys``,
+    ``step_norm``, ``n_pairs``), iterates ``x``, gradients ``grad`` and
+    optionally the BFGS ``H`` snapshots are stored in preallocated NumPy
+    columns that double in capacity when full. Values missing from
+    ``extra_info`` are recorded as NaN. For L-BFGS, ``n_pairs`` is the
+    history length and the newest pair is stored in ``s``/``y``; ``prev_pair``
+    is the row holding the next older pair of the history (-1 if none). The
+    history after row ``i`` is found by following ``prev_pair`` from ``i``
+    ``n_pairs`` times; it is rows ``i - n_pairs + 1 .. i`` unless a pair was
+    replaced (``extra_info["pair_replaced"]``, see ``AdaptiveHistory``).
+
+    ``columns()`` returns contiguous views without copying and ``export()``
+    wraps them in ``memoryview`` objects so consumers (e.g. Pyodide's
+    ``getBuffer``) can transfer each column in one bulk copy.
+    """
+
+    def __init__(self, record_H: bool = False, capacity: int = 64) -> None:
+        self.record_H = record_H
+        self._capacity = capacity
+        self._size = 0
+        self._data: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _allocate(self, n: int, pairs: bool) -> None:
+        cap = self._capacity
+        self._data = {name: np.full(cap, np.nan) for name in _SCALAR_COLUMNS}
+        self._data["n_iter"] = np.zeros(cap, dtype=np.int64)
+        self._data["n_pairs"] = np.zeros(cap, dtype=np.int64)
+        self._data["x"] = np.empty((cap, n))
+        self._data["grad"] = np.empty((cap, n))
+        if pairs:
+            self._data["s"] = np.full((cap, n), np.nan)
+            self._data["y"] = np.full((cap, n), np.nan)
+            self._data["prev_pair"] = np.full(cap, -1, dtype=np.int64)
+        if self.record_H:
+            self._data["H"] = np.full((cap, n, n), np.nan)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for name, col in self._data.items():
+            shape = (self._capacity,) + col.shape[1:]
+            # Unwritten rows must read as NaN (s/y/H, missing scalars) or -1 (prev_pair)
+            fill = np.nan if col.dtype.kind == "f" else (-1 if name == "prev_pair" else 0)
+            new = np.full(shape, fill, dtype=col.dtype)
+            new[: self._size] = col[: self._size]
+            self._data[name] = new
+
+    def __call__(self, res: OptimizeResult) -> None:
+        x = np.asarray(res.x, dtype=float)
+        extra = getattr(res, "extra_info", None) or {}
+        if not self._data:
+            self._allocate(x.size, pairs="s_history" in extra)
+        elif self._size == self._capacity:
+            self._grow()
+        i = self._size
+        d = self._data
+        d["n_iter"][i] = res.n_iter
+        d["fun"][i] = res.fun
+        d["grad_norm"][i] = np.linalg.norm(res.grad)
+        for name in ("alpha", "ys", "step_norm"):
+            d[name][i] = extra.get(name, np.nan)
+        d["n_pairs"][i] = len(extra.get("s_history", ()))
+        if "s" in d and d["n_pairs"][i]:
+            d["s"][i] = extra["s_history"][-1]
+            d["y"][i] = extra["y_history"][-1]
+            if d["n_pairs"][i] > 1:
+                d["prev_pair"][i] = d["prev_pair"][i - 1] if extra.get("pair_replaced") else i - 1
+        d["x"][i] = x
+        d["grad"][i] = res.grad
+        if self.record_H:
+            d["H"][i] = extra["H"] if "H" in extra else np.nan
+        self._size += 1
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Views of the recorded rows (no copy; invalidated by further appends)."""
+        return {name: col[: self._size] for name, col in self._data.items()}
+
+    def export(self, max_points: Optional[int] = None) -> Dict[str, memoryview]:
+        """Contiguous buffers of every column, optionally downsampled.
+
+        With ``max_points`` the rows are reduced with ``downsample_indices``
+        (the reduced columns are copies; otherwise no data is copied).
+        ``prev_pair`` is renumbered to the kept rows; a link to a dropped row
+        becomes -1, so the reconstructed history then ends early.
+        """
+        cols = self.columns()
+        if max_points is not None and self._size > max_points:
+            idx = downsample_indices(cols["fun"], max_points)
+            cols = {name: np.ascontiguousarray(col[idx]) for name, col in cols.items()}
+            if "prev_pair" in cols:
+                prev = cols["prev_pair"]
+                pos = np.minimum(np.searchsorted(idx, prev), idx.size - 1)
+                cols["prev_pair"] = np.where((prev >= 0) & (idx[pos] == prev), pos, -1)
+        return {name: memoryview(col) for name, col in cols.items()}
+
+
+def downsample_indices(values: np.ndarray, max_points: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """Shape-preserving subsample of a curve (Largest-Triangle-Three-Buckets).
+
+    Keeps the first and last points and, from each of ``max_points - 2``
+    equal-width buckets, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket (Steinarsson, 2013).
+    For objective values spanning many decades pass e.g. ``log10(f - f_min)``.
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    n = values.size
+    if max_points >= n:
+        return np.arange(n)
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    kept = [0]
+    for b in range(max_points - 2):
+        start, stop = edges[b], edges[b + 1]
+        nxt_start, nxt_stop = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        nxt_x = x[nxt_start:nxt_stop].mean()
+        nxt_y = values[nxt_start:nxt_stop].mean()
+        ax, ay = x[kept[-1]], values[kept[-1]]
+        area = np.abs((ax - nxt_x) * (values[start:stop] - ay) - (ax - x[start:stop]) * (nxt_y - ay))
+        kept.append(start + int(np.argmax(area)))
+    kept.append(n - 1)
+    return np.asarray(kept)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Callable, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
 
 import numpy as np
 
+if TYPE_CHECKING:
+    from .minimize import SolverPlan
+
 
 @dataclass
 class OptimizeResult:
@@ -17,6 +22,11 @@ class OptimizeResult:
     success: bool
     status: str
     message: str
+    plan: Optional["SolverPlan"] = None
+    # Approximate inverse Hessian at x (DenseInverseHessian / LBFGSInverseHessian)
+    inverse_hessian: Optional[Any] = None
+    # L-BFGS history size in use at termination
+    history_size: Optional[int] = None
 
 
 def ensure_1d(x: np.ndarray | list[float]) -> np.ndarray:
@@ -59,3 +69,84 @@ def grad_norm(g: np.ndarray) -> float:
     """Infinity norm of gradient used for stopping conditions."""
     return float(np.linalg.norm(g, ord=np.inf))
 
+
+# Status values reported in OptimizeResult.status and their messages
+STATUS_MESSAGES = {
+    "converged": "Gradient norm below tolerance",
+    "ftol": "Relative reduction of f below ftol",
+    "xtol": "Step size below xtol",
+    "max_iter": "Reached maximum iterations",
+    "max_epochs": "Reached maximum number of epochs",
+    "max_fun": "Reached maximum number of function evaluations",
+    "max_grad": "Reached maximum number of gradient evaluations",
+    "time_limit": "Reached wall-clock time limit",
+    "stalled": "No progress in f over the stall window",
+    "line_search_failed": "Line search failed to find descent",
+    "trust_region_collapsed": "Trust-region radius fell below machine precision",
+    "callback": "Stopped by callback",
+}
+# Statuses that count as a successful solve
+SUCCESS_STATUSES = ("converged", "ftol", "xtol")
+
+
+class StoppingMonitor:
+    """Evaluation/time budgets and progress tests shared by the solvers.
+
+    Every criterion is disabled when its parameter is ``None``:
+
+    - ``max_fun`` / ``max_grad``: evaluation budgets (including the initial one).
+    - ``time_limit``: wall-clock seconds since the monitor was created.
+    - ``ftol``: ``f_prev - f <= ftol * max(|f_prev|, |f|, 1)``.
+    - ``xtol``: ``||s||_inf <= xtol * max(||x||_inf, 1)``.
+    - ``stall_window``: ``f`` decreased by at most ``stall_tol * max(|f|, 1)``
+      over the last ``stall_window`` iterations.
+    """
+
+    def __init__(
+        self,
+        max_fun: Optional[int] = None,
+        max_grad: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        ftol: Optional[float] = None,
+        xtol: Optional[float] = None,
+        stall_window: Optional[int] = None,
+        stall_tol: float = 1e-10,
+    ) -> None:
+        self.max_fun = max_fun
+        self.max_grad = max_grad
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.ftol = ftol
+        self.xtol = xtol
+        self.stall_tol = stall_tol
+        self._f_window = None if stall_window is None else deque(maxlen=stall_window + 1)
+
+    def budget_status(self, n_fun: int, n_grad: int) -> Optional[str]:
+        if self.max_fun is not None and n_fun >= self.max_fun:
+            return "max_fun"
+        if self.max_grad is not None and n_grad >= self.max_grad:
+            return "max_grad"
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return "time_limit"
+        return None
+
+    def line_search_budget(self, n_fun: int, n_grad: int) -> dict:
+        """Keyword arguments that bound a line search by the remaining budget."""
+        remaining = [b - n for b, n in ((self.max_fun, n_fun), (self.max_grad, n_grad)) if b is not None]
+        kwargs: dict = {}
+        if remaining:
+            kwargs["max_evals"] = max(min(remaining), 0)
+        if self.deadline is not None:
+            kwargs["deadline"] = self.deadline
+        return kwargs
+
+    def progress_status(self, f_prev: float, f: float, s: np.ndarray, x: np.ndarray) -> Optional[str]:
+        if self.ftol is not None and f_prev - f <= self.ftol * max(abs(f_prev), abs(f), 1.0):
+            return "ftol"
+        if self.xtol is not None and grad_norm(s) <= self.xtol * max(grad_norm(x), 1.0):
+            return "xtol"
+        if self._f_window is not None:
+            self._f_window.append(f)
+            window = self._f_window
+            if len(window) == window.maxlen and window[0] - f <= self.stall_tol * max(abs(f), 1.0):
+                return "stalled"
+        return None
@@ -0,0 +1,58 @@
+"""L-BFGS with a fixed history size `m` vs `m="adaptive"` on the built-in problems.
+
+For every problem and setting, reports iterations, function evaluations, the
+history size in use at termination and the median wall time over `--repeat`
+solves.
+
+Usage:
+    python src/python/scripts/bench_adaptive_m.py --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from qnm.lbfgs import lbfgs
+from qnm.problems import householder_quadratic_problem, quadratic_problem, rosenbrock_problem
+
+PROBLEMS = {
+    "rosenbrock (n=10)": lambda: rosenbrock_problem(dim=10),
+    "rosenbrock (n=100)": lambda: rosenbrock_problem(dim=100),
+    "quadratic (n=100, cond=1e4)": lambda: quadratic_problem(dim=100, condition_number=1e4),
+    "householder quadratic (n=1000, cond=1e4)": lambda: householder_quadratic_problem(dim=1000, condition_number=1e4),
+}
+SETTINGS = (3, 10, 20, "adaptive")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-iter", type=int, default=5000)
+    parser.add_argument("--m-min", type=int, default=3)
+    parser.add_argument("--m-max", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"# L-BFGS history size (adaptive: m_min={args.m_min}, m_max={args.m_max})\n")
+    print("| Problem | m | Status | Iterations | f evals | Final m | Time (ms) |")
+    print("|---------|---|--------|------------|---------|---------|-----------|")
+    for label, make in PROBLEMS.items():
+        problem = make()
+        for m in SETTINGS:
+            times = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                res = lbfgs(
+                    problem.fun, problem.grad, problem.x0, m=m, max_iter=args.max_iter,
+                    m_min=args.m_min, m_max=args.m_max,
+                )
+                times.append(time.perf_counter() - t0)
+            print(
+                f"| {label} | {m} | {res.status} | {res.n_iter} | {res.n_fun} | {res.history_size} "
+                f"| {1e3 * statistics.median(times):.1f} |"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Cold-start measurement: `import qnm` and time to the first solve.
+
+Each sample runs in a fresh interpreter (`python -c ...`) so module caches do
+not carry over. Reported numbers are medians over `--repeat` runs:
+
+- `import qnm`: the lazy package import alone.
+- `eager import`: every qnm submodule imported up front (the pre-lazy cost).
+- `first solve`: `from qnm import lbfgs, rosenbrock_problem` plus one solve.
+- `first solve (bundle)`: the same, importing from the archive produced by
+  `build_pyodide_bundle.py` after extracting it (what the docs visualizer does).
+
+Usage:
+    python src/python/scripts/bench_import.py --repeat 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+from build_pyodide_bundle import PACKAGE_DIR, build_bundle
+
+_TIMED = """
+import time
+t0 = time.perf_counter()
+{body}
+print(time.perf_counter() - t0)
+"""
+
+CASES = {
+    "import qnm": "import qnm",
+    "eager import": "import qnm\nfor _name in qnm.__all__: getattr(qnm, _name)",
+    "first solve": (
+        "from qnm import lbfgs, rosenbrock_problem\n"
+        "_p = rosenbrock_problem(dim=2)\n"
+        "lbfgs(_p.fun, _p.grad, _p.x0)"
+    ),
+}
+
+
+def _sample(body: str, path: str, repeat: int) -> float:
+    code = _TIMED.format(body=body)
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", f"import sys; sys.path.insert(0, {path!r})\n{code}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    source_path = str(PACKAGE_DIR.parent)
+    print(f"# qnm cold start (Python {sys.version.split()[0]}, median of {args.repeat})\n")
+    print("| Case | Time (ms) |")
+    print("|------|-----------|")
+    for label, body in CASES.items():
+        print(f"| {label} | {1e3 * _sample(body, source_path, args.repeat):.1f} |")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle = Path(tmp) / "qnm.zip"
+        build_bundle(bundle)
+        extract_dir = Path(tmp) / "site"
+        with zipfile.ZipFile(bundle) as zf:
+            zf.extractall(extract_dir)
+        t = _sample(CASES["first solve"], str(extract_dir), args.repeat)
+        print(f"| first solve (bundle) | {1e3 * t:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Peak-RSS benchmark: in-memory `lbfgs` vs memmap-backed `lbfgs_out_of_core`.
+
+Each mode runs in a fresh subprocess so that `ru_maxrss` only reflects that
+solve. The objective is a separable quadratic f(x) = 0.5 * sum(d * x**2) - b.x
+whose value and gradient are themselves computed chunk-wise (for the
+out-of-core run the gradient is written into a memmap), so the measurement
+isolates the solver's own footprint.
+
+Usage:
+    python src/python/scripts/bench_out_of_core.py --n 20000000 --m 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from qnm.lbfgs import lbfgs
+from qnm.out_of_core import DEFAULT_CHUNK_SIZE, MemmapWorkspace, lbfgs_out_of_core
+
+
+def _coefficients(i: slice) -> tuple[np.ndarray, np.ndarray]:
+    # Deterministic, chunk-local coefficients: no length-n arrays are stored.
+    idx = np.arange(i.start, i.stop, dtype=np.float64)
+    d = 1.0 + 9.0 * (np.sin(idx) ** 2)
+    b = np.cos(idx)
+    return d, b
+
+
+def _run_in_memory(n: int, m: int, max_iter: int) -> dict:
+    chunk = DEFAULT_CHUNK_SIZE
+
+    def fun(x):
+        total = 0.0
+        for start in range(0, n, chunk):
+            sl = slice(start, min(start + chunk, n))
+            d, b = _coefficients(sl)
+            total += float(0.5 * np.dot(d * x[sl], x[sl]) - np.dot(b, x[sl]))
+        return total
+
+    def grad(x):
+        g = np.empty(n)
+        for start in range(0, n, chunk):
+            sl = slice(start, min(start + chunk, n))
+            d, b = _coefficients(sl)
+            g[sl] = d * x[sl] - b
+        return g
+
+    t0 = time.perf_counter()
+    res = lbfgs(fun, grad, np.zeros(n), m=m, max_iter=max_iter, tol=1e-6)
+    return {"seconds": time.perf_counter() - t0, "n_iter": res.n_iter, "fun": res.fun}
+
+
+def _run_out_of_core(n: int, m: int, max_iter: int, scratch_dir: str) -> dict:
+    ws = MemmapWorkspace(n, scratch_dir=scratch_dir)
+    g_out = ws.vector("objective_grad")
+    x0 = ws.vector("x0")
+
+    def fun(x):
+        total = 0.0
+        for sl in ws.chunks():
+            d, b = _coefficients(sl)
+            xs = x[sl]
+            total += float(0.5 * np.dot(d * xs, xs) - np.dot(b, xs))
+            ws.release(sl, x)
+        return total
+
+    def grad(x):
+        for sl in ws.chunks():
+            d, b = _coefficients(sl)
+            g_out[sl] = d * x[sl] - b
+            ws.release(sl, x, g_out)
+        return g_out
+
+    t0 = time.perf_counter()
+    res = lbfgs_out_of_core(fun, grad, x0, m=m, max_iter=max_iter, tol=1e-6, scratch_dir=scratch_dir)
+    out = {"seconds": time.perf_counter() - t0, "n_iter": res.n_iter, "fun": res.fun}
+    ws.close()
+    return out
+
+
+def _child(mode: str, n: int, m: int, max_iter: int, scratch_dir: str) -> None:
+    if mode == "in-memory":
+        out = _run_in_memory(n, m, max_iter)
+    else:
+        out = _run_out_of_core(n, m, max_iter, scratch_dir)
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    out["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    print(json.dumps(out))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=10_000_000)
+    parser.add_argument("--m", type=int, default=5)
+    parser.add_argument("--max-iter", type=int, default=20)
+    parser.add_argument("--scratch-dir", default=None)
+    parser.add_argument("--child", choices=["in-memory", "out-of-core"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    scratch_dir = args.scratch_dir or tempfile.gettempdir()
+
+    if args.child:
+        _child(args.child, args.n, args.m, args.max_iter, scratch_dir)
+        return
+
+    vector_mb = args.n * 8 / 2**20
+    print(f"# Out-of-core L-BFGS (n={args.n}, m={args.m}, max_iter={args.max_iter}, one vector = {vector_mb:.0f} MiB)\n")
+    print("| Mode | Peak RSS (MiB) | Time (s) | Iters | f |")
+    print("|------|----------------|----------|-------|---|")
+    for mode in ("in-memory", "out-of-core"):
+        cmd = [sys.executable, __file__, "--child", mode, "--n", str(args.n), "--m", str(args.m),
+               "--max-iter", str(args.max_iter), "--scratch-dir", scratch_dir]
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=True, env=dict(os.environ))
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"| {mode} | {r['peak_rss_bytes'] / 2**20:.0f} | {r['seconds']:.2f} | {r['n_iter']} | {r['fun']:.6e} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Throughput of `solve_many` across worker counts and executors.
+
+Solves a batch of independent dense problems (random quadratics of dimension
+`--dim`, solved with `bfgs`, whose dense update is BLAS-bound) for each
+worker count in `--workers` and reports solves per second and utilization.
+`blas_threads` defaults to `cores // workers`; pass `--blas-threads` to fix
+it and see the effect of oversubscription.
+
+Usage:
+    python src/python/scripts/bench_solve_many.py --problems 32 --dim 200 --workers 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import warnings
+
+from qnm.parallel import solve_many
+from qnm.problems import quadratic_problem
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, default=32)
+    parser.add_argument("--dim", type=int, default=200)
+    parser.add_argument("--method", default="bfgs")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--executor", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    parser.add_argument("--blas-threads", type=int, default=None)
+    args = parser.parse_args()
+
+    problems = [quadratic_problem(dim=args.dim, condition_number=1e3, seed=i) for i in range(args.problems)]
+    print(f"# solve_many: {args.problems} x {args.method}, n={args.dim}, {os.cpu_count()} cores\n")
+    print("| Executor | Workers | BLAS threads | BLAS control | Solves/s | Utilization |")
+    print("|----------|---------|--------------|--------------|----------|-------------|")
+    for executor in args.executor:
+        for workers in args.workers:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                run = solve_many(problems, method=args.method, executor=executor, max_workers=workers,
+                                 blas_threads=args.blas_threads)
+                run.results()
+            r = run.report
+            print(f"| {executor} | {r.max_workers} | {r.blas_threads} | {r.blas_control} | "
+                  f"{r.solves_per_second:.1f} | {r.utilization:.2f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Per-call latency of repeated same-size solves: functions vs. solver objects.
+
+Simulates a control loop: tick `k` minimizes `f(x - t_k)`, where `f` is a
+Householder quadratic (O(n) per evaluation, so solver overhead dominates) and
+the target `t_k` moves along a fixed direction. Each solve starts from the
+previous solution. Reported per variant: median and p95 latency per call, and
+the mean function evaluations per call.
+
+- `lbfgs()` / `bfgs()`: the function API, rebuilding its state every call.
+- `LBFGSSolver` / `BFGSSolver` (cold): preallocated workspace, state reset per call.
+- `... (warm)`: `warm_start=True`, reusing the previous solve's curvature.
+
+Usage:
+    python src/python/scripts/bench_solver_objects.py --dim 500 --ticks 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from qnm.bfgs import bfgs
+from qnm.lbfgs import lbfgs
+from qnm.problems import householder_quadratic_problem
+from qnm.solvers import BFGSSolver, LBFGSSolver
+
+
+def run_loop(solve, dim: int, ticks: int, cond: float, step: float) -> dict:
+    base = householder_quadratic_problem(dim=dim, condition_number=cond)
+    direction = np.random.default_rng(1).normal(size=dim)
+    direction /= np.linalg.norm(direction)
+    x = base.solution.copy()
+    latencies, evals = [], []
+    for k in range(ticks):
+        target = step * np.sin(2 * np.pi * k / 100) * direction
+        fun = lambda z, t=target: base.fun(z - t)
+        grad = lambda z, t=target: base.grad(z - t)
+        t0 = time.perf_counter()
+        res = solve(fun, grad, x)
+        latencies.append(time.perf_counter() - t0)
+        evals.append(res.n_fun)
+        x = res.x
+    latencies.sort()
+    return {
+        "median": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "evals": statistics.mean(evals),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dim", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--m", type=int, default=10)
+    parser.add_argument("--cond", type=float, default=1e2)
+    parser.add_argument("--step", type=float, default=1.0, help="amplitude of the target motion")
+    parser.add_argument("--tol", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    n, tol = args.dim, args.tol
+    lbfgs_solver = LBFGSSolver(n, m=args.m, tol=tol)
+    bfgs_solver = BFGSSolver(n, tol=tol)
+    variants = {
+        "lbfgs()": lambda f, g, x: lbfgs(f, g, x, m=args.m, tol=tol),
+        "LBFGSSolver (cold)": lambda f, g, x: lbfgs_solver.solve(f, g, x),
+        "LBFGSSolver (warm)": lambda f, g, x: lbfgs_solver.solve(f, g, x, warm_start=True),
+        "bfgs()": lambda f, g, x: bfgs(f, g, x, tol=tol),
+        "BFGSSolver (cold)": lambda f, g, x: bfgs_solver.solve(f, g, x),
+        "BFGSSolver (warm)": lambda f, g, x: bfgs_solver.solve(f, g, x, warm_start=True),
+    }
+
+    print(f"# Solver objects: n={n}, {args.ticks} ticks, m={args.m}, cond={args.cond:g}\n")
+    print("| Variant | Median latency (ms) | p95 latency (ms) | f evals / call |")
+    print("|---------|---------------------|------------------|----------------|")
+    for label, solve in variants.items():
+        r = run_loop(solve, n, args.ticks, args.cond, args.step)
+        print(f"| {label} | {1e3 * r['median']:.3f} | {1e3 * r['p95']:.3f} | {r['evals']:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Benchmark harness: every qnm solver and SciPy over a problem collection.
+
+Each (problem, size, solver) case is run `--repeat` times. The harness records
+the median wall time, function/gradient evaluations, final f and gradient
+norm. A run counts as solved when it reaches ``‖∇f‖∞ <= 10 * tol`` and a
+final value within ``1e-6 * max(1, |f_best|)`` of the best value any solver
+found on that case. Dolan–Moré performance profiles (Math. Program. 91,
+2002) are then computed for wall time and function evaluations:
+
+    rho_s(tau) = |{p : t_{p,s} <= tau * min_s' t_{p,s'}}| / |P|
+
+`rho_s(1)` is the fraction of problems on which solver `s` is the fastest.
+`rho_s(tau)` for large `tau` is the fraction it solves at all.
+
+Usage:
+    python src/python/scripts/benchmark_profiles.py --sizes 10,100,1000 --repeat 3 \\
+        --output docs/evidence/performance_profiles.md --json profiles.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from qnm.bfgs import bfgs
+from qnm.lbfgs import lbfgs
+from qnm.lbfgsb import lbfgsb
+from qnm.out_of_core import lbfgs_out_of_core
+from qnm.problems import Problem, householder_quadratic_problem, quadratic_problem, rosenbrock_problem
+from qnm.sr1 import lsr1, sr1
+from qnm.utils import grad_norm
+
+try:
+    from scipy.optimize import minimize as scipy_minimize  # type: ignore
+except ImportError:  # SciPy-backed solvers are skipped
+    scipy_minimize = None
+
+TAUS = (1.0, 1.5, 2.0, 4.0, 8.0, 16.0)
+
+PROBLEMS: Dict[str, Callable[[int], Problem]] = {
+    "rosenbrock": lambda n: rosenbrock_problem(dim=n),
+    "quadratic (cond=1e3)": lambda n: quadratic_problem(dim=n, condition_number=1e3),
+    "householder quadratic (cond=1e4)": lambda n: householder_quadratic_problem(dim=n, condition_number=1e4),
+}
+
+
+def _scipy(method: str, **options) -> Callable[..., dict]:
+    def run(problem: Problem, tol: float, max_iter: int) -> dict:
+        res = scipy_minimize(
+            problem.fun, problem.x0, jac=problem.grad, method=method,
+            options={"gtol": tol, "maxiter": max_iter, **options},
+        )
+        return {"x": res.x, "n_fun": int(res.nfev), "n_grad": int(getattr(res, "njev", res.nfev))}
+
+    return run
+
+
+def _qnm(solver: Callable[..., object], **kwargs) -> Callable[..., dict]:
+    def run(problem: Problem, tol: float, max_iter: int) -> dict:
+        res = solver(problem.fun, problem.grad, problem.x0, tol=tol, max_iter=max_iter, **kwargs)
+        return {"x": np.asarray(res.x), "n_fun": res.n_fun, "n_grad": res.n_grad}
+
+    return run
+
+
+def _out_of_core(problem: Problem, tol: float, max_iter: int) -> dict:
+    with tempfile.TemporaryDirectory() as scratch:
+        res = lbfgs_out_of_core(problem.fun, problem.grad, problem.x0, tol=tol, max_iter=max_iter, scratch_dir=scratch)
+        return {"x": np.array(res.x), "n_fun": res.n_fun, "n_grad": res.n_grad}
+
+
+# name -> (runner, largest dimension it is run on; the dense BFGS/SR1 solvers are slow beyond a few hundred).
+# L-BFGS-B's relative-reduction test is tightened to ~machine precision (factr=10) so that, like
+# the other solvers, it stops on the gradient tolerance.
+SOLVERS: Dict[str, tuple] = {
+    "qnm:bfgs": (_qnm(bfgs), 200),
+    "qnm:lbfgs": (_qnm(lbfgs), None),
+    "qnm:lbfgs (adaptive m)": (_qnm(lbfgs, m="adaptive"), None),
+    "qnm:lbfgs (hager_zhang)": (_qnm(lbfgs, line_search_kwargs={"method": "hager_zhang"}), None),
+    "qnm:lbfgs_out_of_core": (_out_of_core, None),
+    "qnm:lbfgsb": (_qnm(lbfgsb, factr=10.0), None),
+    "qnm:sr1": (_qnm(sr1), 200),
+    "qnm:lsr1": (_qnm(lsr1), None),
+    "scipy:BFGS": (_scipy("BFGS"), 200),
+    "scipy:L-BFGS-B": (_scipy("L-BFGS-B", ftol=10.0 * np.finfo(float).eps), None),
+}
+SCIPY_SOLVERS = ("qnm:lbfgsb", "scipy:BFGS", "scipy:L-BFGS-B")
+
+
+def run_case(problem: Problem, solver: str, tol: float, max_iter: int, repeat: int) -> dict:
+    runner = SOLVERS[solver][0]
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = runner(problem, tol, max_iter)
+        times.append(time.perf_counter() - t0)
+    x = out["x"]
+    return {
+        "seconds": statistics.median(times),
+        "n_fun": out["n_fun"],
+        "n_grad": out["n_grad"],
+        "f": float(problem.fun(x)),
+        "gnorm": grad_norm(problem.grad(x)),
+    }
+
+
+def performance_profile(costs: Dict[str, List[float]], taus=TAUS) -> Dict[str, List[float]]:
+    """Dolan–Moré profile ``rho_s(tau)`` per solver; unsolved cases have cost ``inf``."""
+    table = np.array(list(costs.values()), dtype=float)  # solvers x problems
+    best = np.min(table, axis=0)
+    ratios = np.where(np.isfinite(table), table / best, np.inf)
+    n_problems = table.shape[1]
+    return {
+        solver: [float(np.sum(ratios[i] <= tau)) / n_problems for tau in taus]
+        for i, solver in enumerate(costs)
+    }
+
+
+def run_benchmark(sizes: List[int], solvers: List[str], tol: float, max_iter: int, repeat: int) -> List[dict]:
+    records = []
+    for label, make in PROBLEMS.items():
+        for n in sizes:
+            problem = make(n)
+            case = []
+            for solver in solvers:
+                max_dim = SOLVERS[solver][1]
+                if max_dim is not None and n > max_dim:
+                    continue
+                case.append({"problem": label, "n": n, "solver": solver, **run_case(problem, solver, tol, max_iter, repeat)})
+            f_best = min(r["f"] for r in case)
+            for r in case:
+                r["solved"] = bool(r["gnorm"] <= 10 * tol and r["f"] - f_best <= 1e-6 * max(1.0, abs(f_best)))
+            records.extend(case)
+    return records
+
+
+def profiles(records: List[dict], solvers: List[str], metric: str) -> Dict[str, List[float]]:
+    cases = sorted({(r["problem"], r["n"]) for r in records})
+    by_key = {(r["problem"], r["n"], r["solver"]): r for r in records}
+    costs = {}
+    for solver in solvers:
+        row = []
+        for problem, n in cases:
+            r = by_key.get((problem, n, solver))
+            row.append(r[metric] if r is not None and r["solved"] else np.inf)
+        costs[solver] = row
+    return performance_profile(costs)
+
+
+def to_markdown(records: List[dict], solvers: List[str], tol: float, repeat: int) -> str:
+    lines = [
+        "# Performance Profiles (Generated)",
+        "",
+        f"- Generated: {time.strftime('%Y-%m-%d')}",
+        "- Generation procedure: `python src/python/scripts/benchmark_profiles.py "
+        "--output docs/evidence/performance_profiles.md`",
+        f"- Stopping tolerance: `‖∇f‖∞ <= {tol:g}`; wall time is the median of {repeat} runs",
+        "",
+    ]
+    lines += _environment_lines()
+    for metric, title in (("seconds", "Wall time"), ("n_fun", "Function evaluations")):
+        prof = profiles(records, solvers, metric)
+        lines += ["", f"## Profile: {title}", "", "| Solver | " + " | ".join(f"ρ({t:g})" for t in TAUS) + " |"]
+        lines.append("|--------|" + "|".join("-----" for _ in TAUS) + "|")
+        for solver, rho in prof.items():
+            lines.append(f"| {solver} | " + " | ".join(f"{v:.2f}" for v in rho) + " |")
+    lines += [
+        "",
+        "Cases a solver is not run on (dense BFGS/SR1 above n=200) count as unsolved in its profile.",
+        "",
+        "## Cases",
+        "",
+        "| Problem | n | Solver | Solved | Time (ms) | f evals | g evals | f(x*) | ‖∇f‖∞ |",
+        "|---------|---|--------|--------|-----------|---------|---------|-------|-------|",
+    ]
+    for r in records:
+        lines.append(
+            f"| {r['problem']} | {r['n']} | {r['solver']} | {'✓' if r['solved'] else '✗'} | {1e3 * r['seconds']:.1f} "
+            f"| {r['n_fun']} | {r['n_grad']} | {r['f']:.4e} | {r['gnorm']:.1e} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _environment_lines() -> List[str]:
+    import platform
+    import sys
+
+    lines = ["## Environment", "", f"- Python: {sys.version.split()[0]}", f"- Platform: {platform.platform()}",
+             f"- NumPy: {np.__version__}"]
+    try:
+        import scipy  # type: ignore
+
+        lines.append(f"- SciPy: {scipy.__version__}")
+    except ImportError:
+        lines.append("- SciPy: (not installed)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated problem dimensions")
+    parser.add_argument("--solvers", default=",".join(SOLVERS), help="comma-separated subset of: " + ", ".join(SOLVERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tol", type=float, default=1e-6)
+    parser.add_argument("--max-iter", type=int, default=5000)
+    parser.add_argument("--output", help="write the Markdown report here instead of stdout")
+    parser.add_argument("--json", help="also write the raw per-case records as JSON")
+    parser.add_argument("--from-json", help="render the report from records saved with --json instead of running")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    solvers = [s.strip() for s in args.solvers.split(",")]
+    unknown = [s for s in solvers if s not in SOLVERS]
+    if unknown:
+        parser.error(f"unknown solvers: {unknown}")
+    if scipy_minimize is None:
+        solvers = [s for s in solvers if s not in SCIPY_SOLVERS]
+
+    if args.from_json:
+        with open(args.from_json, encoding="utf-8") as fh:
+            records = json.load(fh)
+        present = {r["solver"] for r in records}
+        solvers = [s for s in solvers if s in present]
+    else:
+        records = run_benchmark(sizes, solvers, args.tol, args.max_iter, args.repeat)
+    report = to_markdown(records, solvers, args.tol, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(report)
+    else:
+        print(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(records, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Build the single-archive `qnm` bundle loaded by the docs visualizer.
+
+The archive contains `qnm/*.py` plus precompiled bytecode in
+`qnm/__pycache__`, so Pyodide can fetch one file, extract it into its virtual
+filesystem in one call and skip compiling the sources on first import.
+
+Bytecode is only used by an interpreter with the same cache tag (Pyodide
+0.26 ships CPython 3.12); run this script with a matching Python, otherwise
+the archive still works but the `.pyc` files are ignored. The `.pyc` files use
+unchecked-hash invalidation because extraction does not preserve mtimes.
+
+Usage:
+    python src/python/scripts/build_pyodide_bundle.py docs/public/qnm.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import py_compile
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1] / "qnm"
+# Python version of the Pyodide release loaded in docs/.vitepress/theme/pyodide-utils.ts
+PYODIDE_PYTHON = (3, 12)
+
+
+def build_bundle(output: Path, package_dir: Path = PACKAGE_DIR) -> list[str]:
+    """Write `output` and return the archive member names."""
+    sources = sorted(package_dir.glob("*.py"))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    names: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp, zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for src in sources:
+            arcname = f"qnm/{src.name}"
+            zf.write(src, arcname)
+            names.append(arcname)
+
+            pyc_name = Path(importlib.util.cache_from_source(src.name)).name
+            pyc_path = Path(tmp) / pyc_name
+            py_compile.compile(
+                str(src),
+                cfile=str(pyc_path),
+                dfile=arcname,
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+            zf.write(pyc_path, f"qnm/__pycache__/{pyc_name}")
+            names.append(f"qnm/__pycache__/{pyc_name}")
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    if sys.version_info[:2] != PYODIDE_PYTHON:
+        print(
+            f"warning: compiling with Python {sys.version_info[0]}.{sys.version_info[1]}; Pyodide uses "
+            f"{PYODIDE_PYTHON[0]}.{PYODIDE_PYTHON[1]} and will ignore the bundled bytecode",
+            file=sys.stderr,
+        )
+    names = build_bundle(args.output)
+    print(f"wrote {args.output} ({len(names)} files, {args.output.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,27 @@
+"""Verify the qnm solvers against property checks and SciPy references.
+
+Each (problem, solver) pair and each SciPy reference is an independent case
+run in a process pool (``--jobs``). Finished cases are cached on disk
+(``--cache-dir``) under a hash of the qnm sources, this script, the case
+parameters and the Python/NumPy/SciPy versions. A re-run then only computes
+the cases whose inputs changed; ``--no-cache`` forces a full run.
+"""
+
 from __future__ import annotations
 
+import argparse
+import hashlib
+import inspect
+import json
+import os
 import platform
 import sys
-from dataclasses import dataclass
-from typing import Callable, Optional
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -72,7 +90,14 @@ def verify_one(
     problem: Problem,
     tol: float,
     reference: Optional[ReferenceResult],
+    monotone_window: int = 1,
 ) -> dict:
+    """Run one solver on one problem and collect the evidence checks.
+
+    ``monotone_window`` relaxes the monotone decrease check for nonmonotone
+    line searches: each f_k may not exceed the maximum of the previous
+    ``monotone_window`` values (the GLL condition; 1 means strictly monotone).
+    """
     gradcheck_ok, _, _, gradcheck_diff = gradient_check(problem.fun, problem.grad, problem.x0)
 
     history_f: list[float] = []
@@ -101,8 +126,9 @@ def verify_one(
         primary_ok = primary_ok and (x_err <= 1e-3)
 
     monotone_ok = True
-    for a, b in zip(history_f, history_f[1:]):
-        if b > a + 1e-12:
+    f_seq = [float(problem.fun(problem.x0))] + history_f
+    for k in range(1, len(f_seq)):
+        if f_seq[k] > max(f_seq[max(k - monotone_window, 0) : k]) + 1e-12:
             monotone_ok = False
             break
     # Only enforce monotonic decrease when we actually saw iterations (history exists).
@@ -124,7 +150,7 @@ def verify_one(
         "f_diff": f_diff,
         "ref_method": reference.method if reference else None,
         "x_err": x_err,
-        "gradcheck_ok": gradcheck_ok,
+        "gradcheck_ok": bool(gradcheck_ok),
         "gradcheck_diff": float(gradcheck_diff),
         "monotone_ok": monotone_ok if history_f else None,
         "status": status,
@@ -162,30 +188,176 @@ def _print_markdown_table(results: list[dict]) -> None:
         )
 
 
-def main():
-    tol = 1e-6
-    problems = [
-        rosenbrock_problem(dim=2),
-        rosenbrock_problem(dim=10),
-        quadratic_problem(dim=5, condition_number=10),
-        quadratic_problem(dim=50, condition_number=100),
+# Problem factories by name; a case refers to a problem as (name, kwargs) so it can be
+# sent to a worker process and hashed.
+PROBLEMS: Dict[str, Callable[..., Problem]] = {
+    "rosenbrock": rosenbrock_problem,
+    "quadratic": quadratic_problem,
+}
+
+PROBLEM_SPECS: List[Tuple[str, dict]] = [
+    ("rosenbrock", {"dim": 2}),
+    ("rosenbrock", {"dim": 10}),
+    ("quadratic", {"dim": 5, "condition_number": 10}),
+    ("quadratic", {"dim": 50, "condition_number": 100}),
+]
+
+REFERENCES: Dict[str, Callable[[Problem, float], Optional[ReferenceResult]]] = {
+    # BFGS: reference comparison (SciPy BFGS) if available
+    "scipy:BFGS": _try_scipy_bfgs,
+    # L-BFGS: informational reference only (SciPy L-BFGS-B without bounds) if available
+    "scipy:L-BFGS-B(no-bounds)": _try_scipy_lbfgsb_nobounds,
+}
+
+# Solver label -> (solver, reference name, monotone window). Nonmonotone (GLL, memory 10)
+# L-BFGS shares the L-BFGS reference and relaxes the monotonicity check.
+SOLVERS: Dict[str, Tuple[Callable[..., object], str, int]] = {
+    "BFGS": (bfgs, "scipy:BFGS", 1),
+    "L-BFGS": (lbfgs, "scipy:L-BFGS-B(no-bounds)", 1),
+    "L-BFGS (GLL)": (partial(lbfgs, nonmonotone="gll"), "scipy:L-BFGS-B(no-bounds)", 10),
+}
+
+
+def _source_digest(paths: List[Path]) -> str:
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _versions() -> dict:
+    versions = {"python": sys.version.split()[0], "numpy": np.__version__}
+    try:
+        import scipy as _sp  # type: ignore
+
+        versions["scipy"] = _sp.__version__
+    except Exception:
+        versions["scipy"] = None
+    return versions
+
+
+def _fingerprint() -> dict:
+    """Inputs shared by every case: qnm sources, this script and library versions."""
+    import qnm
+
+    package = Path(qnm.__file__).resolve().parent
+    script = Path(__file__).resolve()
+    return {
+        "qnm": _source_digest(list(package.glob("*.py"))),
+        "problems": _source_digest([package / "problems.py", package / "utils.py"]),
+        # Only the reference runners, so other edits to this script keep the cached references
+        "references": hashlib.sha256("".join(inspect.getsource(fn) for fn in REFERENCES.values()).encode()).hexdigest(),
+        "script": _source_digest([script]),
+        **_versions(),
+    }
+
+
+def _case_key(case: dict, fingerprint: dict) -> str:
+    # References only depend on the problem definitions, not on the qnm solvers
+    relevant = {k: v for k, v in fingerprint.items() if k not in ("qnm", "script")} if case["kind"] == "reference" else fingerprint
+    payload = json.dumps({"case": case, "inputs": relevant}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """One JSON file per case key; writes are atomic so parallel runs can share a directory."""
+
+    def __init__(self, directory: Optional[Path]) -> None:
+        self.directory = directory
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self.directory / f"{key}.json", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: dict) -> None:
+        if self.directory is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(value, fh)
+        os.replace(tmp, self.directory / f"{key}.json")
+
+
+def _run_case(case: dict) -> dict:
+    """Worker entry point: compute one reference or one solver row."""
+    problem = PROBLEMS[case["problem"]](**case["params"])
+    if case["kind"] == "reference":
+        ref = REFERENCES[case["method"]](problem, case["tol"])
+        return {"reference": None if ref is None else asdict(ref)}
+    solver, _, monotone_window = SOLVERS[case["solver"]]
+    reference = None if case["reference"] is None else ReferenceResult(**case["reference"])
+    return verify_one(case["solver"], solver, problem, tol=case["tol"], reference=reference, monotone_window=monotone_window)
+
+
+def _run_cases(cases: List[dict], cache: ResultCache, fingerprint: dict, jobs: int) -> Tuple[List[dict], int]:
+    """Results for ``cases`` in order (computing only the ones missing from the cache) and the cache hits."""
+    keys = [_case_key(case, fingerprint) for case in cases]
+    results: List[Optional[dict]] = [cache.get(key) for key in keys]
+    todo = [i for i, r in enumerate(results) if r is None]
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+            computed = list(pool.map(_run_case, [cases[i] for i in todo]))
+    else:
+        computed = [_run_case(cases[i]) for i in todo]
+    for i, value in zip(todo, computed):
+        cache.put(keys[i], value)
+        results[i] = value
+    return results, len(cases) - len(todo)  # type: ignore[return-value]
+
+
+def run_verification(tol: float = 1e-6, jobs: int = 1, cache_dir: Optional[Path] = None) -> Tuple[List[dict], int]:
+    """All verification rows in table order, and the number of cases served from the cache."""
+    cache = ResultCache(cache_dir)
+    fingerprint = _fingerprint()
+
+    ref_cases = [
+        {"kind": "reference", "problem": name, "params": params, "method": method, "tol": tol}
+        for name, params in PROBLEM_SPECS
+        for method in REFERENCES
     ]
+    refs, hits = _run_cases(ref_cases, cache, fingerprint, jobs)
+    reference_of = {
+        (c["problem"], json.dumps(c["params"], sort_keys=True), c["method"]): r["reference"] for c, r in zip(ref_cases, refs)
+    }
 
-    results: list[dict] = []
-    for prob in problems:
-        prob_label = f"{prob.name} (d={len(np.asarray(prob.x0))})"
+    solver_cases = [
+        {
+            "kind": "solver",
+            "problem": name,
+            "params": params,
+            "solver": label,
+            "tol": tol,
+            "reference": reference_of[(name, json.dumps(params, sort_keys=True), ref_method)],
+        }
+        for name, params in PROBLEM_SPECS
+        for label, (_, ref_method, _) in SOLVERS.items()
+    ]
+    rows, solver_hits = _run_cases(solver_cases, cache, fingerprint, jobs)
+    hits += solver_hits
+    for case, row in zip(solver_cases, rows):
+        problem = PROBLEMS[case["problem"]](**case["params"])
+        row["problem"] = f"{problem.name} (d={len(np.asarray(problem.x0))})"
+    return rows, hits
 
-        # BFGS: reference comparison (SciPy BFGS) if available
-        bfgs_ref = _try_scipy_bfgs(prob, tol=tol)
-        r = verify_one("BFGS", bfgs, prob, tol=tol, reference=bfgs_ref)
-        r["problem"] = prob_label
-        results.append(r)
 
-        # L-BFGS: informational reference only (SciPy L-BFGS-B without bounds) if available
-        lbfgs_ref = _try_scipy_lbfgsb_nobounds(prob, tol=tol)
-        r = verify_one("L-BFGS", lbfgs, prob, tol=tol, reference=lbfgs_ref)
-        r["problem"] = prob_label
-        results.append(r)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (1 runs in-process)")
+    parser.add_argument("--cache-dir", default=".verify_cache", help="directory for cached case results")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every case and do not write the cache")
+    args = parser.parse_args()
+
+    tol = 1e-6
+    results, hits = run_verification(tol=tol, jobs=args.jobs, cache_dir=None if args.no_cache else Path(args.cache_dir))
+    print(f"[verify] {hits} cached cases reused", file=sys.stderr)
 
     print("# Baseline Results (Generated)")
     _print_environment()
@@ -194,8 +366,8 @@ def main():
     print("\n## Notes\n")
     print("- BFGS is compared against SciPy BFGS when SciPy is installed.")
     print("- L-BFGS uses SciPy L-BFGS-B (no bounds) as an informational reference only; primary checks are property-based.")
+    print("- L-BFGS (GLL) uses the nonmonotone line search; its monotonicity check allows f_k up to the max of the last 10 values.")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,52 @@
+from collections import deque
+
+import numpy as np
+
+from qnm import lbfgs, quadratic_problem
+from qnm.lbfgs import AdaptiveHistory
+
+
+def test_adaptive_history_grows_on_ill_conditioned_quadratic():
+    problem = quadratic_problem(dim=100, condition_number=1e4)
+    fixed = lbfgs(problem.fun, problem.grad, problem.x0, m=3, max_iter=2000)
+    adaptive = lbfgs(problem.fun, problem.grad, problem.x0, m="adaptive", m_min=3, m_max=20, max_iter=2000)
+
+    assert fixed.success and adaptive.success
+    assert fixed.history_size == 3
+    assert 3 < adaptive.history_size <= 20
+    assert adaptive.n_iter < fixed.n_iter
+
+
+def test_cost_limit_keeps_minimum_history():
+    problem = quadratic_problem(dim=50, condition_number=1e3)
+    history = AdaptiveHistory(m_min=2, m_max=10, cost_ratio=0.0)
+    sizes = []
+    result = lbfgs(
+        problem.fun, problem.grad, problem.x0, m=history, max_iter=2000,
+        callback=lambda res: sizes.append(len(res.extra_info["s_history"])),
+    )
+    assert result.success
+    assert result.history_size == 2
+    assert max(sizes) <= 2
+
+
+def test_collinear_pair_replaces_newest():
+    history = AdaptiveHistory(m_min=5, m_max=5)
+    s_history, y_history = deque(), deque()
+    s = np.array([1.0, 0.0, 0.0])
+    history.push(s_history, y_history, s, 2.0 * s)
+    history.push(s_history, y_history, np.array([0.0, 1.0, 0.0]), np.array([0.0, 3.0, 0.0]))
+    history.push(s_history, y_history, np.array([0.0, 2.0, 1e-4]), np.array([0.0, 6.0, 0.0]))
+
+    assert len(s_history) == 2
+    assert np.allclose(s_history[-1], [0.0, 2.0, 1e-4])
+    assert np.allclose(y_history[0], [2.0, 0.0, 0.0])
+
+
+def test_adaptive_history_instance_is_reset_per_solve():
+    problem = quadratic_problem(dim=100, condition_number=1e4)
+    history = AdaptiveHistory(m_min=3, m_max=20)
+    first = lbfgs(problem.fun, problem.grad, problem.x0, m=history, max_iter=2000)
+    second = lbfgs(problem.fun, problem.grad, problem.x0, m=history, max_iter=2000)
+    assert first.n_iter == second.n_iter
+    assert first.history_size == second.history_size
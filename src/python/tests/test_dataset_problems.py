@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from qnm import (
+    gradient_check,
+    lbfgs,
+    least_squares_problem,
+    logistic_regression_problem,
+    softmax_regression_problem,
+)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 6))
+    w = rng.normal(size=6)
+    targets = {
+        "b": X @ w + 0.1 * rng.normal(size=500),
+        "y01": (X @ w + rng.normal(size=500) > 0).astype(float),
+        "labels": np.argmax(X[:, :3] + 0.5 * rng.normal(size=(500, 3)), axis=1),
+    }
+    paths = {}
+    for name, arr in [("X", X), ("X32", X.astype(np.float32))] + list(targets.items()):
+        paths[name] = tmp_path / f"{name}.npy"
+        np.save(paths[name], arr)
+    return X, targets, paths
+
+
+def test_least_squares_streams_memmapped_blocks(dataset):
+    X, targets, paths = dataset
+    problem = least_squares_problem(paths["X"], paths["b"], block_size=64)
+    x = np.linspace(-1.0, 1.0, 6)
+    r = X @ x - targets["b"]
+    assert problem.fun(x) == pytest.approx(0.5 * r @ r / 500)
+    assert np.allclose(problem.grad(x), X.T @ r / 500)
+
+    res = lbfgs(problem.fun, problem.grad, problem.x0, tol=1e-10)
+    assert np.allclose(res.x, np.linalg.lstsq(X, targets["b"], rcond=None)[0], atol=1e-6)
+
+    single = least_squares_problem(paths["X32"], paths["b"], block_size=64)
+    r32 = X.astype(np.float32).astype(np.float64) @ x - targets["b"]
+    assert single.fun(x) == pytest.approx(0.5 * r32 @ r32 / 500, rel=1e-12)
+    assert single.fun(x) == pytest.approx(problem.fun(x), rel=1e-5)
+
+
+def test_empty_dataset_is_rejected(tmp_path):
+    np.save(tmp_path / "A.npy", np.zeros((0, 3)))
+    with pytest.raises(ValueError, match="no rows"):
+        least_squares_problem(tmp_path / "A.npy", np.zeros(0))
+
+
+@pytest.mark.parametrize("make, target", [(logistic_regression_problem, "y01"), (softmax_regression_problem, "labels")])
+def test_classification_problems(dataset, make, target):
+    _, _, paths = dataset
+    problem = make(paths["X"], paths[target], block_size=64)
+    x = 0.1 * np.arange(problem.x0.size, dtype=float)
+    ok, *_ = gradient_check(problem.fun, problem.grad, x)
+    assert ok
+    # The blocking does not change the result
+    whole = make(np.load(paths["X"]), np.load(paths[target]), block_size=10_000)
+    assert problem.fun(x) == pytest.approx(whole.fun(x), rel=1e-12)
+
+    res = lbfgs(problem.fun, problem.grad, problem.x0, max_iter=500)
+    assert res.success
+
+    single = make(paths["X32"], paths[target], block_size=64)
+    assert single.fun(res.x) == pytest.approx(res.fun, rel=1e-4)
@@ -0,0 +1,89 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from qnm import lbfgs, run_distributed
+
+N = 12
+COUPLING = 0.05
+
+
+def _full_fun(x):
+    a, b = x[0::2], x[1::2]
+    return float(np.sum(100.0 * (b - a**2) ** 2 + (1.0 - a) ** 2) + 0.5 * COUPLING * (np.sum(x) - N) ** 2)
+
+
+def _full_grad(x):
+    a, b = x[0::2], x[1::2]
+    g = np.empty_like(x)
+    g[0::2] = -400.0 * a * (b - a**2) - 2.0 * (1.0 - a)
+    g[1::2] = 200.0 * (b - a**2)
+    return g + COUPLING * (np.sum(x) - N)
+
+
+def _setup(comm, index):
+    """Extended Rosenbrock (independent pairs) coupled through (sum(x) - N)^2."""
+
+    def coupling(x):
+        return float(comm.allreduce(np.sum(x))[0]) - N
+
+    def fun(x):
+        a, b = x[0::2], x[1::2]
+        local = float(np.sum(100.0 * (b - a**2) ** 2 + (1.0 - a) ** 2))
+        c = coupling(x)
+        return local + (0.5 * COUPLING * c**2 if comm.rank == 0 else 0.0)
+
+    def grad(x):
+        a, b = x[0::2], x[1::2]
+        g = np.empty_like(x)
+        g[0::2] = -400.0 * a * (b - a**2) - 2.0 * (1.0 - a)
+        g[1::2] = 200.0 * (b - a**2)
+        return g + COUPLING * coupling(x)
+
+    return fun, grad
+
+
+@pytest.mark.parametrize("n_workers", [1, 3])
+def test_distributed_matches_single_process(n_workers):
+    x0 = np.tile([-1.2, 1.0], N // 2)
+    expected = lbfgs(_full_fun, _full_grad, x0, max_iter=500)
+    result = run_distributed(_setup, x0, n_workers, max_iter=500)
+    assert result.success
+    assert result.n_iter == expected.n_iter
+    assert result.n_fun == expected.n_fun
+    assert np.allclose(result.x, expected.x, atol=1e-8)
+    assert result.fun == pytest.approx(expected.fun, abs=1e-12)
+
+
+def _failing_setup(comm, index):
+    if comm.rank == 1:
+        raise ValueError("bad shard")
+    return _setup(comm, index)
+
+
+def test_worker_failure_is_reported():
+    with pytest.raises(RuntimeError, match="bad shard"):
+        run_distributed(_failing_setup, np.ones(N), 2)
+
+
+def _exiting_setup(comm, index):
+    if comm.rank == 1:
+        os._exit(3)
+    return _setup(comm, index)
+
+
+def _stalling_setup(comm, index):
+    if comm.rank == 1:
+        time.sleep(1.0)
+    return _setup(comm, index)
+
+
+def test_dead_or_stalled_worker_does_not_hang():
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        run_distributed(_exiting_setup, np.ones(N), 2)
+    with pytest.raises(RuntimeError, match="timed out"):
+        run_distributed(_stalling_setup, np.ones(N), 2, barrier_timeout=0.2)
+    with pytest.raises(ValueError, match="deadline"):
+        run_distributed(_setup, np.ones(N), 2, line_search_kwargs={"deadline": 1.0})
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from qnm import bfgs, finite_sum_problem, lbfgs
+from qnm.finite_sum import least_squares_term
+
+
+def _data(rows=1000, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.normal(size=(rows, dim))
+    b = A @ np.arange(1.0, dim + 1.0) + 0.01 * rng.normal(size=rows)
+    return A, b
+
+
+@pytest.mark.parametrize("solver", [bfgs, lbfgs])
+def test_finite_sum_problem_matches_serial_evaluation(solver):
+    A, b = _data()
+    x_star = np.linalg.lstsq(A, b, rcond=None)[0]
+    with finite_sum_problem(least_squares_term, [A, b], np.zeros(8), n_workers=3) as problem:
+        f, g = least_squares_term(np.ones(8), A, b)
+        assert problem.fun(np.ones(8)) == pytest.approx(f)
+        assert np.allclose(problem.grad(np.ones(8)), g)
+
+        res = solver(problem.fun, problem.grad, problem.x0, tol=1e-6)
+        assert res.success
+        assert np.allclose(res.x, x_star, atol=1e-6)
+        # fun and grad at the same point share one pass over the data
+        assert problem.pool.n_passes <= res.n_fun + 1
+
+
+def _failing_term(x, A, b):
+    raise FloatingPointError("overflow in shard")
+
+
+def test_worker_errors_are_raised():
+    A, b = _data(rows=10)
+    with finite_sum_problem(_failing_term, [A, b], np.zeros(8), n_workers=2) as problem:
+        with pytest.raises(RuntimeError, match="overflow in shard"):
+            problem.fun(problem.x0)
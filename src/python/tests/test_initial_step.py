@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from qnm import bfgs, householder_quadratic_problem, lbfgs, rosenbrock_problem
+from qnm.line_search import initial_step_length
+
+
+@pytest.mark.parametrize("solver", [bfgs, lbfgs])
+def test_scaled_first_step_saves_evaluations(solver):
+    problem = rosenbrock_problem(dim=10)
+    unit = solver(problem.fun, problem.grad, problem.x0, max_iter=1)
+    for strategy in ("inverse_gnorm", "interpolate", "carry"):
+        scaled = solver(problem.fun, problem.grad, problem.x0, max_iter=1, initial_step=strategy)
+        assert scaled.n_fun < unit.n_fun
+
+
+@pytest.mark.parametrize("solver", [bfgs, lbfgs])
+def test_interpolated_step_saves_evaluations(solver):
+    problem = householder_quadratic_problem(dim=200, condition_number=1e3)
+    results = {
+        strategy: solver(problem.fun, problem.grad, problem.x0, max_iter=2000, initial_step=strategy)
+        for strategy in ("unit", "inverse_gnorm", "interpolate", "carry")
+    }
+    assert all(res.success for res in results.values())
+    assert results["interpolate"].n_fun < results["unit"].n_fun
+    assert results["carry"].n_fun < results["unit"].n_fun
+
+
+def test_initial_step_length_formulas():
+    g = np.array([3.0, 4.0])
+    p = -g
+    assert initial_step_length("unit", g, p) == 1.0
+    assert initial_step_length("inverse_gnorm", g, p) == pytest.approx(0.2)
+    # A direction scaled by H0 already has the right length
+    assert initial_step_length("inverse_gnorm", g, 0.1 * p, steepest=False) == 1.0
+    # Eq. 3.60: 1.01 * 2 * df / -g.T p = 1.01 * 2 * 5 / 25
+    assert initial_step_length("interpolate", g, p, df_prev=5.0, alpha_prev=0.3) == pytest.approx(0.404)
+    assert initial_step_length("carry", g, p, df_prev=5.0, alpha_prev=0.3) == pytest.approx(0.6)
+    with pytest.raises(ValueError):
+        initial_step_length("cubic", g, p)
@@ -0,0 +1,52 @@
+import numpy as np
+
+from qnm import DiagonalInverseHessian, bfgs, lbfgs, quadratic_problem, rosenbrock_problem
+
+
+def test_lbfgs_inverse_hessian_operator_matches_dense():
+    problem = rosenbrock_problem(dim=10)
+    result = lbfgs(problem.fun, problem.grad, problem.x0, m=5, tol=1e-5, max_iter=400)
+    H_inv = result.inverse_hessian
+    assert H_inv.shape == (10, 10)
+    assert len(H_inv.s_history) == 5
+
+    H = H_inv.to_dense()
+    assert np.allclose(H, H.T)
+    assert np.all(np.linalg.eigvalsh(H) > 0)
+
+    rng = np.random.default_rng(0)
+    V = rng.normal(size=(10, 3))
+    assert np.allclose(H_inv.matvec(V[:, 0]), H @ V[:, 0])
+    assert np.allclose(H_inv.matmat(V), H @ V)
+    # Exact diagonal from the compact representation
+    assert np.allclose(H_inv.diag(), np.diag(H))
+
+
+def test_inverse_hessian_diag_with_preconditioner():
+    problem = quadratic_problem(dim=8, condition_number=50.0, seed=2)
+    result = lbfgs(problem.fun, problem.grad, problem.x0, m=4, tol=1e-8, H0=DiagonalInverseHessian())
+    H = result.inverse_hessian.to_dense()
+    assert np.allclose(result.inverse_hessian.diag(), np.diag(H))
+
+    result = lbfgs(problem.fun, problem.grad, problem.x0, m=4, tol=1e-8, H0=lambda v: 0.5 * v)
+    H = result.inverse_hessian.to_dense()
+    estimate = result.inverse_hessian.diag(n_probes=2000)
+    assert np.allclose(estimate, np.diag(H), rtol=0.2, atol=0.2 * np.abs(np.diag(H)).max())
+
+
+def test_bfgs_inverse_hessian_and_warm_start():
+    problem = quadratic_problem(dim=5, condition_number=5.0, seed=1)
+    # Loose tolerance: near the solution ys <= 1e-12 ||s|| ||y|| (rounding noise) would reset H to identity.
+    result = bfgs(problem.fun, problem.grad, problem.x0, tol=1e-6)
+    H_inv = result.inverse_hessian
+    assert np.allclose(H_inv.diag(), np.diag(H_inv.to_dense()))
+
+    # After convergence on a quadratic, H approximates A^{-1}.
+    A = np.column_stack([problem.grad(e) - problem.grad(np.zeros(5)) for e in np.eye(5)])
+    assert np.allclose(H_inv.to_dense(), np.linalg.inv(A), atol=1e-2)
+
+    # The operator is accepted as a preconditioner for a warm-started solve.
+    cold = lbfgs(problem.fun, problem.grad, problem.x0, tol=1e-8)
+    warm = lbfgs(problem.fun, problem.grad, problem.x0, tol=1e-8, H0=H_inv)
+    assert warm.success
+    assert warm.n_iter < cold.n_iter
@@ -1,7 +1,7 @@
 import numpy as np
 import pytest
 
-from qnm import lbfgsb
+from qnm import lbfgsb, rosenbrock_problem
 
 scipy = pytest.importorskip("scipy")
 
@@ -13,3 +13,36 @@ def test_lbfgsb_with_bounds():
     result = lbfgsb(fun, grad, np.array([3.0]), bounds=[(0.0, 2.0)], tol=1e-9)
     assert result.success
     assert np.allclose(result.x, [1.0], atol=1e-6)
+
+
+def test_lbfgsb_per_iteration_callback_reuses_evaluations():
+    problem = rosenbrock_problem(dim=10)
+    calls = []
+    iterations = []
+
+    def fun(x):
+        calls.append(x.copy())
+        return problem.fun(x)
+
+    result = lbfgsb(fun, problem.grad, problem.x0, callback=iterations.append)
+    assert result.success
+    assert result.n_fun == len(calls)
+    assert [res.n_iter for res in iterations] == list(range(1, result.n_iter + 1))
+    last = iterations[-1]
+    assert set(last.extra_info) == {"alpha", "m", "s_history", "y_history"}
+    assert 0 < len(last.extra_info["s_history"]) <= last.extra_info["m"]
+    assert all(isinstance(s, np.ndarray) for s in last.extra_info["s_history"])
+    assert np.allclose(last.grad, problem.grad(last.x))
+
+
+def test_lbfgsb_stops_on_callback_and_budget():
+    problem = rosenbrock_problem(dim=10)
+    stopped = lbfgsb(problem.fun, problem.grad, problem.x0, callback=lambda res: res.n_iter >= 5)
+    assert stopped.status == "callback"
+    assert stopped.n_iter == 5
+    assert stopped.fun == pytest.approx(problem.fun(stopped.x))
+
+    budget = lbfgsb(problem.fun, problem.grad, problem.x0, max_fun=20)
+    assert budget.status == "max_fun"
+    assert budget.n_fun == 20
+    assert budget.fun < problem.fun(problem.x0)
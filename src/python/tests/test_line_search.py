@@ -1,5 +1,7 @@
 import numpy as np
+import pytest
 
+from qnm import bfgs, lbfgs, quadratic_problem
 from qnm.line_search import line_search
 
 
@@ -55,3 +57,38 @@ def test_line_search_returns_zero_for_non_descent_direction():
     assert n_grad == 0
 
 
+def test_hager_zhang_wolfe_and_approximate_wolfe():
+    def fun(x):
+        return float(np.sum(np.exp(x) - x))
+
+    def grad(x):
+        return np.exp(x) - 1.0
+
+    xk = np.array([2.0, -1.0, 0.5])
+    g0 = grad(xk)
+    f0 = fun(xk)
+    derphi0 = float(np.dot(g0, -g0))
+    alpha, f_new, g_new, n_fun, n_grad = line_search(fun, grad, xk, -g0, f0=f0, g0=g0, method="hager_zhang")
+
+    derphi = float(np.dot(g_new, -g0))
+    assert alpha > 0.0 and n_fun == n_grad
+    assert derphi >= 0.9 * derphi0
+    wolfe = f_new <= f0 + 1e-4 * alpha * derphi0
+    approx_wolfe = derphi <= (2e-4 - 1.0) * derphi0 and f_new <= f0 + 1e-6 * abs(f0)
+    assert wolfe or approx_wolfe
+
+    with pytest.raises(ValueError):
+        line_search(fun, grad, xk, -g0, method="backtracking")
+
+
+@pytest.mark.parametrize("solver", [bfgs, lbfgs])
+def test_hager_zhang_reduces_high_accuracy_evaluations(solver):
+    problem = quadratic_problem(dim=50, condition_number=1e3)
+    results = {
+        method: solver(
+            problem.fun, problem.grad, problem.x0, tol=1e-10, max_iter=3000, line_search_kwargs={"method": method}
+        )
+        for method in ("strong_wolfe", "hager_zhang")
+    }
+    assert all(res.success for res in results.values())
+    assert results["hager_zhang"].n_fun < results["strong_wolfe"].n_fun
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from qnm import minimize, plan_solver, quadratic_problem, rosenbrock_problem
+
+
+def test_plan_prefers_bfgs_for_small_problems():
+    plan = plan_solver(50)
+    assert plan.method == "bfgs"
+    assert plan.m is None
+    assert plan.predicted_bytes >= 50 * 50 * 8
+
+
+def test_plan_switches_to_lbfgs_under_memory_budget():
+    # Dense BFGS at n=20,000 needs gigabytes; a 64 MB budget forces L-BFGS.
+    plan = plan_solver(20_000, memory_budget=64 * 2**20)
+    assert plan.method == "lbfgs"
+    assert 3 <= plan.m <= 20
+    assert plan.predicted_bytes <= 64 * 2**20
+
+    tight = plan_solver(20_000, memory_budget=(2 * 5 + 10) * 20_000 * 8)
+    assert tight.m == 5
+
+    with pytest.raises(ValueError):
+        plan_solver(20_000, memory_budget=1024)
+
+
+def test_plan_respects_time_budget():
+    plan = plan_solver(800, time_budget=1.0, max_iter=100)
+    assert plan.method == "lbfgs"
+    assert plan.predicted_seconds <= 1.0
+
+
+def test_minimize_reports_plan():
+    problem = quadratic_problem(dim=5, condition_number=5.0, seed=1)
+    result = minimize(problem.fun, problem.grad, problem.x0, tol=1e-8)
+    assert result.success
+    assert result.plan.method == "bfgs"
+    assert np.allclose(result.x, problem.solution, atol=1e-6)
+
+    problem = rosenbrock_problem(dim=10)
+    result = minimize(problem.fun, problem.grad, problem.x0, memory_budget=3_000, max_iter=400, tol=1e-5)
+    assert result.success
+    assert result.plan.method == "lbfgs"
+    assert result.plan.predicted_bytes <= 3_000
+
+
+def test_minimize_plans_lbfgsb_for_bounds():
+    problem = rosenbrock_problem(dim=4)
+    bounds = [(-2.0, 0.5)] * 4
+    result = minimize(problem.fun, problem.grad, problem.x0, bounds=bounds, memory_budget=3_000)
+    assert result.plan.method == "lbfgsb"
+    assert result.plan.reason.startswith("bounds given")
+    assert result.plan.predicted_bytes <= 3_000
+    assert np.all(result.x <= 0.5)
+
+    with pytest.raises(ValueError, match="bounds"):
+        minimize(problem.fun, problem.grad, problem.x0, method="lbfgs", bounds=bounds)
+
+
+def test_minimize_explicit_method_uses_itemsize_and_rejects_m_for_bfgs():
+    problem = quadratic_problem(dim=20, seed=3)
+    double = minimize(problem.fun, problem.grad, problem.x0, method="lbfgs", m=5, max_iter=5)
+    single = minimize(problem.fun, problem.grad, problem.x0, method="lbfgs", m=5, max_iter=5, itemsize=4)
+    assert single.plan.predicted_bytes * 2 == double.plan.predicted_bytes
+
+    with pytest.raises(ValueError, match="no m"):
+        minimize(problem.fun, problem.grad, problem.x0, method="bfgs", m=5)
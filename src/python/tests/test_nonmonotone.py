@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from qnm import lbfgs, rosenbrock_problem
+from qnm.line_search import NonmonotoneReference
+
+
+def test_reference_values():
+    gll = NonmonotoneReference("gll", memory=3)
+    zh = NonmonotoneReference("zhang_hager", eta=0.5)
+    for f in (5.0, 3.0, 4.0, 1.0, 2.0):
+        gll.update(f)
+        zh.update(f)
+    assert gll.value == 4.0
+    # C = (0.5 Q C + f) / (0.5 Q + 1), Q_0 = 1, C_0 = 5
+    C, Q = 5.0, 1.0
+    for f in (3.0, 4.0, 1.0, 2.0):
+        Q_new = 0.5 * Q + 1.0
+        C, Q = (0.5 * Q * C + f) / Q_new, Q_new
+    assert zh.value == pytest.approx(C)
+    with pytest.raises(ValueError):
+        NonmonotoneReference("armijo")
+
+
+@pytest.mark.parametrize("rule", ["gll", "zhang_hager"])
+def test_nonmonotone_lbfgs_on_rosenbrock(rule):
+    problem = rosenbrock_problem(dim=100)
+    history = [problem.fun(problem.x0)]
+    monotone = lbfgs(problem.fun, problem.grad, problem.x0, max_iter=2000)
+    relaxed = lbfgs(
+        problem.fun, problem.grad, problem.x0, max_iter=2000, nonmonotone=rule,
+        callback=lambda res: history.append(res.fun),
+    )
+    assert relaxed.success
+    assert np.allclose(relaxed.x, 1.0, atol=1e-4)
+    assert relaxed.n_fun < monotone.n_fun
+    # Both references are bounded by the running maximum, so f never exceeds f(x0)
+    assert max(history) <= history[0]
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+from qnm import lbfgs, rosenbrock_problem
+from qnm.out_of_core import lbfgs_out_of_core
+
+
+def test_out_of_core_lbfgs_matches_in_memory(tmp_path):
+    problem = rosenbrock_problem(dim=10)
+    reference = lbfgs(problem.fun, problem.grad, problem.x0, m=5, tol=1e-6, max_iter=400)
+    # A tiny chunk size forces every vector operation through several chunks.
+    result = lbfgs_out_of_core(
+        problem.fun, problem.grad, problem.x0, m=5, tol=1e-6, max_iter=400, scratch_dir=str(tmp_path), chunk_size=3
+    )
+
+    assert result.success
+    assert result.n_iter == reference.n_iter
+    assert result.n_fun == reference.n_fun
+    assert np.allclose(result.x, reference.x, atol=1e-8)
+
+    assert isinstance(result.x, np.memmap)
+    (scratch,) = os.listdir(tmp_path)
+    # Only the final iterate and gradient are kept on disk.
+    assert len(os.listdir(tmp_path / scratch)) == 2
+
+
+def test_out_of_core_lbfgs_float32(tmp_path):
+    problem = rosenbrock_problem(dim=6)
+    x0 = np.memmap(tmp_path / "x0.dat", dtype=np.float32, mode="w+", shape=(6,))
+    x0[:] = problem.x0
+    result = lbfgs_out_of_core(problem.fun, problem.grad, x0, tol=1e-3, max_iter=400, scratch_dir=str(tmp_path))
+    assert result.success
+    assert result.x.dtype == np.float32
+    assert np.allclose(result.x, problem.solution, atol=1e-2)
+
+
+def test_out_of_core_lbfgs_budgeted_line_search_keeps_state_consistent(tmp_path):
+    problem = rosenbrock_problem(dim=10)
+    seen = []
+
+    def callback(res):
+        x = np.asarray(res.x)
+        seen.append(abs(res.fun - problem.fun(x)) + np.abs(np.asarray(res.grad) - problem.grad(x)).max())
+
+    # A budget-limited search may return its best trial instead of its last one
+    lbfgs_out_of_core(
+        problem.fun, problem.grad, problem.x0, max_iter=30, scratch_dir=str(tmp_path),
+        line_search_kwargs={"method": "hager_zhang", "max_evals": 3}, callback=callback,
+    )
+    assert seen and max(seen) < 1e-12
+
+
+def test_out_of_core_lbfgs_removes_scratch_on_error(tmp_path):
+    problem = rosenbrock_problem(dim=4)
+
+    def failing_grad(x):
+        raise RuntimeError("gradient failed")
+
+    with pytest.raises(RuntimeError, match="gradient failed"):
+        lbfgs_out_of_core(problem.fun, failing_grad, problem.x0, scratch_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
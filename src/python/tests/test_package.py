@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import qnm
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def test_import_is_lazy_and_exports_resolve():
+    code = "import sys, qnm; print('numpy' in sys.modules, 'qnm.bfgs' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=SCRIPTS.parent
+    ).stdout.split()
+    assert out == ["False", "False"]
+
+    # Submodules that share their name with the exported function stay shadowed.
+    import qnm.minimize  # noqa: F401
+
+    assert callable(qnm.minimize) and qnm.minimize.__name__ == "minimize"
+    for name in qnm.__all__:
+        assert getattr(qnm, name) is not None
+
+
+def test_pyodide_bundle_contains_sources_and_bytecode(tmp_path):
+    sys.path.insert(0, str(SCRIPTS))
+    try:
+        from build_pyodide_bundle import PACKAGE_DIR, build_bundle
+    finally:
+        sys.path.remove(str(SCRIPTS))
+
+    bundle = tmp_path / "qnm.zip"
+    names = build_bundle(bundle)
+    with zipfile.ZipFile(bundle) as zf:
+        assert sorted(zf.namelist()) == sorted(names)
+    for src in PACKAGE_DIR.glob("*.py"):
+        assert f"qnm/{src.name}" in names
+        assert any(n.startswith(f"qnm/__pycache__/{src.stem}.") and n.endswith(".pyc") for n in names)
@@ -0,0 +1,83 @@
+import contextlib
+import multiprocessing as mp
+import os
+import time
+import warnings
+
+import numpy as np
+import pytest
+
+from qnm import minimize, quadratic_problem, rosenbrock_problem, solve_many
+from qnm import parallel
+from qnm.parallel import BLAS_ENV_VARS, blas_env
+
+
+@pytest.fixture
+def problems():
+    return [rosenbrock_problem(dim=4), quadratic_problem(dim=5, seed=1), quadratic_problem(dim=40, seed=2)]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_solve_many_matches_sequential_solves(problems, executor):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        run = solve_many(problems, method="lbfgs", executor=executor, max_workers=2, tol=1e-8)
+        seen = sorted(index for index, _ in run)
+    assert seen == [0, 1, 2]
+    for problem, res in zip(problems, run.results()):
+        ref = minimize(problem.fun, problem.grad, problem.x0, method="lbfgs", tol=1e-8)
+        assert res.success and np.allclose(res.x, ref.x)
+
+    report = run.report
+    assert report.n_solves == 3 and report.max_workers == 2
+    assert report.solves_per_second == pytest.approx(3 / report.wall_seconds)
+    assert 0.0 < report.utilization <= 1.0
+
+
+def test_blas_env_restores_environment(monkeypatch):
+    monkeypatch.setenv("OMP_NUM_THREADS", "7")
+    monkeypatch.delenv("MKL_NUM_THREADS", raising=False)
+    with blas_env(2):
+        assert all(os.environ[name] == "2" for name in BLAS_ENV_VARS)
+    assert os.environ["OMP_NUM_THREADS"] == "7"
+    assert "MKL_NUM_THREADS" not in os.environ
+
+
+def test_blas_settings_do_not_outlive_the_solves(problems, monkeypatch):
+    monkeypatch.setenv("OMP_NUM_THREADS", "7")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        run = solve_many(problems, method="lbfgs", executor="process", max_workers=2)
+        next(run)
+        # Suspended between results, the environment is already restored
+        assert os.environ["OMP_NUM_THREADS"] == "7"
+        run.results()
+
+    active = []
+
+    @contextlib.contextmanager
+    def fake_limits(n_threads):
+        active.append(n_threads)
+        yield True
+        active.remove(n_threads)
+
+    monkeypatch.setattr(parallel, "blas_threads", fake_limits)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        run = solve_many(problems, method="lbfgs", executor="thread", max_workers=2, blas_threads=1)
+        next(run)
+    # Abandoned after one result: the limit is lifted once the remaining solves finish
+    deadline = time.monotonic() + 10.0
+    while active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert active == []
+
+
+def test_forkserver_workers_get_no_environment_cap(problems, monkeypatch):
+    # The forkserver keeps the environment it started with, so only spawn can be capped this way
+    monkeypatch.setattr(parallel, "_threadpoolctl", lambda: None)
+    spawn = solve_many(problems, executor="process", max_workers=2, context=mp.get_context("spawn"))
+    assert spawn.blas_control == "environment"
+    if "forkserver" in mp.get_all_start_methods():
+        run = solve_many(problems, executor="process", max_workers=2, context=mp.get_context("forkserver"))
+        assert run.blas_control is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from qnm import ElementFunction, PartiallySeparable, bfgs, psqn, rosenbrock_problem
+from qnm.partially_separable import ElementHessians
+
+
+def chained_rosenbrock(n, a=1.0, b=100.0):
+    def fun(z):
+        return b * (z[:, 1] - z[:, 0] ** 2) ** 2 + (a - z[:, 0]) ** 2
+
+    def grad(z):
+        t = z[:, 1] - z[:, 0] ** 2
+        return np.stack([-4 * b * z[:, 0] * t - 2 * (a - z[:, 0]), 2 * b * t], axis=1)
+
+    indices = np.stack([np.arange(n - 1), np.arange(1, n)], axis=1)
+    return PartiallySeparable([ElementFunction(indices, fun, grad)], n)
+
+
+def convex_triples(n, seed=0):
+    """Logistic-plus-quartic elements on overlapping triples of variables."""
+    rng = np.random.default_rng(seed)
+    W = rng.normal(size=(n - 2, 3))
+    t = rng.normal(size=n - 2)
+
+    def fun(z):
+        u = np.einsum("ei,ei->e", W, z)
+        return np.logaddexp(0.0, u - t) + 0.25 * u**4 + 0.05 * np.sum(z**2, axis=1)
+
+    def grad(z):
+        u = np.einsum("ei,ei->e", W, z)
+        return (0.5 * (1.0 + np.tanh(0.5 * (u - t))) + u**3)[:, None] * W + 0.1 * z
+
+    indices = np.stack([np.arange(n - 2), np.arange(1, n - 1), np.arange(2, n)], axis=1)
+    return PartiallySeparable([ElementFunction(indices, fun, grad)], n)
+
+
+@pytest.mark.parametrize("update", ["bfgs", "sr1"])
+def test_chained_rosenbrock_matches_problem_and_converges(update):
+    structure = chained_rosenbrock(20)
+    problem = rosenbrock_problem(dim=20)
+    assert structure.fun(problem.x0) == pytest.approx(problem.fun(problem.x0))
+    assert np.allclose(structure.grad(problem.x0), problem.grad(problem.x0))
+
+    res = psqn(structure, problem.x0, update=update, max_iter=1000, tol=1e-8)
+    assert res.success
+    assert np.allclose(res.x, problem.solution, atol=1e-6)
+
+
+def test_element_updates_converge_at_least_as_fast_as_dense_bfgs():
+    structure = convex_triples(100)
+    x0 = np.ones(100)
+    dense = bfgs(structure.fun, structure.grad, x0, tol=1e-8)
+    res = psqn(structure, x0, tol=1e-8)
+    assert res.success
+    assert res.fun == pytest.approx(dense.fun, rel=1e-10)
+    assert res.n_iter <= dense.n_iter
+
+
+def test_element_storage_is_linear_in_n():
+    for n in (10, 1000):
+        h = ElementHessians(convex_triples(n).elements[0].indices, "bfgs")
+        assert h.B.shape == (n - 2, 3, 3)
+    with pytest.raises(ValueError, match="out of range"):
+        PartiallySeparable([ElementFunction([0, 5], np.sum, np.ones_like)], 5)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from qnm import DiagonalInverseHessian, bfgs, lbfgs
+
+
+def _scaled_quadratic(n=50, condition_number=1e4, seed=0):
+    d = np.logspace(0, np.log10(condition_number), n)
+    b = np.random.default_rng(seed).normal(size=n)
+
+    def fun(x):
+        return 0.5 * float(x @ (d * x)) - float(b @ x)
+
+    def grad(x):
+        return d * x - b
+
+    return fun, grad, d, b
+
+
+def test_exact_diagonal_preconditioner_forms():
+    fun, grad, d, b = _scaled_quadratic()
+    x0 = np.zeros_like(d)
+    x_star = b / d
+
+    class Operator:
+        def matvec(self, v):
+            return v / d
+
+    for H0 in (1.0 / d, np.diag(1.0 / d), lambda v: v / d, Operator()):
+        for solver in (bfgs, lbfgs):
+            result = solver(fun, grad, x0, tol=1e-8, H0=H0)
+            assert result.success
+            assert result.n_iter == 1
+            assert np.allclose(result.x, x_star)
+
+
+def test_diagonal_estimator_reduces_lbfgs_iterations():
+    fun, grad, d, b = _scaled_quadratic()
+    x0 = np.zeros_like(d)
+
+    plain = lbfgs(fun, grad, x0, tol=1e-5, max_iter=2000)
+    estimator = DiagonalInverseHessian()
+    preconditioned = lbfgs(fun, grad, x0, tol=1e-5, max_iter=2000, H0=estimator)
+
+    assert plain.success and preconditioned.success
+    assert preconditioned.n_iter < plain.n_iter
+    assert np.all(estimator.diagonal() > 0)
+
+
+def test_diagonal_estimator_clips_first_pair():
+    s = np.array([1.0, 0.0])
+    stiff = DiagonalInverseHessian(d_max=1e4)
+    stiff.update(s, np.array([1.0, 1e3]))  # y.T y / y.T s = 1e6 + 1
+    assert np.allclose(stiff.D, 1e4)
+    flat = DiagonalInverseHessian(d_min=1e-2)
+    flat.update(s, np.array([1e-4, 0.0]))  # y.T y / y.T s = 1e-4
+    assert np.allclose(flat.D, 1e-2)
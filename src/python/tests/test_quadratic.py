@@ -1,6 +1,6 @@
 import numpy as np
 
-from qnm import bfgs, lbfgs, quadratic_problem
+from qnm import bfgs, householder_quadratic_problem, lbfgs, quadratic_problem
 
 
 def _run_solver(solver, problem):
@@ -15,3 +15,27 @@ def test_quadratic_bfgs_and_lbfgs():
     _run_solver(bfgs, problem)
     _run_solver(lbfgs, problem)
 
+
+def test_householder_quadratic_matches_dense_spectrum():
+    problem = householder_quadratic_problem(dim=6, condition_number=20.0, seed=3)
+    g0 = problem.grad(np.zeros(6))
+    A = np.column_stack([problem.grad(e) - g0 for e in np.eye(6)])
+    assert np.allclose(A, A.T)
+    assert np.allclose(np.linalg.eigvalsh(A), np.linspace(1.0, 20.0, 6))
+    assert np.allclose(A @ problem.solution, -g0)
+    x = problem.x0
+    assert np.isclose(problem.fun(x), 0.5 * x @ A @ x + g0 @ x)
+
+
+def test_householder_quadratic_bfgs_and_lbfgs():
+    problem = householder_quadratic_problem(dim=20, condition_number=5.0, seed=1)
+    _run_solver(bfgs, problem)
+    _run_solver(lbfgs, problem)
+
+
+def test_lbfgs_keeps_curvature_pairs_of_small_steps():
+    # An absolute s^T y threshold drops every pair once the steps are small, stalling high-accuracy solves
+    problem = quadratic_problem(dim=50, condition_number=1e3)
+    result = lbfgs(problem.fun, problem.grad, problem.x0, tol=1e-10, max_iter=3000)
+    assert result.success
+    assert np.allclose(result.x, problem.solution, atol=1e-8)
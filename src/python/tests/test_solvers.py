@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from qnm import BFGSSolver, LBFGSSolver, bfgs, lbfgs, quadratic_problem, rosenbrock_problem
+
+
+@pytest.mark.parametrize("solver_cls, solve_fn", [(LBFGSSolver, lbfgs), (BFGSSolver, bfgs)])
+def test_solver_object_matches_function_api(solver_cls, solve_fn):
+    problem = rosenbrock_problem(dim=10)
+    solver = solver_cls(10, max_iter=1000)
+    expected = solve_fn(problem.fun, problem.grad, problem.x0, max_iter=1000)
+    for _ in range(2):  # the workspace is reset between cold solves
+        res = solver.solve(problem.fun, problem.grad, problem.x0)
+        assert res.success
+        assert (res.n_iter, res.n_fun) == (expected.n_iter, expected.n_fun)
+        assert np.allclose(res.x, expected.x, atol=1e-8)
+    with pytest.raises(ValueError):
+        solver.solve(problem.fun, problem.grad, np.zeros(3))
+
+
+@pytest.mark.parametrize("solver_cls", [LBFGSSolver, BFGSSolver])
+def test_warm_start_reuses_curvature(solver_cls):
+    problem = quadratic_problem(dim=30, condition_number=100.0)
+    solver = solver_cls(30)
+    solver.solve(problem.fun, problem.grad, problem.x0)
+    # A nearby problem: the same Hessian with a shifted minimizer
+    shift = 1e-2 * np.ones(30)
+    fun = lambda x: problem.fun(x - shift)
+    grad = lambda x: problem.grad(x - shift)
+    x_start = problem.solution
+    cold = solver.solve(fun, grad, x_start)
+    solver.solve(problem.fun, problem.grad, problem.x0)
+    warm = solver.solve(fun, grad, x_start, warm_start=True)
+    assert warm.success and cold.success
+    assert warm.n_fun < cold.n_fun
+    assert np.allclose(warm.x, problem.solution + shift, atol=1e-5)
+
+
+@pytest.mark.parametrize("make", [lambda: LBFGSSolver(0), lambda: LBFGSSolver(5, m=0), lambda: BFGSSolver(0)])
+def test_solver_rejects_empty_workspace(make):
+    with pytest.raises(ValueError):
+        make()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from qnm import lsr1, rosenbrock_problem, sr1
+from qnm.sr1 import DenseSR1, LimitedSR1, steihaug_cg
+
+
+def _saddle_chain(dim):
+    """sum(x^4/4 - x^2/2) plus a weak coupling: a saddle at 0 and many minima."""
+
+    def fun(x):
+        return float(np.sum(x**4 / 4 - x**2 / 2) + 0.1 * np.dot(x[:-1], x[1:]))
+
+    def grad(x):
+        g = x**3 - x
+        g[:-1] += 0.1 * x[1:]
+        g[1:] += 0.1 * x[:-1]
+        return g
+
+    return fun, grad
+
+
+@pytest.mark.parametrize("solver", [sr1, lsr1])
+def test_sr1_on_rosenbrock_and_saddles(solver):
+    problem = rosenbrock_problem(dim=10)
+    result = solver(problem.fun, problem.grad, problem.x0, max_iter=2000)
+    assert result.success
+    assert np.allclose(result.x, 1.0, atol=1e-4)
+    # One function and one gradient evaluation per iteration
+    assert result.n_fun == result.n_grad == result.n_iter + 1
+
+    fun, grad = _saddle_chain(50)
+    x0 = np.random.default_rng(0).normal(scale=0.3, size=50)
+    result = solver(fun, grad, x0, max_iter=500)
+    assert result.success
+    # A local minimum: every coordinate has left the saddle at 0
+    assert np.all(np.abs(result.x) > 0.5)
+
+
+def test_steihaug_cg_and_limited_model():
+    A = np.diag([1.0, 4.0])
+    g = np.array([1.0, 1.0])
+    p, _ = steihaug_cg(lambda v: A @ v, g, delta=10.0)
+    assert np.allclose(p, -np.linalg.solve(A, g), atol=0.5 * np.linalg.norm(g))
+    # Negative curvature: the step ends on the boundary
+    p, _ = steihaug_cg(lambda v: -v, g, delta=2.0)
+    assert np.linalg.norm(p) == pytest.approx(2.0)
+
+    # The compact form reproduces the secant equations of the stored pairs (indefinite B)
+    model = LimitedSR1(6, m=4)
+    rng = np.random.default_rng(1)
+    B_true = np.diag(np.linspace(-1.0, 5.0, 6))
+    for _ in range(4):
+        s = rng.normal(size=6)
+        model.update(s, B_true @ s)
+    for s, y in zip(model.s_history, model.y_history):
+        assert np.allclose(model.matvec(s), y)
+
+
+@pytest.mark.parametrize("model_cls", [DenseSR1, LimitedSR1])
+def test_sr1_secant_equations_after_mixed_curvature(model_cls):
+    # Pairs of an indefinite quadratic: the first has negative curvature
+    A = np.diag([-1.0, 2.0, 3.0, 0.5])
+    model = model_cls(4)
+    steps = [np.array([1.0, 0.2, 0.0, 0.0]), np.array([0.0, 1.0, 0.3, 0.0]), np.array([0.1, 0.0, 1.0, 1.0])]
+    for s in steps:
+        assert model.update(s, A @ s)
+    for s in steps:
+        assert np.allclose(model.matvec(s), A @ s)
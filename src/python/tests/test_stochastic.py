@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from qnm import lbfgs, lbfgs_stochastic, logistic_regression_problem
+
+
+@pytest.fixture
+def problem(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(20000, 10))
+    w = rng.normal(size=10)
+    y = (X @ w + rng.normal(size=20000) > 0).astype(float)
+    np.save(tmp_path / "X.npy", X)
+    np.save(tmp_path / "y.npy", y)
+    return logistic_regression_problem(tmp_path / "X.npy", tmp_path / "y.npy", reg=1e-3)
+
+
+def test_multi_batch_lbfgs_approaches_full_batch_minimum(problem):
+    ref = lbfgs(problem.fun, problem.grad, problem.x0, tol=1e-10)
+    f0 = problem.fun(problem.x0)
+
+    armijo = lbfgs_stochastic(problem.batch, problem.x0, problem.n_rows, batch_size=2000, overlap=500, max_epochs=5)
+    assert armijo.status == "max_epochs"
+    assert armijo.extra_info["epochs"] == 5
+    assert problem.fun(armijo.x) - ref.fun < 1e-2 * (f0 - ref.fun)
+
+    decay = lbfgs_stochastic(problem.batch, problem.x0, problem.n_rows, batch_size=2000, overlap=500, max_epochs=5,
+                             step_size=lambda k: 1.0 / np.sqrt(k))
+    assert problem.fun(decay.x) - ref.fun < 1e-3 * (f0 - ref.fun)
+    # Each iteration reads batch_size - overlap new rows plus the overlap at the new point
+    assert decay.extra_info["data_passes"] == pytest.approx(decay.n_iter * 2000 / problem.n_rows, rel=0.05)
+
+
+def test_callback_and_overlap_validation(problem):
+    seen = []
+
+    def callback(res):
+        seen.append(res.extra_info["alpha"])
+        return len(seen) == 3
+
+    res = lbfgs_stochastic(problem.batch, problem.x0, problem.n_rows, batch_size=1000, step_size=0.5, callback=callback)
+    assert res.status == "callback" and res.n_iter == 3 and seen == [0.5] * 3
+    with pytest.raises(ValueError, match="overlap"):
+        lbfgs_stochastic(problem.batch, problem.x0, problem.n_rows, batch_size=1000, overlap=600)
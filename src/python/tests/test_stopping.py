@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+
+from qnm import bfgs, lbfgs
+from qnm.problems import rosenbrock_problem
+
+
+def test_evaluation_budgets_are_respected():
+    problem = rosenbrock_problem(dim=10)
+    for solver in (bfgs, lbfgs):
+        result = solver(problem.fun, problem.grad, problem.x0, max_fun=25)
+        assert result.status == "max_fun"
+        assert not result.success
+        assert result.n_fun <= 25
+        assert result.fun < problem.fun(problem.x0)
+
+        result = solver(problem.fun, problem.grad, problem.x0, max_grad=10)
+        assert result.status == "max_grad"
+        assert result.n_grad <= 10
+
+
+def test_time_limit_stops_slow_objective():
+    problem = rosenbrock_problem(dim=10)
+
+    def slow_fun(x):
+        time.sleep(0.01)
+        return problem.fun(x)
+
+    t0 = time.perf_counter()
+    result = lbfgs(slow_fun, problem.grad, problem.x0, max_iter=10_000, time_limit=0.2)
+    assert result.status == "time_limit"
+    assert time.perf_counter() - t0 < 0.5
+
+
+def test_progress_criteria():
+    problem = rosenbrock_problem(dim=10)
+    result = lbfgs(problem.fun, problem.grad, problem.x0, tol=0.0, ftol=1e-10)
+    assert result.status == "ftol" and result.success
+    assert result.fun < 1e-6
+
+    result = bfgs(problem.fun, problem.grad, problem.x0, tol=0.0, xtol=1e-8)
+    assert result.status == "xtol" and result.success
+    assert np.allclose(result.x, 1.0, atol=1e-4)
+
+    # No minimizer: the gradient never vanishes but f stops decreasing
+    def fun(x):
+        return float(np.sum(np.exp(-x)))
+
+    def grad(x):
+        return -np.exp(-x)
+
+    result = lbfgs(fun, grad, np.zeros(3), tol=0.0, max_iter=500, stall_window=5)
+    assert result.status == "stalled" and not result.success
+    assert result.n_iter < 500
@@ -0,0 +1,95 @@
+import json
+import threading
+
+import pytest
+
+from qnm import TelemetryRegistry, bfgs, disable_telemetry, enable_telemetry, lbfgs, lbfgsb, rosenbrock_problem
+from qnm.telemetry import get_registry
+
+
+@pytest.fixture
+def registry():
+    reg = enable_telemetry()
+    yield reg
+    disable_telemetry()
+
+
+def _metric(snapshot, kind, name, **labels):
+    labels = {k: str(v) for k, v in labels.items()}
+    return [m for m in snapshot[kind] if m["name"] == name and m["labels"] == labels]
+
+
+def test_solvers_report_into_registry(registry):
+    problem = rosenbrock_problem(dim=5)
+    results = {name: solver(problem.fun, problem.grad, problem.x0) for name, solver in
+               (("bfgs", bfgs), ("lbfgs", lbfgs), ("lbfgsb", lbfgsb))}
+    lbfgs(problem.fun, problem.grad, problem.x0, max_iter=3)
+
+    snap = registry.snapshot()
+    for name, res in results.items():
+        (iters,) = _metric(snap, "histograms", "iterations", solver=name)
+        assert iters["sum"] >= res.n_iter
+        assert _metric(snap, "counters", "solves_total", solver=name, status="converged")[0]["value"] >= 1
+    assert _metric(snap, "counters", "solves_total", solver="lbfgs", status="max_iter")[0]["value"] == 1
+
+    (ls_evals,) = _metric(snap, "histograms", "line_search_evals", solver="bfgs")
+    assert ls_evals["count"] == results["bfgs"].n_iter
+    assert ls_evals["sum"] == results["bfgs"].n_fun - 1
+
+    text = registry.to_text()
+    assert 'qnm_solves_total{solver="bfgs",status="converged"} 1' in text
+    assert 'qnm_iterations_bucket{solver="lbfgsb",le="+Inf"} 1' in text
+    assert json.loads(registry.to_json())["counters"]
+
+    registry.reset()
+    assert registry.snapshot() == {"counters": [], "histograms": []}
+
+
+def test_disabled_by_default():
+    assert get_registry() is None
+    problem = rosenbrock_problem(dim=2)
+    assert lbfgs(problem.fun, problem.grad, problem.x0).success
+
+
+def test_concurrent_updates_are_not_lost():
+    registry = TelemetryRegistry()
+
+    def work():
+        for i in range(2000):
+            registry.increment("events", source="a")
+            registry.observe("sizes", i % 7)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    snap = registry.snapshot()
+    assert _metric(snap, "counters", "events", source="a")[0]["value"] == 16_000
+    (sizes,) = _metric(snap, "histograms", "sizes")
+    assert sizes["count"] == 16_000
+    assert sizes["sum"] == 8 * sum(i % 7 for i in range(2000))
+    assert sizes["buckets"][0] == [1, 8 * sum(1 for i in range(2000) if i % 7 <= 1)]
+
+
+def test_exited_threads_are_merged_and_dropped():
+    registry = TelemetryRegistry()
+    for _ in range(20):
+        t = threading.Thread(target=registry.increment, args=("events",))
+        t.start()
+        t.join()
+    assert len(registry._shards) == 0
+    assert _metric(registry.snapshot(), "counters", "events")[0]["value"] == 20
+
+    registry.increment("events")
+    registry.reset()
+    assert registry.snapshot() == {"counters": [], "histograms": []}
+    registry.increment("events")
+    assert _metric(registry.snapshot(), "counters", "events")[0]["value"] == 1
+
+
+def test_prometheus_label_values_are_escaped():
+    registry = TelemetryRegistry()
+    registry.increment("events", source='a\\b "c"\nd')
+    assert 'qnm_events{source="a\\\\b \\"c\\"\\nd"} 1' in registry.to_text()
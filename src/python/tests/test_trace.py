@@ -0,0 +1,104 @@
+import numpy as np
+
+from qnm import TraceRecorder, bfgs, lbfgs, quadratic_problem, rosenbrock_problem
+from qnm.lbfgs import AdaptiveHistory
+from qnm.trace import downsample_indices
+from qnm.utils import OptimizeResult
+
+
+def test_trace_records_columns_and_exports_buffers():
+    problem = rosenbrock_problem(dim=2)
+    history = []
+    trace = TraceRecorder(record_H=True, capacity=2)
+
+    def callback(res):
+        trace(res)
+        history.append((res.fun, res.extra_info["H"].copy()))
+
+    bfgs(problem.fun, problem.grad, problem.x0, tol=1e-5, callback=callback)
+    cols = trace.columns()
+    assert len(trace) == len(history)
+    assert np.array_equal(cols["n_iter"], np.arange(1, len(history) + 1))
+    assert np.allclose(cols["fun"], [f for f, _ in history])
+    assert np.allclose(cols["H"], [H for _, H in history])
+
+    exported = trace.export()
+    assert all(buf.c_contiguous for buf in exported.values())
+    assert np.shares_memory(np.asarray(exported["fun"]), cols["fun"])
+    assert np.asarray(exported["x"]).shape == (len(history), 2)
+
+
+def test_trace_reconstructs_lbfgs_history():
+    problem = rosenbrock_problem(dim=2)
+    trace = TraceRecorder()
+    snapshots = []
+
+    def callback(res):
+        trace(res)
+        snapshots.append(np.array(res.extra_info["s_history"]).reshape(-1, 2))
+
+    lbfgs(problem.fun, problem.grad, problem.x0, m=3, tol=1e-5, callback=callback)
+    cols = trace.columns()
+    for i, expected in enumerate(snapshots):
+        k = cols["n_pairs"][i]
+        assert np.allclose(cols["s"][i - k + 1 : i + 1], expected)
+
+
+def test_trace_follows_replaced_adaptive_pairs():
+    problem = quadratic_problem(dim=20, condition_number=1e3)
+    trace = TraceRecorder(capacity=4)
+    snapshots = []
+
+    def callback(res):
+        trace(res)
+        snapshots.append((np.array(res.extra_info["s_history"]), res.extra_info["pair_replaced"]))
+
+    # A loose collinearity test makes the adaptive history replace pairs often
+    history = AdaptiveHistory(m_min=4, m_max=4, collinear_tol=0.5)
+    lbfgs(problem.fun, problem.grad, problem.x0, m=history, max_iter=60, callback=callback)
+    assert any(replaced for _, replaced in snapshots)
+    cols = trace.columns()
+    for i, (expected, _) in enumerate(snapshots):
+        rows = [i]
+        while len(rows) < cols["n_pairs"][i]:
+            rows.insert(0, cols["prev_pair"][rows[0]])
+        assert np.allclose(cols["s"][rows], expected)
+
+
+def test_downsample_keeps_endpoints_and_extremes():
+    values = np.zeros(1000)
+    values[437] = 5.0
+    idx = downsample_indices(values, 20)
+    assert len(idx) == 20
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 437 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_trace_growth_leaves_unwritten_pair_rows_nan():
+    trace = TraceRecorder(capacity=1)
+    for k, pairs in enumerate(([np.ones(2)], [])):
+        res = OptimizeResult(np.zeros(2), 1.0, np.ones(2), k + 1, 1, 1, False, "max_iter", "")
+        res.extra_info = {"s_history": pairs, "y_history": pairs}
+        trace(res)
+    cols = trace.columns()
+    assert np.array_equal(cols["s"][0], np.ones(2))
+    assert np.isnan(cols["s"][1]).all() and np.isnan(cols["y"][1]).all()
+
+
+def test_downsampled_export_renumbers_pair_links():
+    problem = quadratic_problem(dim=20, condition_number=1e3)
+    trace = TraceRecorder()
+    lbfgs(problem.fun, problem.grad, problem.x0, m=5, tol=1e-10, max_iter=400, callback=trace)
+    full = trace.columns()
+    exported = {name: np.asarray(buf) for name, buf in trace.export(max_points=20).items()}
+    idx = downsample_indices(full["fun"], 20)
+
+    prev = exported["prev_pair"]
+    assert prev.size == 20 and np.all(prev < np.arange(20))
+    assert (prev >= 0).any()
+    for i, j in enumerate(prev):
+        if j >= 0:
+            # A link points at the same pair as in the full trace
+            assert full["prev_pair"][idx[i]] == idx[j]
+            assert np.array_equal(exported["s"][j], full["s"][idx[j]])
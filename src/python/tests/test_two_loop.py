@@ -0,0 +1,49 @@
+from collections import deque
+
+import numpy as np
+
+from qnm.lbfgs import two_loop_recursion, two_loop_recursion_block
+
+
+def _history(n=30, m=6, seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.diag(np.linspace(1.0, 20.0, n))
+    s_history, y_history = deque(), deque()
+    for _ in range(m):
+        s = rng.normal(size=n)
+        s_history.append(s)
+        y_history.append(A @ s)
+    return s_history, y_history, rng
+
+
+def test_block_two_loop_matches_columnwise_recursion():
+    s_history, y_history, rng = _history()
+    G = rng.normal(size=(30, 7))
+    for H0 in (None, np.linspace(0.1, 1.0, 30), lambda v: 0.5 * v):
+        expected = np.column_stack([two_loop_recursion(g, s_history, y_history, H0=H0) for g in G.T])
+        assert np.allclose(two_loop_recursion_block(G, s_history, y_history, H0=H0), expected)
+
+
+def test_block_two_loop_without_history_is_steepest_descent():
+    G = np.arange(6.0).reshape(3, 2)
+    assert np.allclose(two_loop_recursion_block(G, deque(), deque()), -G)
+
+
+def test_block_two_loop_applies_operator_to_whole_block():
+    s_history, y_history, rng = _history()
+    G = rng.normal(size=(30, 7))
+    d = np.linspace(0.1, 1.0, 30)
+    calls = []
+
+    class Diagonal:
+        def matvec(self, v):
+            calls.append("matvec")
+            return d * v
+
+        def matmat(self, V):
+            calls.append("matmat")
+            return d[:, None] * V
+
+    expected = two_loop_recursion_block(G, s_history, y_history, H0=d)
+    assert np.allclose(two_loop_recursion_block(G, s_history, y_history, H0=Diagonal()), expected)
+    assert calls == ["matmat"]